@@ -1,7 +1,31 @@
+from typing import Any
+
+import importlib
+import importlib.util
+
 import gi
 
 gi.require_version("Soup", "3.0")
 
-from .protocol import *  # noqa: F403, E402
-
 __version__: str = "7.2.0"
+
+
+def __getattr__(name: str) -> Any:
+    # The names of nbxmpp.protocol are available from the package, but
+    # nbxmpp.protocol is only imported when one of them is used
+    if name.startswith("_"):
+        raise AttributeError(f"module 'nbxmpp' has no attribute '{name}'")
+
+    if importlib.util.find_spec(f"nbxmpp.{name}") is not None:
+        # Submodules were attributes of the package after a plain
+        # `import nbxmpp` when it imported nbxmpp.protocol eagerly
+        return importlib.import_module(f"nbxmpp.{name}")
+
+    protocol = importlib.import_module("nbxmpp.protocol")
+    try:
+        value = getattr(protocol, name)
+    except AttributeError:
+        raise AttributeError(f"module 'nbxmpp' has no attribute '{name}'") from None
+
+    globals()[name] = value
+    return value
@@ -0,0 +1,163 @@
+# This file is part of nbxmpp.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+if TYPE_CHECKING:
+    from nbxmpp.task import Task
+
+log = logging.getLogger("nbxmpp.avatar_cache")
+
+SHA1_RX = re.compile("^[0-9a-f]{40}$")
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class AvatarCache:
+    """
+    Content addressed store for avatar images, keyed by the SHA-1 of the data
+
+    The same image is often used by many contacts (e.g. default avatars of
+    bridged users), it only needs to be downloaded once. Data is verified
+    against its hash before it is stored, so a hit is always valid.
+
+    Images are kept in memory, the least recently used ones are dropped
+    once max_items is exceeded. If a path is set, images are also written to
+    this directory and loaded from there on a memory miss.
+
+    The cache also keeps track of running requests, so concurrent requests
+    for the same avatar can share one download.
+    """
+
+    def __init__(self, max_items: int = 256, path: Path | str | None = None) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+        self._max_items = max_items
+        self._path = Path(path) if path is not None else None
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._requests: dict[str, Task] = {}
+
+        if self._path is not None:
+            self._path.mkdir(parents=True, exist_ok=True)
+
+    def __contains__(self, sha: str) -> bool:
+        if sha in self._items:
+            return True
+        path = self._get_file_path(sha)
+        return path is not None and path.is_file()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, sha: str) -> bytes | None:
+        data = self._items.get(sha)
+        if data is not None:
+            self._items.move_to_end(sha)
+            return data
+
+        data = self._load(sha)
+        if data is not None:
+            self._store(sha, data)
+        return data
+
+    def add(self, data: bytes, sha: str | None = None) -> str:
+        """
+        Add data to the cache and return its SHA-1
+
+        Raises ValueError if sha is given and does not match the data
+        """
+        data_sha = _sha1(data)
+        if sha is not None and sha != data_sha:
+            raise ValueError(f"SHA-1 mismatch, expected {sha}, got {data_sha}")
+
+        self._store(data_sha, data)
+        self._save(data_sha, data)
+        return data_sha
+
+    def remove(self, sha: str) -> None:
+        self._items.pop(sha, None)
+        path = self._get_file_path(sha)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """
+        Clear the memory cache, images on disk are kept
+        """
+        self._items.clear()
+
+    def get_request(self, sha: str) -> Task | None:
+        """
+        Returns the running request for the avatar, if there is one
+        """
+        return self._requests.get(sha)
+
+    def set_request(self, sha: str, task: Task) -> None:
+        """
+        Remember a running request for the avatar until the task is finished
+        """
+        self._requests[sha] = task
+        task.add_done_callback(self._on_request_finished, weak=False)
+
+    def _on_request_finished(self, task: Task) -> None:
+        for sha, request in list(self._requests.items()):
+            if request is task:
+                del self._requests[sha]
+
+    def _store(self, sha: str, data: bytes) -> None:
+        self._items[sha] = data
+        self._items.move_to_end(sha)
+        while len(self._items) > self._max_items:
+            self._items.popitem(last=False)
+
+    def _get_file_path(self, sha: str) -> Path | None:
+        # The hash is received from remote entities, never use it
+        # as file name without validating it
+        if self._path is None or SHA1_RX.match(sha) is None:
+            return None
+        return self._path / sha
+
+    def _load(self, sha: str) -> bytes | None:
+        path = self._get_file_path(sha)
+        if path is None:
+            return None
+
+        try:
+            data = path.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except OSError as error:
+            log.warning("Unable to read avatar %s: %s", sha, error)
+            return None
+
+        if _sha1(data) != sha:
+            log.warning("Removing corrupted avatar %s", sha)
+            self.remove(sha)
+            return None
+        return data
+
+    def _save(self, sha: str, data: bytes) -> None:
+        path = self._get_file_path(sha)
+        if path is None or path.is_file():
+            return
+
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as error:
+            log.warning("Unable to write avatar %s: %s", sha, error)
+            tmp_path.unlink(missing_ok=True)
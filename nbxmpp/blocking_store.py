@@ -0,0 +1,76 @@
+# This file is part of nbxmpp.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from nbxmpp.protocol import JID
+from nbxmpp.structs import BlockingPush
+
+
+class BlockingStore:
+    """
+    Keeps the blocking list up to date (XEP-0191)
+
+    Set on the Blocking module, the results of request_blocking_list() and
+    all blocking pushes are applied to the store. is_blocked() matches a
+    sender against the list in constant time, with filter_senders the
+    client drops messages and presences of blocked senders.
+
+        store = BlockingStore()
+        client.get_module("Blocking").set_blocking_store(store, filter_senders=True)
+        client.get_module("Blocking").request_blocking_list()
+    """
+
+    def __init__(self, jids: Iterable[JID] | None = None) -> None:
+        self._jids: dict[str, JID] = {}
+        if jids is not None:
+            self.apply_result(jids)
+
+    def __contains__(self, jid: JID) -> bool:
+        return str(jid) in self._jids
+
+    def __iter__(self) -> Iterator[JID]:
+        return iter(self._jids.values())
+
+    def __len__(self) -> int:
+        return len(self._jids)
+
+    def apply_result(self, jids: Iterable[JID]) -> None:
+        self._jids = {str(jid): jid for jid in jids}
+
+    def apply_push(self, push: BlockingPush) -> None:
+        if push.unblock_all:
+            self._jids.clear()
+            return
+
+        for jid in push.unblock:
+            self._jids.pop(str(jid), None)
+
+        for jid in push.block:
+            self._jids[str(jid)] = jid
+
+    def is_blocked(self, jid: JID) -> bool:
+        """
+        Returns True if the list contains an item matching jid
+
+        Items match in the order of XEP-0016: full JID, bare JID,
+        domain/resource and domain.
+        """
+        jids = self._jids
+        if not jids:
+            return False
+
+        if str(jid) in jids:
+            return True
+
+        if jid.resource is not None:
+            if jid.bare in jids:
+                return True
+            if jid.localpart is not None and f"{jid.domain}/{jid.resource}" in jids:
+                return True
+
+        return jid.domain in jids
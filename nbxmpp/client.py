@@ -13,6 +13,7 @@ from typing import TYPE_CHECKING
 
 import logging
 from collections.abc import Callable
+from collections.abc import Iterable
 from collections.abc import Iterator
 from collections.abc import Sequence
 
@@ -42,6 +43,7 @@ from nbxmpp.protocol import StanzaMalformed
 from nbxmpp.protocol import TLSRequest
 from nbxmpp.protocol import WebsocketCloseHeader
 from nbxmpp.sasl import SASL
+from nbxmpp.scheduler import DeadlineScheduler
 from nbxmpp.simplexml import Node
 from nbxmpp.smacks import Smacks
 from nbxmpp.structs import ProxyData
@@ -53,9 +55,9 @@ from nbxmpp.util import get_stream_header
 from nbxmpp.util import LogAdapter
 from nbxmpp.util import Observable
 from nbxmpp.util import validate_stream_header
-from nbxmpp.websocket import WebsocketConnection
 
 if TYPE_CHECKING:
+    from nbxmpp.avatar_cache import AvatarCache
     from nbxmpp.connection import Connection
     from nbxmpp.dispatcher import NBXMPPModuleNameT
     from nbxmpp.dispatcher import NBXMPPModuleT
@@ -113,14 +115,20 @@ if TYPE_CHECKING:
     from nbxmpp.modules.vcard4 import VCard4
     from nbxmpp.modules.vcard_avatar import VCardAvatar
     from nbxmpp.modules.vcard_temp import VCardTemp
+    from nbxmpp.websocket import WebsocketConnection
 
 
 log = logging.getLogger("nbxmpp.stream")
 
 
 class Client(Observable):
-    def __init__(self, log_context: str | None = None) -> None:
+    def __init__(
+        self, log_context: str | None = None, modules: Iterable[str] | None = None
+    ) -> None:
         """
+        `modules` are the names of the modules the client uses, see
+        StanzaDispatcher. If not set, all modules are loaded.
+
         Signals:
             resume-failed
             resume-successful
@@ -193,8 +201,10 @@ class Client(Observable):
 
         self._ping_source_id: int | None = None
         self._tasks: list[Task] = []
+        self._scheduler = DeadlineScheduler(self._log)
+        self._avatar_cache: AvatarCache | None = None
 
-        self._dispatcher = StanzaDispatcher(self)
+        self._dispatcher = StanzaDispatcher(self, modules)
         self._dispatcher.subscribe("before-dispatch", self._on_before_dispatch)
         self._dispatcher.subscribe("parsing-error", self._on_parsing_error)
         self._dispatcher.subscribe("stream-end", self._on_stream_end)
@@ -213,6 +223,21 @@ class Client(Observable):
         except Exception:
             pass
 
+    @property
+    def scheduler(self) -> DeadlineScheduler:
+        return self._scheduler
+
+    @property
+    def avatar_cache(self) -> AvatarCache | None:
+        return self._avatar_cache
+
+    def set_avatar_cache(self, cache: AvatarCache | None) -> None:
+        """
+        Use the cache for avatar requests of UserAvatar and VCardTemp,
+        a cache can be shared between clients
+        """
+        self._avatar_cache = cache
+
     @property
     def log_context(self) -> str:
         assert self._log_context is not None
@@ -495,6 +520,9 @@ class Client(Observable):
 
     def _get_connection(self, *args: Any) -> WebsocketConnection | TCPConnection:
         if self.is_websocket:
+            # Soup is only imported if a websocket is used
+            from nbxmpp.websocket import WebsocketConnection  # noqa: PLC0415
+
             return WebsocketConnection(*args)
         return TCPConnection(*args)
 
@@ -798,7 +826,7 @@ class Client(Observable):
         self.notify("stanza-received", data)
 
     def _on_data_received(
-        self, _connection: Connection, _signal_name: str, data: str
+        self, _connection: Connection, _signal_name: str, data: str | bytes
     ) -> None:
         self._dispatcher.process_data(data)
         self._reset_ping_timer()
@@ -1137,6 +1165,15 @@ class Client(Observable):
     def unregister_handler(self, *args: Any, **kwargs: Any) -> None:
         self._dispatcher.unregister_handler(*args, **kwargs)
 
+    def register_mam_consumer(self, *args: Any, **kwargs: Any) -> None:
+        self._dispatcher.register_mam_consumer(*args, **kwargs)
+
+    def unregister_mam_consumer(self, *args: Any, **kwargs: Any) -> None:
+        self._dispatcher.unregister_mam_consumer(*args, **kwargs)
+
+    def set_sender_filter(self, *args: Any, **kwargs: Any) -> None:
+        self._dispatcher.set_sender_filter(*args, **kwargs)
+
     def destroy(self) -> None:
         for task in self._tasks:
             task.cancel()
@@ -1145,4 +1182,5 @@ class Client(Observable):
         self._sasl = None
         self._dispatcher.cleanup()
         self._dispatcher = None
+        self._scheduler.clear()
         self.remove_subscriptions()
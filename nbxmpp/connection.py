@@ -16,9 +16,18 @@ from nbxmpp.structs import ServerAddress
 from nbxmpp.util import LogAdapter
 from nbxmpp.util import min_version
 from nbxmpp.util import Observable
+from nbxmpp.util import StanzaDump
 
 log = logging.getLogger("nbxmpp.connection")
 
+# Sampled trace of the wire data, independent of the full dumps which are
+# logged at INFO. Enable it with logging.getLogger("nbxmpp.wire").setLevel(
+# logging.DEBUG), only every n-th chunk is logged and long data is truncated.
+wire_log = logging.getLogger("nbxmpp.wire")
+
+WIRE_TRACE_SAMPLE_RATE = 100
+WIRE_TRACE_MAX_LENGTH = 1024
+
 
 class Connection(Observable):
     """
@@ -43,6 +52,7 @@ class Connection(Observable):
         client_cert: Any,
     ) -> None:
 
+        self._log_context = log_context
         self._log = LogAdapter(log, {"context": log_context})
 
         Observable.__init__(self, self._log)
@@ -61,6 +71,8 @@ class Connection(Observable):
         self._ignore_tls_errors = ignore_tls_errors
         self._ignored_tls_errors = ignored_tls_errors
 
+        self._wire_trace_count = 0
+
     @property
     def tls_version(self) -> int | None:
         if self._tls_con is None:
@@ -162,10 +174,22 @@ class Connection(Observable):
     def send(self, stanza: Any, now: bool = False) -> None:
         raise NotImplementedError
 
-    def _log_stanza(self, data: str, received: bool = True) -> None:
+    def _log_stanza(self, data: str | bytes, received: bool = True) -> None:
         direction = "RECEIVED" if received else "SENT"
-        message = "::::: DATA %s ::::\n\n%s\n"
-        self._log.info(message, direction, data)
+        if self._log.isEnabledFor(logging.INFO):
+            message = "::::: DATA %s ::::\n\n%s\n"
+            self._log.info(message, direction, StanzaDump(data))
+
+        if wire_log.isEnabledFor(logging.DEBUG):
+            self._wire_trace_count += 1
+            if (self._wire_trace_count - 1) % WIRE_TRACE_SAMPLE_RATE == 0:
+                wire_log.debug(
+                    "(%s) %s #%s: %s",
+                    self._log_context,
+                    direction,
+                    self._wire_trace_count,
+                    StanzaDump(data, max_length=WIRE_TRACE_MAX_LENGTH),
+                )
 
     def start_tls_negotiation(self) -> None:
         raise NotImplementedError
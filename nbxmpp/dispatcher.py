@@ -8,74 +8,21 @@ from __future__ import annotations
 
 from typing import Any
 from typing import Literal
+from typing import NamedTuple
 from typing import overload
 from typing import TYPE_CHECKING
 
+import importlib
 import logging
-import time
 from collections.abc import Callable
+from collections.abc import Iterable
+from functools import partial
+from operator import itemgetter
 from xml.parsers.expat import ExpatError
 
-from gi.repository import GLib
-
 from nbxmpp.exceptions import StanzaDecrypted
-from nbxmpp.modules.activity import Activity
-from nbxmpp.modules.adhoc import AdHoc
-from nbxmpp.modules.annotations import Annotations
-from nbxmpp.modules.attention import Attention
-from nbxmpp.modules.blocking import Blocking
-from nbxmpp.modules.bookmarks.native_bookmarks import NativeBookmarks
-from nbxmpp.modules.bookmarks.pep_bookmarks import PEPBookmarks
-from nbxmpp.modules.bookmarks.private_bookmarks import PrivateBookmarks
-from nbxmpp.modules.captcha import Captcha
-from nbxmpp.modules.chat_markers import ChatMarkers
-from nbxmpp.modules.chatstates import Chatstates
-from nbxmpp.modules.correction import Correction
-from nbxmpp.modules.delay import Delay
-from nbxmpp.modules.delimiter import Delimiter
-from nbxmpp.modules.discovery import Discovery
-from nbxmpp.modules.eme import EME
-from nbxmpp.modules.entity_caps import EntityCaps
-from nbxmpp.modules.entity_time import EntityTime
-from nbxmpp.modules.http_auth import HTTPAuth
-from nbxmpp.modules.http_upload import HTTPUpload
-from nbxmpp.modules.ibb import IBB
-from nbxmpp.modules.idle import Idle
-from nbxmpp.modules.iq import BaseIq
-from nbxmpp.modules.last_activity import LastActivity
-from nbxmpp.modules.location import Location
-from nbxmpp.modules.mam import MAM
-from nbxmpp.modules.mds import MDS
-from nbxmpp.modules.message import BaseMessage
 from nbxmpp.modules.misc import unwrap_carbon
 from nbxmpp.modules.misc import unwrap_mam
-from nbxmpp.modules.mood import Mood
-from nbxmpp.modules.muc import MUC
-from nbxmpp.modules.muc.hats import Hats
-from nbxmpp.modules.muc.moderation import Moderation
-from nbxmpp.modules.muclumbus import Muclumbus
-from nbxmpp.modules.nickname import Nickname
-from nbxmpp.modules.ogp import OpenGraph
-from nbxmpp.modules.omemo import OMEMO
-from nbxmpp.modules.oob import OOB
-from nbxmpp.modules.openpgp import OpenPGP
-from nbxmpp.modules.pgplegacy import PGPLegacy
-from nbxmpp.modules.ping import Ping
-from nbxmpp.modules.presence import BasePresence
-from nbxmpp.modules.pubsub import PubSub
-from nbxmpp.modules.reactions import Reactions
-from nbxmpp.modules.receipts import Receipts
-from nbxmpp.modules.register import Register
-from nbxmpp.modules.replies import Replies
-from nbxmpp.modules.retraction import Retraction
-from nbxmpp.modules.roster import Roster
-from nbxmpp.modules.security_labels import SecurityLabels
-from nbxmpp.modules.software_version import SoftwareVersion
-from nbxmpp.modules.tune import Tune
-from nbxmpp.modules.user_avatar import UserAvatar
-from nbxmpp.modules.vcard4 import VCard4
-from nbxmpp.modules.vcard_avatar import VCardAvatar
-from nbxmpp.modules.vcard_temp import VCardTemp
 from nbxmpp.namespaces import Namespace
 from nbxmpp.protocol import ERR_FEATURE_NOT_IMPLEMENTED
 from nbxmpp.protocol import Error
@@ -83,6 +30,7 @@ from nbxmpp.protocol import InvalidFrom
 from nbxmpp.protocol import InvalidJid
 from nbxmpp.protocol import InvalidStanza
 from nbxmpp.protocol import Iq
+from nbxmpp.protocol import JID
 from nbxmpp.protocol import Message
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.protocol import Presence
@@ -92,6 +40,8 @@ from nbxmpp.simplexml import Node
 from nbxmpp.simplexml import NodeBuilder
 from nbxmpp.structs import StanzaHandler
 from nbxmpp.util import get_properties_struct
+from nbxmpp.util import INVALID_XML_BYTES_MARKERS
+from nbxmpp.util import INVALID_XML_BYTES_RX
 from nbxmpp.util import INVALID_XML_RX
 from nbxmpp.util import is_websocket_close
 from nbxmpp.util import is_websocket_stream_error
@@ -100,6 +50,119 @@ from nbxmpp.util import Observable
 
 if TYPE_CHECKING:
     from nbxmpp.client import Client
+    from nbxmpp.modules.activity import Activity
+    from nbxmpp.modules.adhoc import AdHoc
+    from nbxmpp.modules.annotations import Annotations
+    from nbxmpp.modules.attention import Attention
+    from nbxmpp.modules.blocking import Blocking
+    from nbxmpp.modules.bookmarks.native_bookmarks import NativeBookmarks
+    from nbxmpp.modules.bookmarks.pep_bookmarks import PEPBookmarks
+    from nbxmpp.modules.bookmarks.private_bookmarks import PrivateBookmarks
+    from nbxmpp.modules.captcha import Captcha
+    from nbxmpp.modules.chat_markers import ChatMarkers
+    from nbxmpp.modules.chatstates import Chatstates
+    from nbxmpp.modules.correction import Correction
+    from nbxmpp.modules.delay import Delay
+    from nbxmpp.modules.delimiter import Delimiter
+    from nbxmpp.modules.discovery import Discovery
+    from nbxmpp.modules.eme import EME
+    from nbxmpp.modules.entity_caps import EntityCaps
+    from nbxmpp.modules.entity_time import EntityTime
+    from nbxmpp.modules.http_auth import HTTPAuth
+    from nbxmpp.modules.http_upload import HTTPUpload
+    from nbxmpp.modules.ibb import IBB
+    from nbxmpp.modules.idle import Idle
+    from nbxmpp.modules.iq import BaseIq
+    from nbxmpp.modules.last_activity import LastActivity
+    from nbxmpp.modules.location import Location
+    from nbxmpp.modules.mam import MAM
+    from nbxmpp.modules.mds import MDS
+    from nbxmpp.modules.message import BaseMessage
+    from nbxmpp.modules.mood import Mood
+    from nbxmpp.modules.muc import MUC
+    from nbxmpp.modules.muc.hats import Hats
+    from nbxmpp.modules.muc.moderation import Moderation
+    from nbxmpp.modules.muclumbus import Muclumbus
+    from nbxmpp.modules.nickname import Nickname
+    from nbxmpp.modules.ogp import OpenGraph
+    from nbxmpp.modules.omemo import OMEMO
+    from nbxmpp.modules.oob import OOB
+    from nbxmpp.modules.openpgp import OpenPGP
+    from nbxmpp.modules.pgplegacy import PGPLegacy
+    from nbxmpp.modules.ping import Ping
+    from nbxmpp.modules.presence import BasePresence
+    from nbxmpp.modules.pubsub import PubSub
+    from nbxmpp.modules.reactions import Reactions
+    from nbxmpp.modules.receipts import Receipts
+    from nbxmpp.modules.register import Register
+    from nbxmpp.modules.replies import Replies
+    from nbxmpp.modules.retraction import Retraction
+    from nbxmpp.modules.roster import Roster
+    from nbxmpp.modules.security_labels import SecurityLabels
+    from nbxmpp.modules.software_version import SoftwareVersion
+    from nbxmpp.modules.tune import Tune
+    from nbxmpp.modules.user_avatar import UserAvatar
+    from nbxmpp.modules.vcard4 import VCard4
+    from nbxmpp.modules.vcard_avatar import VCardAvatar
+    from nbxmpp.modules.vcard_temp import VCardTemp
+
+    NBXMPPModuleT = (
+        Activity
+        | AdHoc
+        | Annotations
+        | Attention
+        | BasePresence
+        | BaseMessage
+        | BaseIq
+        | Blocking
+        | Captcha
+        | ChatMarkers
+        | Chatstates
+        | Correction
+        | Delay
+        | Delimiter
+        | Discovery
+        | EME
+        | EntityCaps
+        | EntityTime
+        | Hats
+        | HTTPAuth
+        | HTTPUpload
+        | IBB
+        | Idle
+        | LastActivity
+        | Location
+        | MAM
+        | MDS
+        | Moderation
+        | Mood
+        | MUC
+        | Muclumbus
+        | NativeBookmarks
+        | Nickname
+        | OMEMO
+        | OOB
+        | OpenGraph
+        | OpenPGP
+        | PEPBookmarks
+        | PGPLegacy
+        | Ping
+        | PrivateBookmarks
+        | PubSub
+        | Reactions
+        | Receipts
+        | Register
+        | Replies
+        | Retraction
+        | Roster
+        | SecurityLabels
+        | SoftwareVersion
+        | Tune
+        | UserAvatar
+        | VCardAvatar
+        | VCardTemp
+        | VCard4
+    )
 
 log = logging.getLogger("nbxmpp.dispatcher")
 
@@ -160,64 +223,212 @@ NBXMPPModuleNameT = Literal[
     "VCardTemp",
     "VCard4",
 ]
-NBXMPPModuleT = (
-    Activity
-    | AdHoc
-    | Annotations
-    | Attention
-    | BasePresence
-    | BaseMessage
-    | BaseIq
-    | Blocking
-    | Captcha
-    | ChatMarkers
-    | Chatstates
-    | Correction
-    | Delay
-    | Delimiter
-    | Discovery
-    | EME
-    | EntityCaps
-    | EntityTime
-    | Hats
-    | HTTPAuth
-    | HTTPUpload
-    | IBB
-    | Idle
-    | LastActivity
-    | Location
-    | MAM
-    | MDS
-    | Moderation
-    | Mood
-    | MUC
-    | Muclumbus
-    | NativeBookmarks
-    | Nickname
-    | OMEMO
-    | OOB
-    | OpenGraph
-    | OpenPGP
-    | PEPBookmarks
-    | PGPLegacy
-    | Ping
-    | PrivateBookmarks
-    | PubSub
-    | Reactions
-    | Receipts
-    | Register
-    | Replies
-    | Retraction
-    | Roster
-    | SecurityLabels
-    | SoftwareVersion
-    | Tune
-    | UserAvatar
-    | VCardAvatar
-    | VCardTemp
-    | VCard4
+
+
+# Modules are imported when they are loaded the first time
+MODULES: dict[str, str] = {
+    "Activity": "nbxmpp.modules.activity",
+    "AdHoc": "nbxmpp.modules.adhoc",
+    "Annotations": "nbxmpp.modules.annotations",
+    "Attention": "nbxmpp.modules.attention",
+    "BasePresence": "nbxmpp.modules.presence",
+    "BaseMessage": "nbxmpp.modules.message",
+    "BaseIq": "nbxmpp.modules.iq",
+    "Blocking": "nbxmpp.modules.blocking",
+    "Captcha": "nbxmpp.modules.captcha",
+    "ChatMarkers": "nbxmpp.modules.chat_markers",
+    "Chatstates": "nbxmpp.modules.chatstates",
+    "Correction": "nbxmpp.modules.correction",
+    "Delay": "nbxmpp.modules.delay",
+    "Delimiter": "nbxmpp.modules.delimiter",
+    "Discovery": "nbxmpp.modules.discovery",
+    "EME": "nbxmpp.modules.eme",
+    "EntityCaps": "nbxmpp.modules.entity_caps",
+    "EntityTime": "nbxmpp.modules.entity_time",
+    "Hats": "nbxmpp.modules.muc.hats",
+    "HTTPAuth": "nbxmpp.modules.http_auth",
+    "HTTPUpload": "nbxmpp.modules.http_upload",
+    "IBB": "nbxmpp.modules.ibb",
+    "Idle": "nbxmpp.modules.idle",
+    "LastActivity": "nbxmpp.modules.last_activity",
+    "Location": "nbxmpp.modules.location",
+    "MAM": "nbxmpp.modules.mam",
+    "MDS": "nbxmpp.modules.mds",
+    "Moderation": "nbxmpp.modules.muc.moderation",
+    "Mood": "nbxmpp.modules.mood",
+    "MUC": "nbxmpp.modules.muc",
+    "Muclumbus": "nbxmpp.modules.muclumbus",
+    "NativeBookmarks": "nbxmpp.modules.bookmarks.native_bookmarks",
+    "Nickname": "nbxmpp.modules.nickname",
+    "OMEMO": "nbxmpp.modules.omemo",
+    "OOB": "nbxmpp.modules.oob",
+    "OpenGraph": "nbxmpp.modules.ogp",
+    "OpenPGP": "nbxmpp.modules.openpgp",
+    "PEPBookmarks": "nbxmpp.modules.bookmarks.pep_bookmarks",
+    "PGPLegacy": "nbxmpp.modules.pgplegacy",
+    "Ping": "nbxmpp.modules.ping",
+    "PrivateBookmarks": "nbxmpp.modules.bookmarks.private_bookmarks",
+    "PubSub": "nbxmpp.modules.pubsub",
+    "Reactions": "nbxmpp.modules.reactions",
+    "Receipts": "nbxmpp.modules.receipts",
+    "Register": "nbxmpp.modules.register",
+    "Replies": "nbxmpp.modules.replies",
+    "Retraction": "nbxmpp.modules.retraction",
+    "Roster": "nbxmpp.modules.roster",
+    "SecurityLabels": "nbxmpp.modules.security_labels",
+    "SoftwareVersion": "nbxmpp.modules.software_version",
+    "Tune": "nbxmpp.modules.tune",
+    "UserAvatar": "nbxmpp.modules.user_avatar",
+    "VCardAvatar": "nbxmpp.modules.vcard_avatar",
+    "VCardTemp": "nbxmpp.modules.vcard_temp",
+    "VCard4": "nbxmpp.modules.vcard4",
+}
+
+
+def _get_module_class(name: str) -> type[NBXMPPModuleT]:
+    return getattr(importlib.import_module(MODULES[name]), name)
+
+
+def __getattr__(name: str) -> Any:
+    # The module classes used to be imported here, keep them available
+    if name in MODULES:
+        return _get_module_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Modules which are always loaded, they parse the basic stanza properties
+CORE_MODULES = frozenset(
+    {
+        "BaseIq",
+        "BaseMessage",
+        "BasePresence",
+    }
+)
+
+# Modules whose handlers run on archived messages routed to a MAM consumer,
+# they parse body, stanza-ids, delay, corrections and retractions
+DEFAULT_MAM_CONSUMER_MODULES = frozenset(
+    {
+        "BaseMessage",
+        "Delay",
+        "Correction",
+        "Retraction",
+    }
 )
 
+# Handlers in a handler chain: priority, callback and module name
+HandlerChainT = list[tuple[int, Callable[..., Any], str | None]]
+ProtocolTypesT = dict[str, dict[str, type[Protocol]]]
+
+
+def _get_handler_type(handler: StanzaHandler) -> tuple[str, str]:
+    """
+    Returns the namespace and type a handler is registered for
+    """
+    xmlns = handler.xmlns or Namespace.CLIENT
+    typ = handler.typ
+    if not typ and not handler.ns:
+        typ = "default"
+    return xmlns, typ
+
+
+def _add_protocol_type(types: ProtocolTypesT, xmlns: str, name: str) -> None:
+    protocols = types.get(xmlns)
+    if protocols is None:
+        protocols = types[xmlns] = {
+            "error": Protocol,
+            "unknown": Protocol,
+            "default": Protocol,
+        }
+    protocols.setdefault(name, Protocol)
+
+
+def _get_function(callback: Callable[..., Any]) -> Callable[..., Any]:
+    return getattr(callback, "__func__", callback)
+
+
+def _is_method_of(module: Any, callback: Callable[..., Any]) -> bool:
+    if getattr(callback, "__self__", None) is module:
+        return True
+    # Static methods
+    name = getattr(callback, "__name__", None)
+    return name is not None and getattr(type(module), name, None) is callback
+
+
+class _HandlerRoute(NamedTuple):
+    priority: int
+    slot: int
+    module: str
+
+
+class _RoutingTable:
+    """
+    Routes stanzas to the handlers of modules
+
+    The table depends only on the module classes and the order they were
+    loaded in. It is compiled once per process and shared by all dispatchers
+    which loaded the same modules. Handlers are referenced by their slot,
+    every dispatcher keeps the handlers bound to its module instances in a
+    list with the same order.
+
+    A table is never modified, loading another module switches to the
+    table returned by extend().
+    """
+
+    def __init__(
+        self,
+        types: ProtocolTypesT,
+        routes: dict[str, dict[str, dict[str, tuple[_HandlerRoute, ...]]]],
+        funcs: tuple[Callable[..., Any], ...],
+    ) -> None:
+        self.types = types
+        self.routes = routes
+        self.funcs = funcs
+        self._extensions: dict[type, _RoutingTable] = {}
+
+    @classmethod
+    def create_root(cls) -> _RoutingTable:
+        types: ProtocolTypesT = {}
+        for xmlns in ("unknown", Namespace.STREAMS, Namespace.CLIENT):
+            _add_protocol_type(types, xmlns, "default")
+        types[Namespace.CLIENT].update(iq=Iq, presence=Presence, message=Message)
+        return cls(types, {}, ())
+
+    def extend(
+        self, module_class: type, handlers: list[StanzaHandler]
+    ) -> _RoutingTable:
+        """
+        Returns the table with the handlers of module_class added, the
+        table is only compiled the first time a module class is added
+        """
+        table = self._extensions.get(module_class)
+        if table is not None:
+            return table
+
+        types = {xmlns: dict(protocols) for xmlns, protocols in self.types.items()}
+        routes = {
+            xmlns: {name: dict(specifics) for name, specifics in names.items()}
+            for xmlns, names in self.routes.items()
+        }
+        funcs = list(self.funcs)
+
+        for handler in handlers:
+            xmlns, typ = _get_handler_type(handler)
+            _add_protocol_type(types, xmlns, handler.name)
+
+            specifics = routes.setdefault(xmlns, {}).setdefault(handler.name, {})
+            specific = typ + handler.ns
+            route = _HandlerRoute(handler.priority, len(funcs), module_class.__name__)
+            specifics[specific] = specifics.get(specific, ()) + (route,)
+            funcs.append(_get_function(handler.callback))
+
+        table = _RoutingTable(types, routes, tuple(funcs))
+        self._extensions[module_class] = table
+        return table
+
+
+_ROOT_ROUTING_TABLE = _RoutingTable.create_root()
+
 
 class StanzaDispatcher(Observable):
     """
@@ -230,20 +441,35 @@ class StanzaDispatcher(Observable):
 
     """
 
-    def __init__(self, client: Client) -> None:
+    def __init__(self, client: Client, modules: Iterable[str] | None = None) -> None:
+        """
+        All modules are loaded, unless the client declares the `modules`
+        it uses. Then only these and the CORE_MODULES are loaded, other
+        modules are loaded on the first call to get_module(). Their
+        handlers are registered at that point, so until then stanzas
+        are not parsed by them.
+        """
         Observable.__init__(self, log)
         self._client = client
         self._modules: dict[str, NBXMPPModuleT] = {}
         self._parser: NodeBuilder | None = None
         self._websocket_stream_error: str | None = None
+        self._websocket_close_received = False
 
         self._log = LogAdapter(log, {"context": client.log_context})
 
-        self._handlers: dict[str, dict[str, dict[str, Any]]] = {}
+        # Handlers of modules are routed by a shared table, only the
+        # callbacks bound to our module instances are kept per dispatcher.
+        # Handlers added with register_handler() are kept in _handlers.
+        self._routing = _ROOT_ROUTING_TABLE
+        self._bound_handlers: list[Callable[..., Any] | None] = []
+        self._types: ProtocolTypesT = self._routing.types
+        self._handlers: dict[str, dict[str, dict[str, list[dict[str, Any]]]]] = {}
 
-        self._id_callbacks: dict[str, tuple[Callable[..., Any], float | None, Any]] = {}
+        self._id_callbacks: dict[str, tuple[Callable[..., Any], int | None, Any]] = {}
         self._dispatch_callback: Callable[..., Any] | None = None
-        self._timeout_id: int | None = None
+        self._mam_consumers: dict[str, tuple[Callable[..., Any], frozenset[str]]] = {}
+        self._sender_filter: Callable[[JID], bool] | None = None
 
         self._stanza_types = {
             "iq": Iq,
@@ -252,14 +478,7 @@ class StanzaDispatcher(Observable):
             "error": StreamErrorNode,
         }
 
-        self._register_namespace("unknown")
-        self._register_namespace(Namespace.STREAMS)
-        self._register_namespace(Namespace.CLIENT)
-        self._register_protocol("iq", Iq)
-        self._register_protocol("presence", Presence)
-        self._register_protocol("message", Message)
-
-        self._register_modules()
+        self._register_modules(modules)
 
     def set_dispatch_callback(self, callback: Callable[..., Any]) -> None:
         self._log.info("Set dispatch callback: %s", callback)
@@ -377,69 +596,46 @@ class StanzaDispatcher(Observable):
     def get_module(self, name: Literal["VCardTemp"]) -> VCardTemp: ...
 
     def get_module(self, name: NBXMPPModuleNameT) -> NBXMPPModuleT:
-        return self._modules[name]
+        module = self._modules.get(name)
+        if module is not None:
+            return module
 
-    def _register_modules(self):
+        if self._client is None or name not in MODULES:
+            raise KeyError(name)
+
+        # Not declared by the client, load it on first use
+        self._log.info("Load module: %s", name)
+        return self._load_module(name)
+
+    def _register_modules(self, modules: Iterable[str] | None) -> None:
         assert self._client is not None
-        self._modules["Activity"] = Activity(self._client)
-        self._modules["AdHoc"] = AdHoc(self._client)
-        self._modules["Annotations"] = Annotations(self._client)
-        self._modules["Attention"] = Attention(self._client)
-        self._modules["BasePresence"] = BasePresence(self._client)
-        self._modules["BaseMessage"] = BaseMessage(self._client)
-        self._modules["BaseIq"] = BaseIq(self._client)
-        self._modules["Blocking"] = Blocking(self._client)
-        self._modules["Captcha"] = Captcha(self._client)
-        self._modules["ChatMarkers"] = ChatMarkers(self._client)
-        self._modules["Chatstates"] = Chatstates(self._client)
-        self._modules["Correction"] = Correction(self._client)
-        self._modules["Delay"] = Delay(self._client)
-        self._modules["Delimiter"] = Delimiter(self._client)
-        self._modules["Discovery"] = Discovery(self._client)
-        self._modules["EME"] = EME(self._client)
-        self._modules["EntityCaps"] = EntityCaps(self._client)
-        self._modules["EntityTime"] = EntityTime(self._client)
-        self._modules["Hats"] = Hats(self._client)
-        self._modules["HTTPAuth"] = HTTPAuth(self._client)
-        self._modules["HTTPUpload"] = HTTPUpload(self._client)
-        self._modules["IBB"] = IBB(self._client)
-        self._modules["Idle"] = Idle(self._client)
-        self._modules["LastActivity"] = LastActivity(self._client)
-        self._modules["Location"] = Location(self._client)
-        self._modules["MAM"] = MAM(self._client)
-        self._modules["MDS"] = MDS(self._client)
-        self._modules["Moderation"] = Moderation(self._client)
-        self._modules["Mood"] = Mood(self._client)
-        self._modules["MUC"] = MUC(self._client)
-        self._modules["Muclumbus"] = Muclumbus(self._client)
-        self._modules["NativeBookmarks"] = NativeBookmarks(self._client)
-        self._modules["Nickname"] = Nickname(self._client)
-        self._modules["OMEMO"] = OMEMO(self._client)
-        self._modules["OOB"] = OOB(self._client)
-        self._modules["OpenGraph"] = OpenGraph(self._client)
-        self._modules["OpenPGP"] = OpenPGP(self._client)
-        self._modules["PEPBookmarks"] = PEPBookmarks(self._client)
-        self._modules["PGPLegacy"] = PGPLegacy(self._client)
-        self._modules["Ping"] = Ping(self._client)
-        self._modules["PrivateBookmarks"] = PrivateBookmarks(self._client)
-        self._modules["PubSub"] = PubSub(self._client)
-        self._modules["Reactions"] = Reactions(self._client)
-        self._modules["Receipts"] = Receipts(self._client)
-        self._modules["Register"] = Register(self._client)
-        self._modules["Replies"] = Replies(self._client)
-        self._modules["Retraction"] = Retraction(self._client)
-        self._modules["Roster"] = Roster(self._client)
-        self._modules["SecurityLabels"] = SecurityLabels(self._client)
-        self._modules["SoftwareVersion"] = SoftwareVersion(self._client)
-        self._modules["Tune"] = Tune(self._client)
-        self._modules["UserAvatar"] = UserAvatar(self._client)
-        self._modules["VCardAvatar"] = VCardAvatar(self._client)
-        self._modules["VCardTemp"] = VCardTemp(self._client)
-        self._modules["VCard4"] = VCard4(self._client)
-
-        for instance in self._modules.values():
-            for handler in instance.handlers:
-                self.register_handler(handler)
+        if modules is None:
+            names = MODULES.keys()
+        else:
+            names = [name for name in MODULES if name in CORE_MODULES]
+            names += [name for name in modules if name not in CORE_MODULES]
+
+        for name in names:
+            self._modules[name] = _get_module_class(name)(self._client)
+
+        for module in list(self._modules.values()):
+            self._register_module_handlers(module)
+
+    def _load_module(self, name: str) -> NBXMPPModuleT:
+        assert self._client is not None
+        module = _get_module_class(name)(self._client)
+        self._modules[name] = module
+        self._register_module_handlers(module)
+        return module
+
+    def _register_module_handlers(self, module: NBXMPPModuleT) -> None:
+        if module.handlers:
+            self._route_module_handlers(module)
+
+        if module.pubsub_event_handlers:
+            pubsub = self.get_module("PubSub")
+            for handler in module.pubsub_event_handlers:
+                pubsub.register_event_handler(handler)
 
     def reset_parser(self) -> None:
         if self._parser is not None:
@@ -447,33 +643,55 @@ class StanzaDispatcher(Observable):
             self._parser.destroy()
             self._parser = None
 
-        self._parser = NodeBuilder(dispatch_depth=2, finished=False)
-        self._parser.dispatch = self.dispatch
+        if self._client.is_websocket:
+            # RFC 7395: every websocket message is one complete element,
+            # one parser is reused for all of them
+            self._parser = NodeBuilder(
+                dispatch_depth=2,
+                framed=True,
+                get_stanza_class=self._get_stanza_class,
+            )
+            self._parser.dispatch = self._dispatch_websocket_frame
+        else:
+            self._parser = NodeBuilder(
+                dispatch_depth=2,
+                finished=False,
+                get_stanza_class=self._get_stanza_class,
+            )
+            self._parser.dispatch = self.dispatch
+
+    def _get_stanza_class(self, xmlns: str, name: str) -> type[Node]:
+        """
+        Returns the class the parser uses to build a top level element,
+        so the stanza does not need to be copied into its Protocol class
+        before it is dispatched
+        """
+        if self._dispatch_callback is not None:
+            protocol_class = self._stanza_types.get(name)
+            if protocol_class is None or not issubclass(protocol_class, Protocol):
+                return Node
+            return protocol_class
+
+        protocols = self._types.get(xmlns) or self._types["unknown"]
+        return protocols.get(name) or protocols["unknown"]
 
     def replace_non_character(self, data: str) -> str:
         return INVALID_XML_RX.sub("\ufffd", data)
 
-    def process_data(self, data: str) -> None:
-        # Parse incoming data
+    def replace_non_character_bytes(self, data: bytes) -> bytes:
+        if not any(marker in data for marker in INVALID_XML_BYTES_MARKERS):
+            return data
+        return INVALID_XML_BYTES_RX.sub(b"\xef\xbf\xbd", data)
 
-        data = self.replace_non_character(data)
+    def process_data(self, data: str | bytes) -> None:
+        # Parse incoming data
 
         if self._client.is_websocket:
-            stanza = Node(node=data)
-            if is_websocket_stream_error(stanza):
-                for tag in stanza.getChildren():
-                    name = tag.getName()
-                    if name != "text" and tag.getNamespace() == Namespace.XMPP_STREAMS:
-                        self._websocket_stream_error = name
-
-            elif is_websocket_close(stanza):
-                self._log.info("Stream <close> received")
-                self.notify("stream-end", self._websocket_stream_error)
-                return
-
-            self.dispatch(stanza)
+            self._process_websocket_data(data)
             return
 
+        data = self.replace_non_character(data)
+
         try:
             self._parser.Parse(data)
         except (ExpatError, ValueError) as error:
@@ -487,37 +705,99 @@ class StanzaDispatcher(Observable):
             self.notify("stream-end", self._parser.stream_error)
             return
 
-    def _register_namespace(self, xmlns: str) -> None:
-        """
-        Setup handler structure for namespace
-        """
-        self._log.debug('Register namespace "%s"', xmlns)
-        self._handlers[xmlns] = {}
-        self._register_protocol("error", Protocol, xmlns=xmlns)
-        self._register_protocol("unknown", Protocol, xmlns=xmlns)
-        self._register_protocol("default", Protocol, xmlns=xmlns)
-
-    def _register_protocol(
-        self, tag_name: str, protocol: Any, xmlns: str | None = None
-    ) -> None:
+    def _process_websocket_data(self, data: str | bytes) -> None:
+        # Expat decodes UTF-8 itself, the websocket payload is passed
+        # as bytes without decoding it first
+        if isinstance(data, bytes):
+            data = self.replace_non_character_bytes(data)
+        else:
+            data = self.replace_non_character(data)
+
+        self._websocket_close_received = False
+
+        try:
+            self._parser.Parse(data)
+        except (ExpatError, ValueError) as error:
+            self._log.error("XML parsing error: %s", error)
+            self.notify("parsing-error", str(error))
+            return
+
+        if self._websocket_close_received:
+            self._log.info("Stream <close> received")
+            self.notify("stream-end", self._websocket_stream_error)
+            return
+
+        # Every frame must contain a complete element
+        if not self._parser.has_received_endtag(level=1):
+            self._log.error("Incomplete websocket frame")
+            self.notify("parsing-error", "Incomplete websocket frame")
+
+    def _dispatch_websocket_frame(self, stanza: Node) -> None:
+        if is_websocket_stream_error(stanza):
+            for tag in stanza.getChildren():
+                name = tag.getName()
+                if name != "text" and tag.getNamespace() == Namespace.XMPP_STREAMS:
+                    self._websocket_stream_error = name
+
+        elif is_websocket_close(stanza):
+            # Notify after parsing finished, the parser may be
+            # destroyed as consequence
+            self._websocket_close_received = True
+            return
+
+        self.dispatch(stanza)
+
+    def _route_module_handlers(self, module: NBXMPPModuleT) -> None:
+        # Methods of the module can be routed by a shared table, other
+        # callbacks are registered per dispatcher
+        routed: list[StanzaHandler] = []
+        other: list[StanzaHandler] = []
+        for handler in module.handlers:
+            if _is_method_of(module, handler.callback):
+                routed.append(handler)
+            else:
+                other.append(handler)
+
+        table = self._routing.extend(type(module), routed)
+        callbacks = [handler.callback for handler in routed]
+        funcs = tuple(map(_get_function, callbacks))
+        if table.funcs[len(self._bound_handlers) :] == funcs:
+            self._set_routing_table(table)
+            self._bound_handlers.extend(callbacks)
+        else:
+            # The table was compiled for another handler layout
+            other = module.handlers
+
+        for handler in other:
+            self.register_handler(handler)
+
+    def _set_routing_table(self, table: _RoutingTable) -> None:
+        if self._types is self._routing.types:
+            self._types = table.types
+        else:
+            for xmlns, protocols in table.types.items():
+                for name in protocols:
+                    _add_protocol_type(self._types, xmlns, name)
+        self._routing = table
+
+    def _register_protocol(self, xmlns: str, name: str) -> None:
         """
-        Register protocol for top level tag names
+        Register Protocol as type for a top level tag name
         """
-        if xmlns is None:
-            xmlns = Namespace.CLIENT
-        self._log.debug('Register protocol "%s (%s)" as %s', tag_name, xmlns, protocol)
-        self._handlers[xmlns][tag_name] = {"type": protocol, "default": []}
+        if self._types is self._routing.types:
+            # Copy on write, the types of the routing table are shared
+            self._types = {
+                xmlns: dict(protocols) for xmlns, protocols in self._types.items()
+            }
+        self._log.debug('Register protocol "%s (%s)"', name, xmlns)
+        _add_protocol_type(self._types, xmlns, name)
 
     def register_handler(self, handler: StanzaHandler) -> None:
         """
         Register handler
         """
 
-        xmlns = handler.xmlns or Namespace.CLIENT
-
-        typ = handler.typ
-        if not typ and not handler.ns:
-            typ = "default"
+        xmlns, typ = _get_handler_type(handler)
 
         self._log.debug(
             'Register handler %s for "%s" type->%s ns->%s(%s) priority->%s',
@@ -529,20 +809,18 @@ class StanzaDispatcher(Observable):
             handler.priority,
         )
 
-        if xmlns not in self._handlers:
-            self._register_namespace(xmlns)
-        if handler.name not in self._handlers[xmlns]:
-            self._register_protocol(handler.name, Protocol, xmlns)
+        if handler.name not in self._types.get(xmlns, ()):
+            self._register_protocol(xmlns, handler.name)
 
         specific = typ + handler.ns
-        if specific not in self._handlers[xmlns][handler.name]:
-            self._handlers[xmlns][handler.name][specific] = []
-
-        self._handlers[xmlns][handler.name][specific].append(
+        specifics = self._handlers.setdefault(xmlns, {}).setdefault(handler.name, {})
+        module = getattr(handler.callback, "__self__", None)
+        specifics.setdefault(specific, []).append(
             {
                 "func": handler.callback,
                 "priority": handler.priority,
                 "specific": specific,
+                "module": type(module).__name__ if module is not None else None,
             }
         )
 
@@ -551,42 +829,69 @@ class StanzaDispatcher(Observable):
         Unregister handler
         """
 
-        xmlns = handler.xmlns or Namespace.CLIENT
+        xmlns, typ = _get_handler_type(handler)
+        specific = typ + handler.ns
 
-        typ = handler.typ
-        if not typ and not handler.ns:
-            typ = "default"
+        handlers = self._handlers.get(xmlns, {}).get(handler.name, {}).get(specific)
+        for handler_dict in handlers or ():
+            if handler_dict["func"] == handler.callback:
+                handlers.remove(handler_dict)
+                break
+
+        else:
+            # Handlers of modules keep their slot, it is emptied
+            routes = self._routing.routes.get(xmlns, {}).get(handler.name, {})
+            for route in routes.get(specific, ()):
+                if self._bound_handlers[route.slot] == handler.callback:
+                    self._bound_handlers[route.slot] = None
+                    break
+            else:
+                return
 
-        specific = typ + handler.ns
-        try:
-            self._handlers[xmlns][handler.name][specific]
-        except KeyError:
-            return
+        self._log.debug(
+            'Unregister handler %s for "%s" type->%s ns->%s(%s)',
+            handler.callback,
+            handler.name,
+            typ,
+            handler.ns,
+            xmlns,
+        )
+
+    def register_mam_consumer(
+        self,
+        query_id: str,
+        callback: Callable[..., Any],
+        modules: Iterable[str] = DEFAULT_MAM_CONSUMER_MODULES,
+    ) -> None:
+        """
+        Route archived messages of a MAM query directly to callback
 
-        for handler_dict in self._handlers[xmlns][handler.name][specific]:
-            if handler_dict["func"] != handler.callback:
-                continue
+        Instead of the whole handler chain only the message handlers of
+        `modules` run, afterwards callback is called with the same
+        arguments as a stanza handler.
+        """
+        self._mam_consumers[query_id] = (callback, frozenset(modules))
 
-            try:
-                self._handlers[xmlns][handler.name][specific].remove(handler_dict)
-            except ValueError:
-                self._log.warning(
-                    'Unregister failed: %s for "%s" type->%s ns->%s(%s)',
-                    handler.callback,
-                    handler.name,
-                    typ,
-                    handler.ns,
-                    xmlns,
-                )
-            else:
-                self._log.debug(
-                    'Unregister handler %s for "%s" type->%s ns->%s(%s)',
-                    handler.callback,
-                    handler.name,
-                    typ,
-                    handler.ns,
-                    xmlns,
-                )
+    def unregister_mam_consumer(self, query_id: str) -> None:
+        self._mam_consumers.pop(query_id, None)
+
+    def set_sender_filter(self, func: Callable[[JID], bool] | None) -> None:
+        """
+        Drop messages and presences before any handler runs if func
+        returns True for the sender, e.g. BlockingStore.is_blocked
+
+        Stanzas from our own account or server and archived messages
+        are never dropped.
+        """
+        self._sender_filter = func
+
+    def _is_filtered(self, stanza: Protocol, own_jid: JID) -> bool:
+        frm = stanza.getFrom()
+        if frm is None or frm.bare_match(own_jid):
+            return False
+        if frm.localpart is None and frm.domain == own_jid.domain:
+            return False
+        return self._sender_filter(frm)
 
     def _default_handler(self, stanza: Protocol) -> None:
         """
@@ -595,6 +900,20 @@ class StanzaDispatcher(Observable):
         if stanza.getType() in ("get", "set"):
             self._client.send_stanza(Error(stanza, ERR_FEATURE_NOT_IMPLEMENTED))
 
+    @staticmethod
+    def _to_protocol(stanza: Node, protocol_class: Any) -> Any:
+        if (
+            type(stanza) is protocol_class
+            and isinstance(stanza, Protocol)
+            and stanza.protocol_init_pending
+        ):
+            # Built by the parser, Protocol.__init__() was never called.
+            # Stanzas created elsewhere are still copied, so dispatching
+            # does not modify them.
+            stanza.init_protocol()
+            return stanza
+        return protocol_class(node=stanza)
+
     def dispatch(self, stanza: Protocol) -> None:
         self.notify("before-dispatch", stanza)
 
@@ -602,7 +921,7 @@ class StanzaDispatcher(Observable):
             name = stanza.getName()
             protocol_class = self._stanza_types.get(name)
             if protocol_class is not None:
-                stanza = protocol_class(node=stanza)
+                stanza = self._to_protocol(stanza, protocol_class)
             self._dispatch_callback(stanza)
             return
 
@@ -612,17 +931,17 @@ class StanzaDispatcher(Observable):
         name = stanza.getName()
         xmlns = stanza.getNamespace()
 
-        if xmlns not in self._handlers:
+        if xmlns not in self._types:
             self._log.warning("Unknown namespace: %s", xmlns)
             xmlns = "unknown"
 
-        if name not in self._handlers[xmlns]:
+        if name not in self._types[xmlns]:
             self._log.warning("Unknown stanza: %s", stanza)
             name = "unknown"
 
         # Convert simplexml to Protocol object
         try:
-            stanza = self._handlers[xmlns][name]["type"](node=stanza)
+            stanza = self._to_protocol(stanza, self._types[xmlns][name])
         except InvalidJid:
             self._log.warning("Invalid JID, ignoring stanza")
             self._log.warning(stanza)
@@ -682,10 +1001,13 @@ class StanzaDispatcher(Observable):
 
         # Process callbacks
         _id = stanza.getID()
-        func, _timeout, user_data = self._id_callbacks.pop(_id, (None, None, {}))
+        func, timeout_handle, user_data = self._id_callbacks.pop(_id, (None, None, {}))
         if user_data is None:
             user_data = {}
 
+        if timeout_handle is not None:
+            self._client.scheduler.remove(timeout_handle)
+
         if func is not None:
             try:
                 func(self._client, stanza, **user_data)
@@ -693,10 +1015,23 @@ class StanzaDispatcher(Observable):
                 self._log.exception("Error while handling stanza")
             return
 
+        if (
+            self._sender_filter is not None
+            and name in ("message", "presence")
+            and getattr(properties, "mam", None) is None
+            and self._is_filtered(stanza, own_jid)
+        ):
+            self._log.debug("Dropped stanza of filtered sender: %s", stanza.getFrom())
+            return
+
+        consumer = None
+        if name == "message" and properties.mam is not None:
+            consumer = self._mam_consumers.get(properties.mam.query_id)
+
         props = stanza.getProperties()
         self._log.debug("type: %s, properties: %s", typ, props)
 
-        chain = self._build_handler_chain(xmlns, name, typ, props)
+        chain = self._build_handler_chain(xmlns, name, typ, props, consumer=consumer)
 
         try:
             self._execute_handler_chain(chain, stanza, properties)
@@ -704,7 +1039,7 @@ class StanzaDispatcher(Observable):
             props = stanza.getProperties()
             self._log.debug("type: %s, properties after decryption: %s", typ, props)
             chain = self._build_handler_chain(
-                xmlns, name, typ, props, after_decryption=True
+                xmlns, name, typ, props, after_decryption=True, consumer=consumer
             )
             self._execute_handler_chain(chain, stanza, properties)
 
@@ -716,44 +1051,76 @@ class StanzaDispatcher(Observable):
         props: Any,
         *,
         after_decryption: bool = False,
-    ) -> list[dict[str, Any]]:
+        consumer: tuple[Callable[..., Any], frozenset[str]] | None = None,
+    ) -> HandlerChainT:
+
+        routes = self._routing.routes.get(xmlns, {})
+        handlers = self._handlers.get(xmlns, {})
+        name_routes = routes.get(name, {})
+        name_handlers = handlers.get(name, {})
 
         # Gather specifics depending on stanza properties
         specifics = ["default"]
-        if typ and typ in self._handlers[xmlns][name]:
+        if typ and (typ in name_routes or typ in name_handlers):
             specifics.append(typ)
 
         for prop in props:
-            if prop in self._handlers[xmlns][name]:
+            if prop in name_routes or prop in name_handlers:
                 specifics.append(prop)
 
-            if typ and typ + prop in self._handlers[xmlns][name]:
+            if typ and (typ + prop in name_routes or typ + prop in name_handlers):
                 specifics.append(typ + prop)
 
         # Create the handler chain
-        chain: list[dict[str, Any]] = []
-        chain += self._handlers[xmlns]["default"]["default"]
+        chain: HandlerChainT = []
+        self._add_handlers(
+            chain, routes.get("default", {}), handlers.get("default", {}), "default"
+        )
         for specific in specifics:
-            chain += self._handlers[xmlns][name][specific]
+            self._add_handlers(chain, name_routes, name_handlers, specific)
+
+        if consumer is not None:
+            # Fast path for MAM consumers, run only the requested parsers
+            callback, modules = consumer
+            chain = [handler for handler in chain if handler[2] in modules]
+            chain.append((100, callback, None))
 
         # Sort chain with priority
-        chain.sort(key=lambda x: x["priority"])
+        chain.sort(key=itemgetter(0))
 
         if after_decryption:
             # Filter everything out which was executed before decryption
             # so it is not executed again
-            chain = list(filter(lambda x: x["priority"] > 9, chain))
+            chain = [handler for handler in chain if handler[0] > 9]
 
         return chain
 
+    def _add_handlers(
+        self,
+        chain: HandlerChainT,
+        routes: dict[str, tuple[_HandlerRoute, ...]],
+        handlers: dict[str, list[dict[str, Any]]],
+        specific: str,
+    ) -> None:
+        bound_handlers = self._bound_handlers
+        for route in routes.get(specific, ()):
+            func = bound_handlers[route.slot]
+            if func is not None:
+                chain.append((route.priority, func, route.module))
+
+        for handler in handlers.get(specific, ()):
+            chain.append((handler["priority"], handler["func"], handler["module"]))
+
     def _execute_handler_chain(
-        self, chain: Any, stanza: Protocol, properties: Any
+        self, chain: HandlerChainT, stanza: Protocol, properties: Any
     ) -> None:
 
-        for handler in chain:
-            self._log.info("Call handler: %s", handler["func"].__qualname__)
+        log_calls = self._log.isEnabledFor(logging.INFO)
+        for _priority, func, _module in chain:
+            if log_calls:
+                self._log.info("Call handler: %s", func.__qualname__)
             try:
-                handler["func"](self._client, stanza, properties)
+                func(self._client, stanza, properties)
             except NodeProcessed:
                 return
             except StanzaDecrypted:
@@ -768,53 +1135,46 @@ class StanzaDispatcher(Observable):
     def add_callback_for_id(
         self, id_: str, func: Callable[..., Any], timeout: float | None, user_data: Any
     ) -> None:
-        if timeout is not None and self._timeout_id is None:
-            self._log.info("Add timeout check")
-            self._timeout_id = GLib.timeout_add_seconds(1, self._timeout_check)
-            timeout = time.monotonic() + timeout
-        self._id_callbacks[id_] = (func, timeout, user_data)
-
-    def _timeout_check(self) -> bool:
-        self._log.info("Run timeout check")
-        timeouts: dict[str, tuple[Callable[..., Any], float | None, Any]] = {}
-        for id_, data in self._id_callbacks.items():
-            if data[1] is not None:
-                timeouts[id_] = data
-
-        if not timeouts:
-            self._log.info("Remove timeout check, no timeouts scheduled")
-            self._timeout_id = None
-            return False
-
-        for id_, data in timeouts.items():
-            func, timeout, user_data = data
+        self.remove_iq_callback(id_)
 
-            if user_data is None:
-                user_data = {}
-
-            if timeout < time.monotonic():
-                self._id_callbacks.pop(id_)
-                func(self._client, None, **user_data)
-        return True
+        timeout_handle = None
+        if timeout is not None:
+            timeout_handle = self._client.scheduler.add(
+                timeout, partial(self._on_iq_timeout, id_)
+            )
+        self._id_callbacks[id_] = (func, timeout_handle, user_data)
 
-    def _remove_timeout_source(self) -> None:
-        if self._timeout_id is not None:
-            GLib.source_remove(self._timeout_id)
-            self._timeout_id = None
+    def _on_iq_timeout(self, id_: str) -> None:
+        self._log.info("IQ timeout reached, id: %s", id_)
+        func, _timeout_handle, user_data = self._id_callbacks.pop(id_)
+        if user_data is None:
+            user_data = {}
+        func(self._client, None, **user_data)
 
     def remove_iq_callback(self, id_: str) -> None:
-        self._id_callbacks.pop(id_, None)
+        _func, timeout_handle, _user_data = self._id_callbacks.pop(
+            id_, (None, None, None)
+        )
+        if timeout_handle is not None:
+            self._client.scheduler.remove(timeout_handle)
 
     def clear_iq_callbacks(self) -> None:
         self._log.info("Clear IQ callbacks")
+        for _func, timeout_handle, _user_data in self._id_callbacks.values():
+            if timeout_handle is not None:
+                self._client.scheduler.remove(timeout_handle)
         self._id_callbacks.clear()
 
     def cleanup(self) -> None:
+        self.clear_iq_callbacks()
         self._client = None
         self._modules = {}
         self._parser = None
-        self.clear_iq_callbacks()
         self._dispatch_callback = None
         self._handlers.clear()
-        self._remove_timeout_source()
+        self._routing = _ROOT_ROUTING_TABLE
+        self._bound_handlers = []
+        self._types = self._routing.types
+        self._mam_consumers.clear()
+        self._sender_filter = None
         self.remove_subscriptions()
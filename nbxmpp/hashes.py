@@ -0,0 +1,97 @@
+# This file is part of nbxmpp.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from typing import Any
+from typing import BinaryIO
+
+import hashlib
+import os
+from collections.abc import Callable
+from collections.abc import Iterable
+from functools import partial
+
+# XEP-0300 algorithm names
+HASH_ALGORITHMS: dict[str, Callable[[], Any]] = {
+    "md5": hashlib.md5,
+    "sha-1": hashlib.sha1,
+    "sha-256": hashlib.sha256,
+    "sha-512": hashlib.sha512,
+    "sha3-256": hashlib.sha3_256,
+    "sha3-512": hashlib.sha3_512,
+    "blake2b-256": partial(hashlib.blake2b, digest_size=32),
+    "blake2b-512": partial(hashlib.blake2b, digest_size=64),
+}
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _make_hashers(algos: Iterable[str]) -> dict[str, Any]:
+    hashers: dict[str, Any] = {}
+    for algo in algos:
+        try:
+            hashers[algo] = HASH_ALGORITHMS[algo]()
+        except KeyError:
+            raise ValueError(f"Unsupported hash algorithm: {algo}") from None
+    return hashers
+
+
+def hash_data(data: bytes, algos: Iterable[str]) -> dict[str, bytes]:
+    """
+    Calculate the digests of data for every algorithm in algos
+    """
+    hashers = _make_hashers(algos)
+    for hasher in hashers.values():
+        hasher.update(data)
+    return {algo: hasher.digest() for algo, hasher in hashers.items()}
+
+
+def hash_fileobj(
+    fileobj: BinaryIO | Iterable[bytes],
+    algos: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict[str, bytes]:
+    """
+    Calculate the digests of a binary file object for every algorithm
+    in algos, reading the file only once
+
+    The file is read into one reused buffer of chunk_size bytes. Objects
+    without readinto() are iterated and every chunk is hashed as it is.
+    """
+    hashers = _make_hashers(algos)
+    updates = [hasher.update for hasher in hashers.values()]
+
+    readinto = getattr(fileobj, "readinto", None)
+    if readinto is None:
+        for chunk in fileobj:
+            for update in updates:
+                update(chunk)
+
+    else:
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while size := readinto(buffer):
+            chunk = view[:size]
+            for update in updates:
+                update(chunk)
+
+    return {algo: hasher.digest() for algo, hasher in hashers.items()}
+
+
+def hash_file(
+    path: str | os.PathLike[str],
+    algos: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict[str, bytes]:
+    """
+    Calculate the digests of the file at path for every algorithm in algos,
+    see hash_fileobj()
+
+    Hashing large files blocks for a long time, run it in a thread,
+    e.g. run_in_thread(hash_file, path, ("sha-256", "blake2b-256")).
+    hashlib releases the GIL while hashing, so the mainloop keeps running.
+    """
+    with open(path, "rb", buffering=0) as fileobj:
+        return hash_fileobj(fileobj, algos, chunk_size=chunk_size)
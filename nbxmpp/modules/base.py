@@ -15,6 +15,8 @@ from nbxmpp.util import LogAdapter
 
 if TYPE_CHECKING:
     from nbxmpp.client import Client
+    from nbxmpp.structs import PubSubEventHandler
+    from nbxmpp.structs import StanzaHandler
 
 
 class BaseModule:
@@ -27,6 +29,9 @@ class BaseModule:
             logging.getLogger(logger_name), {"context": client.log_context}
         )
 
+        self.handlers: list[StanzaHandler] = []
+        self.pubsub_event_handlers: list[PubSubEventHandler] = []
+
     def __getattr__(self, name: str) -> Any:
         if name not in self._depends:
             raise AttributeError("Unknown method: %s" % name)
@@ -25,6 +25,7 @@ from nbxmpp.task import iq_request_task
 from nbxmpp.types import BlockingReportValues
 
 if TYPE_CHECKING:
+    from nbxmpp.blocking_store import BlockingStore
     from nbxmpp.client import Client
 
 
@@ -43,6 +44,25 @@ class Blocking(BaseModule):
             ),
         ]
 
+        self._blocking_store: BlockingStore | None = None
+        self._filter_senders = False
+
+    def set_blocking_store(
+        self, store: BlockingStore | None, filter_senders: bool = False
+    ) -> None:
+        """
+        Apply the results of request_blocking_list() and all blocking
+        pushes to store. If filter_senders is True messages and presences
+        of blocked senders are dropped before any handler runs.
+        """
+        self._blocking_store = store
+        if store is not None and filter_senders:
+            self._client.set_sender_filter(store.is_blocked)
+            self._filter_senders = True
+        elif self._filter_senders:
+            self._client.set_sender_filter(None)
+            self._filter_senders = False
+
     @iq_request_task
     def request_blocking_list(self) -> Generator[set[JID] | Iq | None, Iq]:
         _task = yield
@@ -66,6 +86,8 @@ class Blocking(BaseModule):
             blocked.add(jid)
 
         self._log.info("Received blocking list: %s", blocked)
+        if self._blocking_store is not None:
+            self._blocking_store.apply_result(blocked)
         yield blocked
 
     @iq_request_task
@@ -83,9 +105,8 @@ class Blocking(BaseModule):
         response = yield _make_unblock_request(jids)
         yield process_response(response)
 
-    @staticmethod
     def _process_blocking_push(
-        client: Client, stanza: Iq, properties: BlockingProperties
+        self, client: Client, stanza: Iq, properties: BlockingProperties
     ) -> None:
 
         unblock = stanza.getTag("unblock", namespace=Namespace.BLOCKING)
@@ -96,6 +117,9 @@ class Blocking(BaseModule):
         if block is not None:
             properties.blocking = _parse_push(block)
 
+        if self._blocking_store is not None and properties.blocking is not None:
+            self._blocking_store.apply_push(properties.blocking)
+
         reply = stanza.buildSimpleReply("result")
         client.send_stanza(reply)
 
@@ -8,9 +8,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from functools import partial
+
 from nbxmpp.errors import MalformedStanzaError
 from nbxmpp.modules.base import BaseModule
 from nbxmpp.modules.bookmarks.util import build_conference_node
+from nbxmpp.modules.bookmarks.util import is_same_bookmark
 from nbxmpp.modules.bookmarks.util import parse_bookmark
 from nbxmpp.modules.util import finalize
 from nbxmpp.modules.util import raise_if_error
@@ -20,8 +23,10 @@ from nbxmpp.protocol import Message
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.structs import BookmarkData
 from nbxmpp.structs import MessageProperties
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
+from nbxmpp.task import gather
 from nbxmpp.task import iq_request_task
+from nbxmpp.task import Task
 
 if TYPE_CHECKING:
     from nbxmpp.client import Client
@@ -48,27 +53,33 @@ class NativeBookmarks(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_bookmarks,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.BOOKMARKS_1, callback=self._process_pubsub_bookmarks
             ),
         ]
 
+        # Last known bookmarks on the server, None until they are requested
+        self._server_bookmarks: dict[JID, BookmarkData] | None = None
+
     def _process_pubsub_bookmarks(
         self, _client: Client, _stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.BOOKMARKS_1:
+        if properties.pubsub_event.is_batch:
+            # Every item is a bookmark, they are parsed on access
+            properties.pubsub_event.set_item_parser(parse_bookmark)
+            self._log.info(
+                "Received %s bookmark items from: %s",
+                len(properties.pubsub_event.items),
+                properties.jid,
+            )
+            self._update_server_bookmarks(properties)
             return
 
         item = properties.pubsub_event.item
         if item is None:
             # Retract, Deleted or Purged
+            self._update_server_bookmarks(properties)
             return
 
         try:
@@ -83,6 +94,35 @@ class NativeBookmarks(BaseModule):
         self._log.info(bookmark_item)
 
         properties.pubsub_event = pubsub_event
+        self._update_server_bookmarks(properties)
+
+    def _update_server_bookmarks(self, properties: MessageProperties) -> None:
+        bookmarks = self._server_bookmarks
+        if bookmarks is None:
+            return
+
+        # Stanzas without from are sent by our own account
+        if properties.from_ is not None and not properties.is_from_us():
+            return
+
+        pubsub_event = properties.pubsub_event
+        assert pubsub_event is not None
+        if pubsub_event.deleted or pubsub_event.purged:
+            bookmarks.clear()
+            return
+
+        if pubsub_event.is_batch:
+            for event_item in pubsub_event.items:
+                if event_item.retracted:
+                    _remove_bookmark(bookmarks, event_item.id)
+                elif event_item.data is not None:
+                    bookmarks[event_item.data.jid] = event_item.data
+            return
+
+        if pubsub_event.retracted:
+            _remove_bookmark(bookmarks, pubsub_event.id)
+        elif pubsub_event.data is not None:
+            bookmarks[pubsub_event.data.jid] = pubsub_event.data
 
     @iq_request_task
     def request_bookmarks(self):
@@ -105,6 +145,8 @@ class NativeBookmarks(BaseModule):
         for bookmark in bookmarks:
             self._log.info(bookmark)
 
+        self._server_bookmarks = {bookmark.jid: bookmark for bookmark in bookmarks}
+
         yield bookmarks
 
     @iq_request_task
@@ -123,12 +165,80 @@ class NativeBookmarks(BaseModule):
         self._log.info("Store Bookmarks")
 
         for bookmark in bookmarks:
-            self.publish(
-                Namespace.BOOKMARKS_1,
-                build_conference_node(bookmark),
-                id_=str(bookmark.jid),
-                options=BOOKMARK_OPTIONS,
-                force_node_options=True,
-            )
+            self._publish_bookmark(bookmark)
 
         yield True
+
+    @iq_request_task
+    def sync_bookmarks(self, bookmarks: list[BookmarkData], limit: int = 10):
+        """
+        Make the bookmarks on the server match `bookmarks`
+
+        Only bookmarks which differ from the last known server state are
+        published, bookmarks missing in `bookmarks` are retracted. At most
+        `limit` requests are in flight. If the server state is not known yet,
+        the bookmarks are requested first.
+
+        If a request fails the first error is raised after all requests
+        finished. Successful changes are applied to the server state, so
+        calling sync_bookmarks() again only retries the failed ones.
+        """
+        _task = yield
+
+        if self._server_bookmarks is None:
+            result = yield self.request_bookmarks()
+            raise_if_error(result)
+
+        server_bookmarks = self._server_bookmarks
+        assert server_bookmarks is not None
+
+        wanted = {bookmark.jid: bookmark for bookmark in bookmarks}
+        changed = [
+            bookmark
+            for jid, bookmark in wanted.items()
+            if not is_same_bookmark(server_bookmarks.get(jid), bookmark)
+        ]
+        removed = [jid for jid in server_bookmarks if jid not in wanted]
+
+        self._log.info(
+            "Sync Bookmarks: %s changed, %s removed", len(changed), len(removed)
+        )
+
+        if not changed and not removed:
+            yield True
+
+        factories = [partial(self._publish_bookmark, bookmark) for bookmark in changed]
+        factories += [partial(self.retract_bookmark, jid) for jid in removed]
+        results = yield gather(factories, limit=limit)
+
+        # Factories which raised leave a plain exception as result
+        errors = [result for result in results if isinstance(result, Exception)]
+        for bookmark, result in zip(changed, results[: len(changed)], strict=True):
+            if not isinstance(result, Exception):
+                server_bookmarks[bookmark.jid] = bookmark
+
+        for jid, result in zip(removed, results[len(changed) :], strict=True):
+            if not isinstance(result, Exception):
+                server_bookmarks.pop(jid, None)
+
+        if errors:
+            raise errors[0]
+
+        yield True
+
+    def _publish_bookmark(self, bookmark: BookmarkData) -> Task:
+        return self.publish(
+            Namespace.BOOKMARKS_1,
+            build_conference_node(bookmark),
+            id_=str(bookmark.jid),
+            options=BOOKMARK_OPTIONS,
+            force_node_options=True,
+        )
+
+
+def _remove_bookmark(bookmarks: dict[JID, BookmarkData], id_: str | None) -> None:
+    try:
+        jid = JID.from_string(id_)
+    except Exception:
+        return
+    bookmarks.pop(jid, None)
@@ -18,7 +18,7 @@ from nbxmpp.protocol import Message
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.structs import BookmarkData
 from nbxmpp.structs import MessageProperties
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.task import iq_request_task
 
 BOOKMARK_OPTIONS = {
@@ -41,24 +41,15 @@ class PEPBookmarks(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_bookmarks,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.BOOKMARKS, callback=self._process_pubsub_bookmarks
             ),
         ]
 
     def _process_pubsub_bookmarks(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.BOOKMARKS:
-            return
-
         item = properties.pubsub_event.item
         if item is None:
             # Retract, Deleted or Purged
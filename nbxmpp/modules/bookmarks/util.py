@@ -110,6 +110,27 @@ def parse_storage_node(storage: Node, log: logging.Logger) -> list[BookmarkData]
     return bookmarks
 
 
+def is_same_bookmark(
+    bookmark1: BookmarkData | None, bookmark2: BookmarkData | None
+) -> bool:
+    if bookmark1 is None or bookmark2 is None:
+        return bookmark1 is bookmark2
+
+    if bookmark1._replace(extensions=None) != bookmark2._replace(extensions=None):
+        return False
+
+    return _get_extensions_payload(bookmark1) == _get_extensions_payload(bookmark2)
+
+
+def _get_extensions_payload(bookmark: BookmarkData) -> list[str] | None:
+    # Nodes do not compare by value. Extensions contain only elements of
+    # other namespaces, so the serialized children do not depend on the
+    # namespace of the parent.
+    if bookmark.extensions is None:
+        return None
+    return [str(child) for child in bookmark.extensions.getChildren()]
+
+
 def build_conference_node(bookmark: BookmarkData):
     attrs = {"xmlns": Namespace.BOOKMARKS_1}
     if bookmark.autojoin:
@@ -15,7 +15,10 @@ from typing import Any
 from typing import Literal
 from typing import Union
 
+from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
+from collections.abc import MutableMapping
 
 from nbxmpp.namespaces import Namespace
 from nbxmpp.protocol import JID
@@ -179,6 +182,20 @@ class DataField(ExtendedNode):
     def var(self) -> None:
         self.delAttr("var")
 
+    def setAttr(self, key: str, val: str) -> None:
+        Node.setAttr(self, key, val)
+        if key == "var":
+            self._reset_record_index()
+
+    def delAttr(self, key: str) -> None:
+        Node.delAttr(self, key)
+        if key == "var":
+            self._reset_record_index()
+
+    def _reset_record_index(self) -> None:
+        if isinstance(self.parent, DataRecord):
+            self.parent._vars = None
+
     @property
     def label(self) -> str:
         """
@@ -538,10 +555,72 @@ class TextMultiField(DataField):
         return True, ""
 
 
+def _get_field(node: Node) -> FieldT:
+    if isinstance(node, DataField):
+        return node  # type: ignore
+    return extend_field(node)
+
+
+class FieldMap(MutableMapping[str, "FieldT"]):
+    """
+    View of the fields of a record by var
+
+    Setting a var replaces the field with this var or adds the field to
+    the record, deleting a var removes the field from the record.
+    """
+
+    __slots__ = ("_record",)
+
+    def __init__(self, record: DataRecord) -> None:
+        self._record = record
+
+    def __getitem__(self, var: str) -> FieldT:
+        return self._record[var]
+
+    def __setitem__(self, var: str, field: FieldT) -> None:
+        record = self._record
+        if not isinstance(field, DataField):
+            extend_field(field)
+        if field.var != var:
+            field.var = var
+
+        existing = record._get_node(var)
+        if existing is None:
+            record.addChild(node=field)
+            return
+
+        for index, kid in enumerate(record.kids):
+            if kid is existing:
+                record.kids[index] = field
+                field.parent = record
+                break
+        record._vars = None
+
+    def __delitem__(self, var: str) -> None:
+        record = self._record
+        node = record._get_node(var)
+        if node is None:
+            raise KeyError(var)
+        record.delChild(node)
+
+    def __contains__(self, var: object) -> bool:
+        return isinstance(var, str) and self._record._get_node(var) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._record._get_index()))
+
+    def __len__(self) -> int:
+        return len(self._record._get_index())
+
+
 class DataRecord(ExtendedNode):
     """
     The container for data fields - an xml element which has DataField elements
     as children
+
+    Fields of an existing node are converted to DataField objects when they
+    are accessed first. The var index is built on the first lookup and
+    reset whenever fields are added, removed or renamed.
     """
 
     def __init__(
@@ -551,30 +630,57 @@ class DataRecord(ExtendedNode):
         extend: Node | None = None,
     ) -> None:
         self.associated = associated
-        self.vars: dict[str, FieldT] = {}
+        self._vars: dict[str | None, Node] | None = None
         if extend is None:
             # we have to build this object from scratch
             Node.__init__(self)
 
-            if fields is not None:
-                self.fields = fields
-        else:
-            # we already have nbxmpp.Node inside - try to convert all
-            # fields into DataField objects
-            if fields is None:
-                for field in self.iterTags("field"):
-                    if not isinstance(field, DataField):
-                        extend_field(field)
-                    self.vars[field.var] = field
-            else:
-                self.fields = fields
+        if fields is not None:
+            self.fields = fields
+
+    def _get_index(self) -> dict[str | None, Node]:
+        if self._vars is None:
+            self._vars = {
+                field.getAttr("var"): field for field in self.iterTags("field")
+            }
+        return self._vars
+
+    def _get_node(self, var: str) -> Node | None:
+        node = self._get_index().get(var)
+        if node is not None and node.getAttr("var") != var:
+            # The var of a plain field node was changed with setAttr()
+            self._vars = None
+            node = self._get_index().get(var)
+        return node
+
+    def addChild(self, *args: Any, **kwargs: Any) -> Node:
+        self._vars = None
+        return Node.addChild(self, *args, **kwargs)
+
+    def delChild(self, node: Node | str, attrs: dict[str, str] | None = None) -> Node:
+        self._vars = None
+        return Node.delChild(self, node, attrs)
+
+    @property
+    def vars(self) -> FieldMap:
+        """
+        Fields of this record by var
+        """
+        return FieldMap(self)
+
+    @vars.setter
+    def vars(self, vars_: Mapping[str, FieldT]) -> None:
+        del self.fields
+        field_map = FieldMap(self)
+        for var, field in vars_.items():
+            field_map[var] = field
 
     @property
     def fields(self) -> list[FieldT]:
         """
         List of fields in this record
         """
-        return self.getTags("field")
+        return [_get_field(field) for field in self.iterTags("field")]
 
     @fields.setter
     def fields(self, fields: list[FieldT]) -> None:
@@ -583,19 +689,18 @@ class DataRecord(ExtendedNode):
             if not isinstance(field, DataField):
                 extend_field(field)
             self.addChild(node=field)
-            self.vars[field.var] = field
 
     @fields.deleter
     def fields(self) -> None:
         for element in self.getTags("field"):
             self.delChild(element)
-            self.vars.clear()
 
     def iter_fields(self) -> Iterator[FieldT]:
         """
         Iterate over fields in this record. Do not take associated into account
         """
-        yield from self.iterTags("field")
+        for field in self.iterTags("field"):
+            yield _get_field(field)
 
     def iter_with_associated(self) -> Iterator[tuple[Node, FieldT]]:
         """
@@ -606,13 +711,16 @@ class DataRecord(ExtendedNode):
             yield self[field.var], field
 
     def __getitem__(self, item: str) -> FieldT:
-        return self.vars[item]
+        node = self._get_node(item)
+        if node is None:
+            raise KeyError(item)
+        return _get_field(node)
 
     def is_valid(self) -> bool:
         return all(field.is_valid()[0] for field in self.iter_fields())
 
     def is_fake_form(self) -> bool:
-        return bool(self.vars.get("fakeform", False))
+        return self._get_node("fakeform") is not None
 
 
 class DataForm(ExtendedNode):
@@ -750,28 +858,30 @@ class MultipleDataForm(DataForm):
         DataForm.__init__(
             self, type_=type_, title=title, instructions=instructions, extend=extend
         )
-        # all records, recorded into DataRecords
-        if extend is None:
-            if items is not None:
-                self.items = items
-        else:
-            # we already have nbxmpp.Node inside - try to convert all
-            # fields into DataField objects
-            if items is None:
-                self.items = list(self.iterTags("item"))
-            else:
-                for item in self.getTags("item"):
-                    self.delChild(item)
-                self.items = items
+        # Items of an existing node are converted to DataRecord objects
+        # when they are accessed first
+        self._records: list[DataRecord] | None = None
+        if items is not None:
+            self.items = items
         reported_tag = self.getTag("reported")
         self.reported = DataRecord(extend=reported_tag)
 
+    def addChild(self, *args: Any, **kwargs: Any) -> Node:
+        self._records = None
+        return Node.addChild(self, *args, **kwargs)
+
+    def delChild(self, node: Node | str, attrs: dict[str, str] | None = None) -> Node:
+        self._records = None
+        return Node.delChild(self, node, attrs)
+
     @property
-    def items(self) -> list[Node]:
+    def items(self) -> list[DataRecord]:
         """
         A list of all records
         """
-        return list(self.iter_records())
+        if self._records is None:
+            self._records = list(self.iter_records())
+        return list(self._records)
 
     @items.setter
     def items(self, records: list[DataRecord | Node]) -> None:
@@ -786,5 +896,127 @@ class MultipleDataForm(DataForm):
         for record in self.getTags("item"):
             self.delChild(record)
 
-    def iter_records(self) -> Iterator[DataRecord | Node]:
-        yield from self.getTags("item")
+    def iter_records(self) -> Iterator[DataRecord]:
+        for record in self.iterTags("item"):
+            if not isinstance(record, DataRecord):
+                DataRecord(extend=record)
+            yield record  # type: ignore
+
+    def get_columns(self) -> DataFormColumns:
+        """
+        Returns a columnar view of the items, see DataFormColumns
+        """
+        return DataFormColumns.from_node(self)
+
+
+class DataFormColumns:
+    """
+    Columnar view of the items of a form with reported fields, e.g. the
+    results of a search
+
+    The values of every reported var are stored in one list, the items are
+    not converted to DataRecord and DataField objects. Fields with more than
+    one value are joined with newlines, missing fields are empty strings.
+
+    sort(), filter() and page() return new views, which share the columns and
+    only store the order of the rows.
+    """
+
+    def __init__(
+        self,
+        vars_: list[str],
+        labels: dict[str, str],
+        types: dict[str, str],
+        columns: dict[str, list[str]],
+        rows: list[int] | None = None,
+    ) -> None:
+        self.vars = vars_
+        self.labels = labels
+        self.types = types
+        self._columns = columns
+        if rows is None:
+            length = len(columns[vars_[0]]) if vars_ else 0
+            rows = list(range(length))
+        self._rows = rows
+
+    @classmethod
+    def from_node(cls, node: Node) -> DataFormColumns:
+        vars_: list[str] = []
+        labels: dict[str, str] = {}
+        types: dict[str, str] = {}
+
+        reported = node.getTag("reported")
+        if reported is not None:
+            for field in reported.iterTags("field"):
+                var = field.getAttr("var")
+                if var is None or var in labels:
+                    continue
+                vars_.append(var)
+                labels[var] = field.getAttr("label") or var
+                types[var] = field.getAttr("type") or "text-single"
+
+        columns: dict[str, list[str]] = {var: [] for var in vars_}
+        for index, item in enumerate(node.iterTags("item")):
+            for column in columns.values():
+                column.append("")
+
+            for field in item.iterTags("field"):
+                column = columns.get(field.getAttr("var"))  # type: ignore
+                if column is None:
+                    continue
+                column[index] = "\n".join(
+                    value.getData() for value in field.iterTags("value")
+                )
+
+        return cls(vars_, labels, types, columns)
+
+    def _new_view(self, rows: list[int]) -> DataFormColumns:
+        return DataFormColumns(self.vars, self.labels, self.types, self._columns, rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        for index in self._rows:
+            yield {var: column[index] for var, column in self._columns.items()}
+
+    def column(self, var: str) -> list[str]:
+        """
+        Returns the values of var in the order of this view
+        """
+        column = self._columns[var]
+        return [column[index] for index in self._rows]
+
+    def row(self, index: int) -> dict[str, str]:
+        row = self._rows[index]
+        return {var: column[row] for var, column in self._columns.items()}
+
+    def sort(
+        self,
+        var: str,
+        key: Callable[[str], Any] | None = None,
+        reverse: bool = False,
+    ) -> DataFormColumns:
+        """
+        Sort the rows by the values of var, e.g. sort("nusers", key=int)
+        """
+        column = self._columns[var]
+        if key is None:
+            rows = sorted(self._rows, key=column.__getitem__, reverse=reverse)
+        else:
+            rows = sorted(
+                self._rows, key=lambda index: key(column[index]), reverse=reverse
+            )
+        return self._new_view(rows)
+
+    def filter(self, var: str, predicate: Callable[[str], bool]) -> DataFormColumns:
+        """
+        Keep the rows for which predicate returns True for the value of var
+        """
+        column = self._columns[var]
+        return self._new_view(
+            [index for index in self._rows if predicate(column[index])]
+        )
+
+    def page(self, offset: int, count: int) -> DataFormColumns:
+        return self._new_view(self._rows[offset : offset + count])
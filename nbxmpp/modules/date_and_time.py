@@ -8,6 +8,7 @@ import datetime as dt
 import logging
 import re
 import time
+from functools import lru_cache
 
 log = logging.getLogger("nbxmpp.m.date_and_time")
 
@@ -28,6 +29,8 @@ ZERO = dt.timedelta(0)
 HOUR = dt.timedelta(hours=1)
 SECOND = dt.timedelta(seconds=1)
 
+EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+
 STDOFFSET = dt.timedelta(seconds=-time.timezone)
 if time.daylight:
     dstoffset = dt.timedelta(seconds=-time.altzone)
@@ -146,50 +149,102 @@ def parse_datetime(
     if convert not in (None, "utc", "local"):
         raise TypeError('"%s" is not a valid value for convert')
 
-    match = PATTERN_DATETIME.match(timestring)
-    if match is None:
+    if check_utc and convert != "utc":
+        raise ValueError('check_utc can only be used with convert="utc"')
+
+    if epoch and convert != "utc":
+        # epoch is always UTC, use convert='utc' or check_utc=True
+        raise ValueError("epoch not available while converting to local")
+
+    return _parse_datetime(timestring, check_utc, convert, epoch)
+
+
+@lru_cache(maxsize=1024)
+def _parse_utc_offset(offset: str) -> tuple[dt.timezone, int] | None:
+    if offset == "Z":
+        return dt.timezone.utc, 0
+
+    hours = int(offset[1:3])
+    minutes = int(offset[4:6])
+    if hours > 23 or minutes > 59:
         return None
 
-    timestring = "".join(match.groups(""))
-    strformat = "%Y-%m-%d%H:%M:%S%z"
-    if match.group("frac"):
-        # Fractional second addendum to Time
-        strformat = "%Y-%m-%d%H:%M:%S.%f%z"
+    seconds = hours * 3600 + minutes * 60
+    if offset[0] == "-":
+        seconds = -seconds
 
-    try:
-        date_time = dt.datetime.strptime(timestring, strformat)
-    except ValueError:
+    if seconds == 0:
+        return dt.timezone.utc, 0
+    return dt.timezone(dt.timedelta(seconds=seconds)), seconds
+
+
+# Archive pages and delayed messages often repeat the same timestamps,
+# all return values are immutable so they can be shared.
+@lru_cache(maxsize=1024)
+def _parse_datetime(
+    timestring: str, check_utc: bool, convert: str | None, epoch: bool
+) -> dt.datetime | float | None:
+
+    match = PATTERN_DATETIME.match(timestring)
+    if match is None:
         return None
 
-    if not 1 < date_time.year < 9999:
+    date, time_, frac, offset = match.groups()
+
+    year = int(date[:4])
+    if not 1 < year < 9999:
         # Raise/Reduce MIN/MAX year so converting to different
         # timezones cannot get out of range
         return None
 
-    if check_utc:
-        if convert != "utc":
-            raise ValueError('check_utc can only be used with convert="utc"')
+    if frac is None:
+        microsecond = 0
+    elif frac == ".":
+        return None
+    else:
+        microsecond = int(frac[1:].ljust(6, "0"))
 
-        if date_time.tzinfo != dt.timezone.utc:
-            return None
+    utc_offset = _parse_utc_offset(offset)
+    if utc_offset is None:
+        return None
 
-        if epoch:
-            return date_time.timestamp()
-        return date_time
+    tzinfo, offset_seconds = utc_offset
+    if check_utc and tzinfo is not dt.timezone.utc:
+        return None
+
+    try:
+        date_time = dt.datetime(
+            year,
+            int(date[5:7]),
+            int(date[8:10]),
+            int(time_[:2]),
+            int(time_[3:5]),
+            int(time_[6:8]),
+            microsecond,
+            tzinfo,
+        )
+    except ValueError:
+        return None
 
     if convert == "utc":
-        date_time = date_time.astimezone(dt.timezone.utc)
         if epoch:
-            return date_time.timestamp()
-        return date_time
-
-    if epoch:
-        # epoch is always UTC, use convert='utc' or check_utc=True
-        raise ValueError("epoch not available while converting to local")
+            # Same result as date_time.timestamp() but without
+            # converting to UTC first
+            seconds = (
+                (date_time.toordinal() - EPOCH_ORDINAL) * 86400
+                + date_time.hour * 3600
+                + date_time.minute * 60
+                + date_time.second
+                - offset_seconds
+            )
+            return (seconds * 10**6 + microsecond) / 10**6
+
+        if tzinfo is dt.timezone.utc:
+            return date_time
+        return date_time.astimezone(dt.timezone.utc)
 
     if convert == "local":
-        date_time = date_time.astimezone(LocalTimezone())
-        return date_time
+        return date_time.astimezone(LocalTimezone())
 
     # convert=None
     return date_time
@@ -6,10 +6,12 @@
 
 from __future__ import annotations
 
+from typing import Any
 from typing import TYPE_CHECKING
 
 import logging
 import time
+from functools import partial
 
 from nbxmpp.errors import MalformedStanzaError
 from nbxmpp.errors import StanzaError
@@ -17,6 +19,7 @@ from nbxmpp.modules.base import BaseModule
 from nbxmpp.modules.dataforms import extend_form
 from nbxmpp.modules.dataforms import MultipleDataForm
 from nbxmpp.modules.dataforms import SimpleDataForm
+from nbxmpp.modules.util import raise_if_error
 from nbxmpp.namespaces import Namespace
 from nbxmpp.protocol import ERR_ITEM_NOT_FOUND
 from nbxmpp.protocol import ErrorNode
@@ -29,6 +32,7 @@ from nbxmpp.structs import DiscoItem
 from nbxmpp.structs import DiscoItems
 from nbxmpp.structs import IqProperties
 from nbxmpp.structs import StanzaHandler
+from nbxmpp.task import gather
 from nbxmpp.task import iq_request_task
 
 if TYPE_CHECKING:
@@ -79,6 +83,28 @@ class Discovery(BaseModule):
             raise StanzaError(response)
         yield parse_disco_items(response)
 
+    @iq_request_task
+    def disco_items_info(
+        self, jid: JID | str, node: str | None = None, limit: int = 10
+    ):
+        """
+        Requests the disco#items of jid and the disco#info of every item,
+        with at most `limit` disco#info requests in flight.
+
+        Returns a list of (DiscoItem, DiscoInfo or error) tuples.
+        """
+        _task = yield
+
+        disco_items = yield self.disco_items(jid, node)
+        raise_if_error(disco_items)
+
+        items = disco_items.items
+        infos: list[Any] = yield gather(
+            [partial(self.disco_info, item.jid, item.node) for item in items],
+            limit=limit,
+        )
+        yield list(zip(items, infos, strict=True))
+
 
 def parse_disco_info(stanza: Iq, timestamp: float | None = None) -> DiscoInfo:
     identities: list[DiscoIdentity] = []
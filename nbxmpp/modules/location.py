@@ -16,7 +16,7 @@ from nbxmpp.protocol import Message
 from nbxmpp.protocol import Node
 from nbxmpp.structs import LocationData
 from nbxmpp.structs import MessageProperties
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.task import iq_request_task
 
 if TYPE_CHECKING:
@@ -31,24 +31,15 @@ class Location(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_location,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.LOCATION, callback=self._process_pubsub_location
             ),
         ]
 
     def _process_pubsub_location(
         self, _client: Client, _stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.LOCATION:
-            return
-
         item = properties.pubsub_event.item
         if item is None:
             # Retract, Deleted or Purged
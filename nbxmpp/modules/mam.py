@@ -8,8 +8,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import asyncio
 import datetime as dt
+from collections import deque
+from dataclasses import dataclass
 
+from nbxmpp.errors import CancelledError
 from nbxmpp.errors import MalformedStanzaError
 from nbxmpp.errors import StanzaError
 from nbxmpp.modules.base import BaseModule
@@ -20,10 +24,16 @@ from nbxmpp.modules.util import process_response
 from nbxmpp.namespaces import Namespace
 from nbxmpp.protocol import Iq
 from nbxmpp.protocol import JID
+from nbxmpp.protocol import Message
 from nbxmpp.protocol import Node
+from nbxmpp.protocol import NodeProcessed
 from nbxmpp.structs import MAMPreferencesData
 from nbxmpp.structs import MAMQueryData
+from nbxmpp.structs import MessageProperties
+from nbxmpp.structs import StanzaHandler
 from nbxmpp.task import iq_request_task
+from nbxmpp.task import Task
+from nbxmpp.util import generate_id
 
 if TYPE_CHECKING:
     from nbxmpp.client import Client
@@ -34,7 +44,113 @@ class MAM(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = []
+        self.handlers = [
+            StanzaHandler(
+                name="message", callback=self._process_stream_message, priority=48
+            ),
+        ]
+
+        self._streams: dict[str, MAMArchiveStream] = {}
+
+    def _process_stream_message(
+        self, _client: Client, stanza: Message, properties: MessageProperties
+    ) -> None:
+        if not properties.is_mam_message:
+            return
+
+        stream = self._streams.get(properties.mam.query_id)
+        if stream is None:
+            return
+
+        if stream.add_message(stanza, properties):
+            raise NodeProcessed
+
+    def _process_consumer_message(
+        self, _client: Client, stanza: Message, properties: MessageProperties
+    ) -> None:
+        stream = self._streams.get(properties.mam.query_id)
+        if stream is not None:
+            stream.add_message(stanza, properties)
+        raise NodeProcessed
+
+    def _register_stream(
+        self, query_id: str, stream: MAMArchiveStream, fast_path: bool
+    ) -> None:
+        self._streams[query_id] = stream
+        if fast_path:
+            self._client.register_mam_consumer(query_id, self._process_consumer_message)
+
+    def _unregister_stream(self, query_id: str) -> None:
+        if self._streams.pop(query_id, None) is not None:
+            self._client.unregister_mam_consumer(query_id)
+
+    def stream_archive(
+        self,
+        jid: JID,
+        start: dt.datetime | None = None,
+        end: dt.datetime | None = None,
+        with_: str | None = None,
+        after: str | None = None,
+        page_size: int = 70,
+        prefetch: int = 1,
+        fast_path: bool = False,
+    ) -> MAMArchiveStream:
+        """
+        Stream the archive of jid page by page, see MAMArchiveStream
+
+        To resume a previous download pass its checkpoint as `after`.
+        With `fast_path` archived messages skip the handler chain, only
+        the minimal parsers of the dispatcher's MAM consumer path run.
+        """
+        stream = MAMArchiveStream(
+            self, jid, [(start, end, after)], with_, page_size, prefetch, fast_path
+        )
+        stream.start()
+        return stream
+
+    def stream_archive_windows(
+        self,
+        jid: JID,
+        start: dt.datetime,
+        end: dt.datetime,
+        windows: int = 4,
+        with_: str | None = None,
+        page_size: int = 70,
+        prefetch: int = 1,
+        fast_path: bool = False,
+    ) -> MAMArchiveStream:
+        """
+        Stream the archive of jid between start and end, split into
+        `windows` disjoint time windows which are downloaded in parallel.
+
+        Messages are in order within a window, but windows are interleaved.
+        """
+        if windows < 1:
+            raise ValueError("windows must be at least 1")
+
+        # The query form formats datetimes as UTC, naive ones are UTC already
+        start = _as_utc(start)
+        end = _as_utc(end)
+
+        if end <= start:
+            raise ValueError("end must be after start")
+
+        step = (end - start) / windows
+        boundaries = [start + step * index for index in range(windows)] + [end]
+        # The query form has a resolution of seconds
+        boundaries = [boundary.replace(microsecond=0) for boundary in boundaries]
+
+        stream = MAMArchiveStream(
+            self,
+            jid,
+            [(boundaries[i], boundaries[i + 1], None) for i in range(windows)],
+            with_,
+            page_size,
+            prefetch,
+            fast_path,
+        )
+        stream.start()
+        return stream
 
     @iq_request_task
     def make_query(
@@ -203,3 +319,231 @@ def _make_set_pref_request(default: str, always: list[str], never: list[str]) ->
     for jid in never:
         never_node.addChild(name="jid").setData(jid)
     return iq
+
+
+def _as_utc(datetime: dt.datetime) -> dt.datetime:
+    if datetime.tzinfo is None:
+        return datetime.replace(tzinfo=dt.timezone.utc)
+    return datetime.astimezone(dt.timezone.utc)
+
+
+@dataclass
+class _ArchiveWindow:
+    start: dt.datetime | None
+    end: dt.datetime | None
+    after: str | None
+    last_id: str | None
+    query_id: str | None = None
+    task: Task | None = None
+    complete: bool = False
+    buffered: int = 0
+
+
+class MAMArchiveStream:
+    """
+    Streams the messages of an archive, page by page
+
+    Iterate with `async for stanza, properties in stream`.
+
+    The next page of a window is requested as soon as the previous page is
+    complete, while the consumer still processes buffered messages. At most
+    `prefetch` pages are buffered ahead of the consumer, 0 requests the next
+    page only after all buffered messages are consumed.
+
+    Messages belonging to the stream are consumed by it, handlers with a
+    priority higher than 48 will not see them. With `fast_path` they are
+    routed through the dispatcher's MAM consumer path and skip the
+    handler chain, except for a minimal set of parsers.
+    """
+
+    def __init__(
+        self,
+        module: MAM,
+        jid: JID | str,
+        windows: list[tuple[dt.datetime | None, dt.datetime | None, str | None]],
+        with_: str | None,
+        page_size: int,
+        prefetch: int,
+        fast_path: bool = False,
+    ) -> None:
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative")
+
+        if isinstance(jid, str):
+            jid = JID.from_string(jid)
+
+        self._module = module
+        self._jid = jid
+        self._with = with_
+        self._page_size = page_size
+        self._prefetch = prefetch
+        self._fast_path = fast_path
+
+        self._windows = [
+            _ArchiveWindow(start=start, end=end, after=after, last_id=after)
+            for start, end, after in windows
+        ]
+        self._queries: dict[str, _ArchiveWindow] = {}
+
+        # Windows share their boundary second, drop messages
+        # which are returned by both windows
+        self._boundaries = [
+            _as_utc(window.start).timestamp()
+            for window in self._windows[1:]
+            if window.start is not None
+        ]
+        self._boundary_ids: set[str] = set()
+
+        self._buffer: deque[tuple[Message, MessageProperties, _ArchiveWindow]] = deque()
+        self._error: Exception | None = None
+        self._waiter: asyncio.Future[None] | None = None
+
+    @property
+    def checkpoint(self) -> str | None:
+        """
+        The archive id of the last message handed to the consumer
+        """
+        if len(self._windows) != 1:
+            raise RuntimeError("Stream has more than one window, use checkpoints")
+        return self._windows[0].last_id
+
+    @property
+    def checkpoints(
+        self,
+    ) -> list[tuple[dt.datetime | None, dt.datetime | None, str | None]]:
+        return [(window.start, window.end, window.last_id) for window in self._windows]
+
+    @property
+    def is_complete(self) -> bool:
+        return not self._buffer and all(window.complete for window in self._windows)
+
+    def start(self) -> None:
+        for window in self._windows:
+            self._request_page(window)
+
+    def cancel(self) -> None:
+        if self._error is not None:
+            return
+
+        self._set_error(CancelledError())
+        self._buffer.clear()
+
+    def add_message(self, stanza: Message, properties: MessageProperties) -> bool:
+        window = self._queries.get(properties.mam.query_id)
+        if window is None:
+            return False
+
+        if not properties.mam.archive.bare_match(self._jid):
+            self._module._log.warning(
+                "MAM result from unexpected archive: %s", properties.mam.archive
+            )
+            return False
+
+        if self._is_duplicate(properties):
+            return True
+
+        self._buffer.append((stanza, properties, window))
+        window.buffered += 1
+        self._wake_up()
+        return True
+
+    def _is_duplicate(self, properties: MessageProperties) -> bool:
+        timestamp = properties.mam.timestamp
+        for boundary in self._boundaries:
+            if boundary <= timestamp < boundary + 1:
+                if properties.mam.id in self._boundary_ids:
+                    return True
+                self._boundary_ids.add(properties.mam.id)
+                break
+        return False
+
+    def _request_page(self, window: _ArchiveWindow) -> None:
+        if self._error is not None:
+            return
+
+        if window.complete or window.task is not None:
+            return
+
+        if window.buffered > self._page_size * self._prefetch:
+            return
+
+        query_id = generate_id()
+        window.query_id = query_id
+        self._queries[query_id] = window
+        self._module._register_stream(query_id, self, self._fast_path)
+
+        window.task = self._module.make_query(
+            self._jid,
+            queryid=query_id,
+            start=window.start,
+            end=window.end,
+            with_=self._with,
+            after=window.after,
+            max_=self._page_size,
+            callback=self._on_page_received,
+            user_data=window,
+        )
+
+    def _on_page_received(self, task: Task) -> None:
+        window: _ArchiveWindow = task.get_user_data()
+        window.task = None
+        self._remove_query(window)
+
+        if self._error is not None:
+            return
+
+        try:
+            result: MAMQueryData = task.finish()
+        except Exception as error:
+            self._set_error(error)
+            return
+
+        window.after = result.rsm.last
+        window.complete = result.complete or result.rsm.last is None
+        self._request_page(window)
+        self._wake_up()
+
+    def _remove_query(self, window: _ArchiveWindow) -> None:
+        if window.query_id is None:
+            return
+        self._queries.pop(window.query_id, None)
+        self._module._unregister_stream(window.query_id)
+        window.query_id = None
+
+    def _set_error(self, error: Exception) -> None:
+        self._error = error
+        for window in self._windows:
+            self._remove_query(window)
+            task = window.task
+            window.task = None
+            if task is not None:
+                task.cancel(invoke_callbacks=False)
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __aiter__(self) -> MAMArchiveStream:
+        return self
+
+    async def __anext__(self) -> tuple[Message, MessageProperties]:
+        while not self._buffer:
+            if self._error is not None:
+                raise self._error
+
+            if all(window.complete for window in self._windows):
+                raise StopAsyncIteration
+
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+            self._waiter = None
+
+        stanza, properties, window = self._buffer.popleft()
+        window.buffered -= 1
+        window.last_id = properties.mam.id
+        self._request_page(window)
+        return stanza, properties
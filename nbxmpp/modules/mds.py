@@ -13,7 +13,7 @@ from nbxmpp.protocol import Node
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.structs import MDSData
 from nbxmpp.structs import MessageProperties
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.task import iq_request_task
 
 if TYPE_CHECKING:
@@ -38,22 +38,17 @@ class MDS(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_mds,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
-            ),
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(node=Namespace.MDS, callback=self._process_pubsub_mds),
         ]
 
     def _process_pubsub_mds(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.MDS:
+        if properties.pubsub_event.is_batch:
+            # Every item is the state of one chat, they are parsed on access
+            properties.pubsub_event.set_item_parser(self._parse_item)
+            self._log.info("Received %s MDS items", len(properties.pubsub_event.items))
             return
 
         item = properties.pubsub_event.item
@@ -14,12 +14,31 @@ from nbxmpp.protocol import JID
 from nbxmpp.protocol import Message
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.protocol import Protocol
+from nbxmpp.simplexml import Node
 from nbxmpp.structs import CarbonData
 from nbxmpp.structs import MAMData
 
 log = logging.getLogger("nbxmpp.m.misc")
 
 
+def _get_forwarded_message(forwarded: Node) -> Message:
+    """
+    Returns the forwarded message as Message object
+
+    A message built by the parser is turned into a Message in place instead
+    of being copied into a new one. It stays a child of the wrapping stanza,
+    which is not used for anything else after unwrapping.
+    """
+    message = forwarded.getTag("message")
+    if type(message) is not Node:
+        return Message(node=message)
+
+    message.__class__ = Message
+    assert isinstance(message, Message)
+    message.init_protocol()
+    return message
+
+
 def unwrap_carbon(
     stanza: Protocol, own_jid: JID
 ) -> tuple[Message | Protocol, CarbonData | None]:
@@ -30,11 +49,12 @@ def unwrap_carbon(
             return stanza, None
 
     # Carbon must be from our bare jid
-    if stanza.getFrom() != own_jid.new_as_bare():
+    frm = stanza.getFrom()
+    if frm is None or not frm.is_bare or not frm.bare_match(own_jid):
         raise InvalidFrom("Invalid from: %s" % stanza.getAttr("from"))
 
     forwarded = carbon.getTag("forwarded", namespace=Namespace.FORWARD)
-    message = Message(node=forwarded.getTag("message"))
+    message = _get_forwarded_message(forwarded)
 
     type_ = carbon.getName()
 
@@ -84,7 +104,7 @@ def unwrap_mam(
         raise InvalidStanza
 
     forwarded = result.getTag("forwarded", namespace=Namespace.FORWARD)
-    message = Message(node=forwarded.getTag("message"))
+    message = _get_forwarded_message(forwarded)
 
     # Fill missing to/from
     to = message.getTo()
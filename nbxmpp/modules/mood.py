@@ -17,7 +17,7 @@ from nbxmpp.protocol import Node
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.structs import MessageProperties
 from nbxmpp.structs import MoodData
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.task import iq_request_task
 
 if TYPE_CHECKING:
@@ -32,24 +32,13 @@ class Mood(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_mood,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
-            ),
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(node=Namespace.MOOD, callback=self._process_pubsub_mood),
         ]
 
     def _process_pubsub_mood(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.MOOD:
-            return
-
         item = properties.pubsub_event.item
         if item is None:
             # Retract, Deleted or Purged
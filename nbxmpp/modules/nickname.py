@@ -17,6 +17,7 @@ from nbxmpp.protocol import Node
 from nbxmpp.protocol import Presence
 from nbxmpp.structs import MessageProperties
 from nbxmpp.structs import PresenceProperties
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.structs import StanzaHandler
 from nbxmpp.task import iq_request_task
 
@@ -33,12 +34,6 @@ class Nickname(BaseModule):
 
         self._client = client
         self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_nickname,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
-            ),
             StanzaHandler(
                 name="message",
                 callback=self._process_nickname,
@@ -53,6 +48,12 @@ class Nickname(BaseModule):
             ),
         ]
 
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.NICK, callback=self._process_pubsub_nickname
+            ),
+        ]
+
     def _process_nickname(
         self,
         _client: Client,
@@ -78,12 +79,6 @@ class Nickname(BaseModule):
     def _process_pubsub_nickname(
         self, _client: Client, _stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.NICK:
-            return
-
         item = properties.pubsub_event.item
         if item is None:
             # Retract, Deleted or Purged
@@ -20,6 +20,7 @@ from nbxmpp.protocol import NodeProcessed
 from nbxmpp.structs import MessageProperties
 from nbxmpp.structs import OMEMOBundle
 from nbxmpp.structs import OMEMOMessage
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.structs import StanzaHandler
 from nbxmpp.task import iq_request_task
 from nbxmpp.util import b64decode
@@ -42,12 +43,6 @@ class OMEMO(BaseModule):
 
         self._client = client
         self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_omemo_devicelist,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
-            ),
             StanzaHandler(
                 name="message",
                 callback=self._process_omemo_message,
@@ -56,6 +51,12 @@ class OMEMO(BaseModule):
             ),
         ]
 
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.OMEMO_TEMP_DL, callback=self._process_omemo_devicelist
+            ),
+        ]
+
     def _process_omemo_message(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
@@ -70,10 +71,22 @@ class OMEMO(BaseModule):
     def _process_omemo_devicelist(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
+        if properties.pubsub_event.is_batch:
+            # Only the last published devicelist is relevant
+            pubsub_event = properties.pubsub_event
+            pubsub_event.set_item_parser(_parse_devicelist)
+            last_item = pubsub_event.last_item
+            if last_item is not None and last_item.error is not None:
+                self._log.warning(stanza)
+                raise NodeProcessed
+
+            if last_item is None or not last_item.data:
+                return
 
-        if properties.pubsub_event.node != Namespace.OMEMO_TEMP_DL:
+            self._log.info(
+                "Received OMEMO devicelist: %s - %s", properties.jid, last_item.data
+            )
+            properties.pubsub_event = pubsub_event._replace(data=last_item.data)
             return
 
         item = properties.pubsub_event.item
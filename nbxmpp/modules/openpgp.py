@@ -12,6 +12,7 @@ from typing import TYPE_CHECKING
 import random
 import string
 import time
+from functools import partial
 
 from nbxmpp.errors import MalformedStanzaError
 from nbxmpp.modules.base import BaseModule
@@ -27,6 +28,7 @@ from nbxmpp.protocol import StanzaMalformed
 from nbxmpp.structs import MessageProperties
 from nbxmpp.structs import PGPKeyMetadata
 from nbxmpp.structs import PGPPublicKey
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.structs import StanzaHandler
 from nbxmpp.task import iq_request_task
 from nbxmpp.util import b64decode
@@ -48,12 +50,6 @@ class OpenPGP(BaseModule):
 
         self._client = client
         self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_openpgp,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
-            ),
             StanzaHandler(
                 name="message",
                 callback=self._process_openpgp_message,
@@ -62,6 +58,12 @@ class OpenPGP(BaseModule):
             ),
         ]
 
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.OPENPGP_PK, callback=self._process_pubsub_openpgp
+            ),
+        ]
+
     def _process_openpgp_message(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
@@ -103,10 +105,22 @@ class OpenPGP(BaseModule):
         </item>
         """
 
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.OPENPGP_PK:
+        if properties.pubsub_event.is_batch:
+            # Only the last published keylist is relevant
+            pubsub_event = properties.pubsub_event
+            pubsub_event.set_item_parser(partial(_parse_keylist, properties.jid))
+            last_item = pubsub_event.last_item
+            if last_item is not None and last_item.error is not None:
+                self._log.warning(stanza)
+                raise NodeProcessed
+
+            if last_item is None or last_item.data is None:
+                return
+
+            self._log.info(
+                "Received PGP keylist: %s - %s", properties.jid, last_item.data
+            )
+            properties.pubsub_event = pubsub_event._replace(data=last_item.data)
             return
 
         item = properties.pubsub_event.item
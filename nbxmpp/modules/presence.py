@@ -25,6 +25,7 @@ from nbxmpp.util import error_factory
 
 if TYPE_CHECKING:
     from nbxmpp.client import Client
+    from nbxmpp.presence_store import PresenceStore
 
 
 class BasePresence(BaseModule):
@@ -36,8 +37,25 @@ class BasePresence(BaseModule):
             StanzaHandler(
                 name="presence", callback=self._process_presence_base, priority=10
             ),
+            StanzaHandler(
+                name="presence", callback=self._process_presence_state, priority=45
+            ),
         ]
 
+        self._presence_store: PresenceStore | None = None
+        self._suppress_unchanged = False
+
+    def set_presence_store(
+        self, store: PresenceStore | None, suppress_unchanged: bool = False
+    ) -> None:
+        """
+        Apply all presences to store, after the presence has been parsed by
+        all modules. If suppress_unchanged is True presences which change
+        nothing are dropped instead of being marked as unchanged.
+        """
+        self._presence_store = store
+        self._suppress_unchanged = suppress_unchanged
+
     def _process_presence_base(
         self, _client: Client, stanza: Presence, properties: PresenceProperties
     ) -> None:
@@ -55,6 +73,20 @@ class BasePresence(BaseModule):
         properties.self_presence = own_jid == properties.jid
         properties.self_bare = properties.jid.bare_match(own_jid)
 
+    def _process_presence_state(
+        self, _client: Client, _stanza: Presence, properties: PresenceProperties
+    ) -> None:
+        if self._presence_store is None:
+            return
+
+        if self._presence_store.apply(properties):
+            return
+
+        properties.unchanged = True
+        if self._suppress_unchanged:
+            self._log.debug("Unchanged presence from %s", properties.jid)
+            raise NodeProcessed
+
     def _parse_priority(self, stanza: Presence) -> int:
         priority = stanza.getPriority()
         if priority is None:
@@ -11,6 +11,7 @@ from typing import Literal
 from typing import NamedTuple
 from typing import TYPE_CHECKING
 
+from collections.abc import Callable
 from dataclasses import dataclass
 
 from nbxmpp.const import MessageType
@@ -30,6 +31,8 @@ from nbxmpp.protocol import Node
 from nbxmpp.structs import CommonResult
 from nbxmpp.structs import MessageProperties
 from nbxmpp.structs import PubSubEventData
+from nbxmpp.structs import PubSubEventHandler
+from nbxmpp.structs import PubSubEventItem
 from nbxmpp.structs import StanzaHandler
 from nbxmpp.task import iq_request_task
 
@@ -51,8 +54,20 @@ class PubSub(BaseModule):
             ),
         ]
 
+        self._event_handlers: dict[str, Callable[..., Any]] = {}
+
+    def register_event_handler(self, handler: PubSubEventHandler) -> None:
+        self._log.debug(
+            "Register event handler %s for node %s", handler.callback, handler.node
+        )
+        self._event_handlers[handler.node] = handler.callback
+
+    def unregister_event_handler(self, handler: PubSubEventHandler) -> None:
+        if self._event_handlers.get(handler.node) == handler.callback:
+            del self._event_handlers[handler.node]
+
     def _process_pubsub_base(
-        self, _client: Client, stanza: Message, properties: MessageProperties
+        self, client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
         if properties.type not in (MessageType.HEADLINE, MessageType.NORMAL):
             return
@@ -65,6 +80,18 @@ class PubSub(BaseModule):
             self._log.warning(stanza)
             return
 
+        self._parse_pubsub_event(stanza, properties)
+        if properties.pubsub_event is None:
+            return
+
+        # Only the module which is responsible for the node parses the event
+        callback = self._event_handlers.get(properties.pubsub_event.node)
+        if callback is not None:
+            callback(client, stanza, properties)
+
+    def _parse_pubsub_event(
+        self, stanza: Message, properties: MessageProperties
+    ) -> None:
         event = stanza.getTag("event", namespace=Namespace.PUBSUB_EVENT)
 
         delete = event.getTag("delete")
@@ -83,14 +110,25 @@ class PubSub(BaseModule):
         if items is not None:
             node = items.getAttr("node")
 
+            children = items.getChildren()
+            if len(children) > 1:
+                event_items = _parse_event_items(children)
+                if not event_items:
+                    self._log.warning("PubSub event without valid items")
+                    self._log.warning(stanza)
+                    return
+
+                properties.pubsub_event = PubSubEventData(node, items=event_items)
+                return
+
             retract = items.getTag("retract")
             if retract is not None:
                 id_ = retract.getAttr("id")
                 properties.pubsub_event = PubSubEventData(node, id_, retracted=True)
                 return
 
-            if len(items.getChildren()) != 1:
-                self._log.warning("PubSub event with != 1 item")
+            if not children:
+                self._log.warning("PubSub event without item")
                 self._log.warning(stanza)
                 return
 
@@ -385,6 +423,17 @@ def _get_subscription_item(response: Iq) -> Node | None:
     return pubsub_node.getTag("subscription", namespace=Namespace.PUBSUB)
 
 
+def _parse_event_items(nodes: list[Node]) -> tuple[PubSubEventItem, ...]:
+    event_items: list[PubSubEventItem] = []
+    for node in nodes:
+        name = node.getName()
+        if name == "item":
+            event_items.append(PubSubEventItem(node.getAttr("id"), node))
+        elif name == "retract":
+            event_items.append(PubSubEventItem(node.getAttr("id"), retracted=True))
+    return tuple(event_items)
+
+
 def _make_pubsub_request(
     node: str,
     id_: str | None = None,
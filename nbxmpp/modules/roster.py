@@ -133,7 +133,7 @@ class Roster(BaseModule):
                 self._log.warning("no version attribute found")
 
         pushed_items: list[RosterItem] = []
-        for item in query.getTags("item"):
+        for item in query.iterTags("item"):
             try:
                 roster_item = RosterItem.from_node(item)
             except Exception as e:
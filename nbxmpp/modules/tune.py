@@ -15,7 +15,7 @@ from nbxmpp.namespaces import Namespace
 from nbxmpp.protocol import Message
 from nbxmpp.protocol import Node
 from nbxmpp.structs import MessageProperties
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.structs import TuneData
 from nbxmpp.task import iq_request_task
 
@@ -31,24 +31,13 @@ class Tune(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_tune,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
-            ),
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(node=Namespace.TUNE, callback=self._process_pubsub_tune),
         ]
 
     def _process_pubsub_tune(
         self, _client: Client, _stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
-        if properties.pubsub_event.node != Namespace.TUNE:
-            return
-
         item = properties.pubsub_event.item
         if item is None:
             # Retract, Deleted or Purged
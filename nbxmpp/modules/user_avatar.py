@@ -25,8 +25,9 @@ from nbxmpp.protocol import Message
 from nbxmpp.protocol import Node
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.structs import MessageProperties
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.task import iq_request_task
+from nbxmpp.task import shield
 from nbxmpp.util import b64decode
 from nbxmpp.util import b64encode
 
@@ -47,22 +48,31 @@ class UserAvatar(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_avatar,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.AVATAR_METADATA, callback=self._process_pubsub_avatar
             ),
         ]
 
     def _process_pubsub_avatar(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
+        if properties.pubsub_event.is_batch:
+            # Only the last published metadata is relevant
+            pubsub_event = properties.pubsub_event
+            pubsub_event.set_item_parser(_parse_avatar_metadata)
+            last_item = pubsub_event.last_item
+            if last_item is not None and last_item.error is not None:
+                self._log.warning(stanza)
+                raise NodeProcessed
+
+            if last_item is None or last_item.data is None:
+                return
 
-        if properties.pubsub_event.node != Namespace.AVATAR_METADATA:
+            self._log.info(
+                "Received avatar metadata: %s - %s", properties.jid, last_item.data
+            )
+            properties.pubsub_event = pubsub_event._replace(data=last_item.data)
             return
 
         item = properties.pubsub_event.item
@@ -96,6 +106,31 @@ class UserAvatar(BaseModule):
 
     @iq_request_task
     def request_avatar_data(self, id_: str, jid: JID | None = None):
+        _task = yield
+
+        cache = self._client.avatar_cache
+        if cache is None:
+            avatar = yield self._request_avatar_data(id_, jid)
+            raise_if_error(avatar)
+            yield avatar
+
+        data = cache.get(id_)
+        if data is not None:
+            self._log.info("Avatar found in cache: %s", id_)
+            yield AvatarData(data=data, sha=id_)
+
+        # Concurrent requests for the same avatar share one download
+        request = cache.get_request(id_)
+        if request is None:
+            request = self._request_avatar_data(id_, jid)
+            cache.set_request(id_, request)
+
+        avatar = yield shield(request)
+        raise_if_error(avatar)
+        yield avatar
+
+    @iq_request_task
+    def _request_avatar_data(self, id_: str, jid: JID | None):
         task = yield
 
         item = yield self.request_item(Namespace.AVATAR_DATA, id_=id_, jid=jid)
@@ -105,7 +140,13 @@ class UserAvatar(BaseModule):
         if item is None:
             yield task.set_result(None)
 
-        yield _get_avatar_data(item, id_)
+        avatar = _get_avatar_data(item, id_)
+
+        cache = self._client.avatar_cache
+        if cache is not None:
+            cache.add(avatar.data, avatar.sha)
+
+        yield avatar
 
     @iq_request_task
     def request_avatar_metadata(self, jid: JID | None = None):
@@ -219,6 +260,17 @@ class UserAvatar(BaseModule):
         yield finalize(task, result)
 
 
+def _parse_avatar_metadata(item: Node) -> AvatarMetaData | None:
+    metadata = item.getTag("metadata", namespace=Namespace.AVATAR_METADATA)
+    if metadata is None:
+        raise MalformedStanzaError("No metadata node found", item)
+
+    if not metadata.getChildren():
+        return None
+
+    return AvatarMetaData.from_node(metadata, item.getAttr("id"))
+
+
 def _get_avatar_data(item: Node, id_: str) -> AvatarData:
     data_node = item.getTag("data", namespace=Namespace.AVATAR_DATA)
     if data_node is None:
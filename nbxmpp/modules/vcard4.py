@@ -27,7 +27,7 @@ from nbxmpp.protocol import Message
 from nbxmpp.protocol import NodeProcessed
 from nbxmpp.simplexml import Node
 from nbxmpp.structs import MessageProperties
-from nbxmpp.structs import StanzaHandler
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.task import iq_request_task
 
 if TYPE_CHECKING:
@@ -1088,6 +1088,15 @@ NotSupportedNodesT = dict[str | None, list[Node]]
 
 
 class VCard:
+    """
+    A vCard4 (XEP-0292)
+
+    VCards created with from_node() keep the received node and create
+    property objects only when they are accessed. get_properties_by_name()
+    parses only the properties of the requested kind, everything else is
+    parsed on the first call that needs the whole vCard.
+    """
+
     def __init__(
         self,
         properties: VCardPropertiesT | None = None,
@@ -1098,15 +1107,65 @@ class VCard:
         if not_supported_nodes is None:
             not_supported_nodes = defaultdict(list)
 
-        self._properties = properties
+        self._properties: VCardPropertiesT | None = properties
         self._no_supported_nodes = not_supported_nodes
 
+        self._node: Node | None = None
+        self._index: dict[str, list[Node]] | None = None
+        self._parsed: dict[int, PropertyT | None] = {}
+
     @classmethod
     def from_node(cls, node: Node) -> VCard:
+        vcard = cls()
+        vcard._properties = None
+        vcard._node = node
+        return vcard
+
+    def _parse_property(self, node: Node) -> PropertyT | None:
+        # Nodes are kept alive by self._node, so their id is stable
+        key = id(node)
+        try:
+            return self._parsed[key]
+        except KeyError:
+            property_ = get_property_from_name(node.getName(), node)
+            self._parsed[key] = property_
+            return property_
+
+    def _get_index(self) -> dict[str, list[Node]]:
+        if self._index is not None:
+            return self._index
+
+        assert self._node is not None
+        index: dict[str, list[Node]] = defaultdict(list)
+        for child in self._node.getChildren():
+            if isinstance(child, str):
+                continue
+            child_name = child.getName()
+
+            if child_name == "group":
+                if not child.getAttr("name"):
+                    continue
+
+                for group_child in child.getChildren():
+                    if isinstance(group_child, str):
+                        continue
+                    index[group_child.getName()].append(group_child)
+
+            else:
+                index[child_name].append(child)
+
+        self._index = index
+        return index
+
+    def _load(self) -> VCardPropertiesT:
+        if self._properties is not None:
+            return self._properties
+
+        assert self._node is not None
         properties: VCardPropertiesT = []
         not_supported_nodes: NotSupportedNodesT = defaultdict(list)
 
-        for child in node.getChildren():
+        for child in self._node.getChildren():
             if isinstance(child, str):
                 continue
             child_name = child.getName()
@@ -1121,8 +1180,7 @@ class VCard:
                     if isinstance(group_child, str):
                         continue
 
-                    group_child_name = group_child.getName()
-                    property_ = get_property_from_name(group_child_name, group_child)
+                    property_ = self._parse_property(group_child)
                     if property_ is None:
                         not_supported_nodes[group_name].append(group_child)
                         continue
@@ -1132,17 +1190,22 @@ class VCard:
 
             else:
 
-                property_ = get_property_from_name(child_name, child)
+                property_ = self._parse_property(child)
                 if property_ is None:
                     not_supported_nodes[None].append(child)
                     continue
                 properties.append((None, property_))
 
-        return cls(properties, not_supported_nodes)
+        self._properties = properties
+        self._no_supported_nodes = not_supported_nodes
+        self._node = None
+        self._index = None
+        self._parsed.clear()
+        return properties
 
     def to_node(self) -> Node:
         vcard = Node(f"{Namespace.VCARD4} vcard")
-        for group, props in self._properties:
+        for group, props in self._load():
             if group is None:
                 assert not isinstance(props, list)
                 vcard.addChild(node=props.to_node())
@@ -1164,7 +1227,7 @@ class VCard:
 
     def get_properties(self) -> list[PropertyT]:
         properties: list[PropertyT] = []
-        for group, props in self._properties:
+        for group, props in self._load():
             if group is None:
                 assert not isinstance(props, list)
                 properties.append(props)
@@ -1173,27 +1236,39 @@ class VCard:
                 properties.extend(props)
         return properties
 
+    def get_properties_by_name(self, name: str) -> list[PropertyT]:
+        if self._properties is not None:
+            return [prop for prop in self.get_properties() if prop.name == name]
+
+        properties: list[PropertyT] = []
+        for node in self._get_index().get(name, []):
+            property_ = self._parse_property(node)
+            if property_ is not None:
+                properties.append(property_)
+        return properties
+
     def add_property(self, name: str, *args: Any, **kwargs: Any):
         prop = PROPERTY_CLASSES.get(name)(*args, **kwargs)
-        self._properties.append((None, prop))
+        self._load().append((None, prop))
         return prop
 
     def remove_property(self, prop: PropertyT) -> None:
-        for _group, props in list(self._properties):
+        properties = self._load()
+        for _group, props in list(properties):
             if isinstance(props, list):
                 if prop in props:
                     props.remove(prop)
                     return
 
             elif prop is props:
-                self._properties.remove((None, props))
+                properties.remove((None, props))
                 return
 
         raise ValueError("prop not found in vcard")
 
     def copy(self) -> VCard:
         properties: VCardPropertiesT = []
-        for group_name, props in self._properties:
+        for group_name, props in self._load():
             if group_name is None:
                 assert not isinstance(props, list)
                 properties.append((None, props.copy()))
@@ -1216,25 +1291,16 @@ class VCard4(BaseModule):
         BaseModule.__init__(self, client)
 
         self._client = client
-        self.handlers = [
-            StanzaHandler(
-                name="message",
-                callback=self._process_pubsub_vcard,
-                ns=Namespace.PUBSUB_EVENT,
-                priority=16,
+        self.pubsub_event_handlers = [
+            PubSubEventHandler(
+                node=Namespace.VCARD4_PUBSUB, callback=self._process_pubsub_vcard
             ),
         ]
 
     def _process_pubsub_vcard(
         self, _client: Client, stanza: Message, properties: MessageProperties
     ) -> None:
-        if not properties.is_pubsub_event:
-            return
-
         assert properties.pubsub_event is not None
-        if properties.pubsub_event.node != Namespace.VCARD4_PUBSUB:
-            return
-
         item = properties.pubsub_event.item
         if item is None:
             # Retract, Deleted or Purged
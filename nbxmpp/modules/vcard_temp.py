@@ -16,11 +16,13 @@ from nbxmpp.errors import MalformedStanzaError
 from nbxmpp.errors import StanzaError
 from nbxmpp.modules.base import BaseModule
 from nbxmpp.modules.util import process_response
+from nbxmpp.modules.util import raise_if_error
 from nbxmpp.namespaces import Namespace
 from nbxmpp.protocol import Iq
 from nbxmpp.protocol import JID
 from nbxmpp.simplexml import Node
 from nbxmpp.task import iq_request_task
+from nbxmpp.task import shield
 from nbxmpp.util import b64decode
 from nbxmpp.util import b64encode
 
@@ -47,6 +49,61 @@ class VCardTemp(BaseModule):
         vcard_node = _get_vcard_node(response)
         yield VCard.from_node(vcard_node)
 
+    @iq_request_task
+    def request_avatar(self, avatar_sha: str, jid: JID | None = None):
+        """
+        Request the avatar of a vCard, the result is the same as
+        VCard.get_avatar() returns
+
+        If an avatar cache is set, the vCard is only requested if the
+        avatar with avatar_sha is not in the cache.
+        """
+        _task = yield
+
+        cache = self._client.avatar_cache
+        if cache is None:
+            result = yield self._request_avatar(jid)
+            raise_if_error(result)
+            yield result
+
+        data = cache.get(avatar_sha)
+        if data is not None:
+            self._log.info("Avatar found in cache: %s", avatar_sha)
+            yield data, avatar_sha
+
+        # Concurrent requests for the same avatar share one download
+        request = cache.get_request(avatar_sha)
+        if request is None:
+            request = self._request_avatar(jid)
+            cache.set_request(avatar_sha, request)
+            result = yield shield(request)
+            raise_if_error(result)
+            yield result
+
+        result = yield shield(request)
+        raise_if_error(result)
+        if result[1] != avatar_sha:
+            # The vCard of the other entity did not contain the avatar
+            # we are looking for, request our own
+            result = yield self._request_avatar(jid)
+            raise_if_error(result)
+        yield result
+
+    @iq_request_task
+    def _request_avatar(self, jid: JID | None):
+        _task = yield
+
+        vcard = yield self.request_vcard(jid)
+        raise_if_error(vcard)
+
+        data, sha = vcard.get_avatar()
+
+        cache = self._client.avatar_cache
+        if cache is not None and data is not None:
+            cache.add(data, sha)
+
+        yield data, sha
+
     @iq_request_task
     def set_vcard(self, vcard: VCard, jid: JID | None = None):
         _task = yield
@@ -0,0 +1,139 @@
+# This file is part of nbxmpp.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from typing import Any
+
+from nbxmpp.const import PresenceShow
+from nbxmpp.const import PresenceType
+from nbxmpp.protocol import JID
+from nbxmpp.structs import PresenceProperties
+
+# Used to pick the best resource, PresenceShow sorts DND above ONLINE
+_AVAILABILITY = {
+    PresenceShow.CHAT: 4,
+    PresenceShow.ONLINE: 3,
+    PresenceShow.AWAY: 2,
+    PresenceShow.XA: 1,
+    PresenceShow.DND: 0,
+}
+
+
+class PresenceStore:
+    """
+    Keeps the last available presence of every full JID
+
+    Presences are applied with apply(), which returns False if the
+    presence does not change anything compared to the last one of the
+    resource. The store can be set on the BasePresence module, which
+    then applies every presence before the handlers of the application
+    run and marks no-op updates with PresenceProperties.unchanged.
+
+        store = PresenceStore()
+        client.get_module("BasePresence").set_presence_store(store)
+
+    The store does not know when presences become invalid, clear() needs
+    to be called on disconnect and with the room JID after leaving a MUC.
+    """
+
+    def __init__(self) -> None:
+        self._resources: dict[str, dict[JID, tuple[Any, PresenceProperties]]] = {}
+        self._best: dict[str, PresenceProperties] = {}
+
+    def __contains__(self, jid: JID) -> bool:
+        return self.get(jid) is not None
+
+    def get(self, jid: JID) -> PresenceProperties | None:
+        entry = self._resources.get(jid.bare, {}).get(jid)
+        if entry is None:
+            return None
+        return entry[1]
+
+    def get_resources(self, jid: JID) -> list[PresenceProperties]:
+        resources = self._resources.get(jid.bare, {})
+        return [properties for _, properties in resources.values()]
+
+    def get_best(self, jid: JID) -> PresenceProperties | None:
+        """
+        Returns the presence of the resource with the highest priority,
+        on equal priority the one with the most available show
+        (chat, online, away, xa, dnd)
+        """
+        return self._best.get(jid.bare)
+
+    def apply(self, properties: PresenceProperties) -> bool:
+        jid = properties.jid
+        assert jid is not None
+
+        if properties.type == PresenceType.UNAVAILABLE:
+            resources = self._resources.get(jid.bare)
+            if resources is not None and resources.pop(jid, None) is not None:
+                self._update_best(jid.bare)
+            return True
+
+        if properties.type != PresenceType.AVAILABLE:
+            return True
+
+        fingerprint = _get_fingerprint(properties)
+        resources = self._resources.setdefault(jid.bare, {})
+        entry = resources.get(jid)
+        resources[jid] = (fingerprint, properties)
+
+        # A MUC join is only complete with our own presence, it has to
+        # reach the application even if nothing changed since the last join
+        if entry is not None and entry[0] == fingerprint:
+            if not properties.is_muc_self_presence:
+                return False
+
+        self._update_best(jid.bare)
+        return True
+
+    def clear(self, jid: JID | None = None) -> None:
+        """
+        Remove the presences of all resources of jid, or all presences
+        """
+        if jid is None:
+            self._resources.clear()
+            self._best.clear()
+            return
+
+        self._resources.pop(jid.bare, None)
+        self._best.pop(jid.bare, None)
+
+    def _update_best(self, bare: str) -> None:
+        resources = self._resources.get(bare)
+        if not resources:
+            self._resources.pop(bare, None)
+            self._best.pop(bare, None)
+            return
+
+        self._best[bare] = max(
+            (properties for _, properties in resources.values()),
+            key=lambda p: (
+                p.priority or 0,
+                _AVAILABILITY.get(p.show, 0),
+                p.timestamp,
+            ),
+        )
+
+
+def _get_fingerprint(properties: PresenceProperties) -> tuple[Any, ...]:
+    muc_status_codes = properties.muc_status_codes
+    if muc_status_codes is not None:
+        muc_status_codes = frozenset(muc_status_codes)
+
+    return (
+        properties.show,
+        properties.status,
+        properties.priority,
+        properties.entity_caps,
+        properties.idle_timestamp,
+        properties.avatar_sha,
+        properties.nickname,
+        properties.signed,
+        properties.muc_user,
+        muc_status_codes,
+        properties.hats,
+    )
@@ -11,11 +11,11 @@ sub- stanzas) handling routines
 from __future__ import annotations
 
 from typing import Any
+from typing import BinaryIO
 from typing import Literal
 from typing import TYPE_CHECKING
 
 import functools
-import hashlib
 import os
 import sqlite3
 import time
@@ -30,6 +30,8 @@ import idna
 from gi.repository import Gio
 from gi.repository import GLib
 
+from nbxmpp.hashes import hash_data
+from nbxmpp.hashes import hash_fileobj
 from nbxmpp.namespaces import Namespace
 from nbxmpp.precis import enforce_precis_opaque
 from nbxmpp.precis import enforce_precis_username
@@ -1020,10 +1022,6 @@ class Protocol(Node):
         Node.__init__(self, tag=name, attrs=attrs, payload=payload, node=node)
         if not node and xmlns:
             self.setNamespace(xmlns)
-        if self["to"]:
-            self.setTo(self["to"])
-        if self["from"]:
-            self.setFrom(self["from"])
         if (
             node
             and isinstance(node, Protocol)
@@ -1031,15 +1029,41 @@ class Protocol(Node):
             and "id" in self.attrs
         ):
             del self.attrs["id"]
+        self.init_protocol(timestamp)
+
+    def init_protocol(self, timestamp: str | None = None) -> None:
+        """
+        Initialize the attributes of the stanza which are not part of Node
+
+        Called by the dispatcher for stanzas which the parser
+        built directly as Protocol instance.
+        """
+        self.protocol_init_pending = False
+        to = self.attrs.get("to")
+        if to:
+            self.setTo(to)
+        frm = self.attrs.get("from")
+        if frm:
+            self.setFrom(frm)
         self.timestamp: str | None = None
-        for d in self.getTags("delay", namespace=Namespace.DELAY2):
+
+        # Most stanzas have no delay, look for both variants in one pass
+        delays: list[Node] = []
+        legacy_delays: list[Node] = []
+        for kid in self.kids:
+            if kid.name == "delay" and kid.namespace == Namespace.DELAY2:
+                delays.append(kid)
+            elif kid.name == "x" and kid.namespace == Namespace.DELAY:
+                legacy_delays.append(kid)
+
+        for d in delays:
             try:
                 if d.getAttr("stamp") < self.getTimestamp2():
                     self.setTimestamp(d.getAttr("stamp"))
             except Exception:
                 pass
         if not self.timestamp:
-            for x in self.getTags("x", namespace=Namespace.DELAY):
+            for x in legacy_delays:
                 try:
                     if x.getAttr("stamp") < self.getTimestamp():
                         self.setTimestamp(x.getAttr("stamp"))
@@ -1812,40 +1836,25 @@ class Hashes(Node):
         self.setNamespace(nsp)
         self.setName("hash")
 
-    def calculateHash(self, algo: str, file_string: str | bytes) -> str | None:
+    def calculateHash(
+        self, algo: str, file_string: str | bytes | BinaryIO
+    ) -> str | None:
         """
         Calculate the hash and add it. It is preferable doing it here
         instead of doing it all over the place in Gajim.
         """
-        hl = None
-        hash_ = None
+        if algo not in self.supported:
+            return None
+
         # file_string can be a string or a file
         if isinstance(file_string, str):
-            if algo == "sha-1":
-                hl = hashlib.sha1()
-            elif algo == "md5":
-                hl = hashlib.md5()
-            elif algo == "sha-256":
-                hl = hashlib.sha256()
-            elif algo == "sha-512":
-                hl = hashlib.sha512()
-            if hl:
-                hl.update(file_string)
-                hash_ = hl.hexdigest()
-        else:  # if it is a file
-            if algo == "sha-1":
-                hl = hashlib.sha1()
-            elif algo == "md5":
-                hl = hashlib.md5()
-            elif algo == "sha-256":
-                hl = hashlib.sha256()
-            elif algo == "sha-512":
-                hl = hashlib.sha512()
-            if hl:
-                for line in file_string:
-                    hl.update(line)
-                hash_ = hl.hexdigest()
-        return hash_
+            file_string = file_string.encode()
+
+        if isinstance(file_string, bytes):
+            digests = hash_data(file_string, (algo,))
+        else:
+            digests = hash_fileobj(file_string, (algo,))
+        return digests[algo].hex()
 
     def addHash(self, hash_: str, algo: str) -> None:
         self.setAttr("algo", algo)
@@ -1884,34 +1893,20 @@ class Hashes2(Node):
         self.setNamespace(nsp)
         self.setName("hash")
 
-    def calculateHash(self, algo: str, file_string: str | bytes) -> str | None:
+    def calculateHash(self, algo: str, file_string: bytes | BinaryIO) -> str | None:
         """
         Calculate the hash and add it. It is preferable doing it here
         instead of doing it all over the place in Gajim.
         """
-        hl = None
-        hash_ = None
-        if algo == "sha-256":
-            hl = hashlib.sha256()
-        elif algo == "sha-512":
-            hl = hashlib.sha512()
-        elif algo == "sha3-256":
-            hl = hashlib.sha3_256()
-        elif algo == "sha3-512":
-            hl = hashlib.sha3_512()
-        elif algo == "blake2b-256":
-            hl = hashlib.blake2b(digest_size=32)
-        elif algo == "blake2b-512":
-            hl = hashlib.blake2b(digest_size=64)
+        if algo not in self.supported:
+            return None
+
         # file_string can be a string or a file
-        if hl is not None:
-            if isinstance(file_string, bytes):
-                hl.update(file_string)
-            else:  # if it is a file
-                for line in file_string:
-                    hl.update(line)
-            hash_ = b64encode(hl.digest()).decode("ascii")
-        return hash_
+        if isinstance(file_string, bytes):
+            digests = hash_data(file_string, (algo,))
+        else:
+            digests = hash_fileobj(file_string, (algo,))
+        return b64encode(digests[algo]).decode("ascii")
 
     def addHash(self, hash_: str, algo: str) -> None:
         self.setAttr("algo", algo)
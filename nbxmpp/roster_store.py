@@ -0,0 +1,121 @@
+# This file is part of nbxmpp.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from typing import Any
+
+from collections.abc import Iterator
+
+from nbxmpp.protocol import JID
+from nbxmpp.structs import RosterData
+from nbxmpp.structs import RosterItem
+from nbxmpp.structs import RosterPush
+
+
+class RosterStore:
+    """
+    Keeps the roster and its version up to date (XEP-0237)
+
+    The result of Roster.request_roster() is applied with apply_result(),
+    roster pushes with apply_push(). If the server supports roster
+    versioning, the store can be saved with snapshot() and restored with
+    from_snapshot() on the next login. Requesting the roster with the stored
+    version lets the server answer with only the changes since then.
+
+        store = RosterStore.from_snapshot(saved)
+        client.get_module("Roster").request_roster(store.version, callback=...)
+    """
+
+    SNAPSHOT_FORMAT = 1
+
+    def __init__(
+        self, items: list[RosterItem] | None = None, version: str | None = None
+    ) -> None:
+        self._items: dict[JID, RosterItem] = {}
+        self._version = version
+        if items is not None:
+            for item in items:
+                self._items[item.jid] = item
+
+    @property
+    def version(self) -> str | None:
+        return self._version
+
+    def __contains__(self, jid: JID) -> bool:
+        return jid in self._items
+
+    def __iter__(self) -> Iterator[RosterItem]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, jid: JID) -> RosterItem | None:
+        return self._items.get(jid)
+
+    def apply_result(self, data: RosterData) -> None:
+        """
+        Apply the result of a roster request
+
+        Without items the server confirmed that our version is up to date,
+        the changes since then arrive as roster pushes. Otherwise the server
+        sent the complete roster, which replaces all items.
+        """
+        if data.items is not None:
+            self._items = {item.jid: item for item in data.items}
+        self._version = data.version
+
+    def apply_push(self, push: RosterPush) -> None:
+        item = push.item
+        if item.subscription == "remove":
+            self._items.pop(item.jid, None)
+        else:
+            self._items[item.jid] = item
+
+        if push.version is not None:
+            self._version = push.version
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns the roster as JSON serializable dict
+        """
+        items: list[dict[str, Any]] = []
+        for item in self._items.values():
+            data = item.asdict()
+            data["jid"] = str(item.jid)
+            data["groups"] = sorted(item.groups)
+            items.append(data)
+
+        return {
+            "format": self.SNAPSHOT_FORMAT,
+            "version": self._version,
+            "items": items,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict[str, Any]) -> RosterStore:
+        """
+        Restore a store from snapshot(). Raises ValueError if the snapshot
+        is not usable, the roster needs to be requested without version then
+        """
+        if snapshot.get("format") != cls.SNAPSHOT_FORMAT:
+            raise ValueError("Unknown snapshot format: %s" % snapshot.get("format"))
+
+        try:
+            items = [
+                RosterItem(
+                    jid=JID.from_string(data["jid"]),
+                    name=data.get("name"),
+                    ask=data.get("ask"),
+                    subscription=data.get("subscription") or "none",
+                    approved=data.get("approved"),
+                    groups=set(data.get("groups") or ()),
+                )
+                for data in snapshot["items"]
+            ]
+        except Exception as error:
+            raise ValueError(f"Invalid snapshot: {error}") from error
+
+        return cls(items, snapshot.get("version"))
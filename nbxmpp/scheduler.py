@@ -0,0 +1,130 @@
+# This file is part of nbxmpp.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from typing import Any
+
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Callable
+
+from gi.repository import GLib
+
+from nbxmpp.structs import SchedulerStats
+from nbxmpp.util import LogAdapter
+
+log = logging.getLogger("nbxmpp.scheduler")
+
+
+class DeadlineScheduler:
+    """
+    Keeps all deadlines (task and IQ timeouts) of a client in one heap
+
+    Only one GLib timeout source is armed at any time, for the earliest
+    pending deadline. Removed deadlines are dropped lazily from the heap.
+    """
+
+    def __init__(self, log_: logging.Logger | LogAdapter = log) -> None:
+        self._log = log_
+        self._heap: list[tuple[float, int]] = []
+        self._callbacks: dict[int, Callable[[], Any]] = {}
+        self._handle_counter = itertools.count(1)
+
+        self._source_id: int | None = None
+        self._armed_deadline: float | None = None
+
+        self._peak_pending = 0
+        self._scheduled = 0
+        self._expired = 0
+        self._removed = 0
+
+    def add(self, timeout: float, callback: Callable[[], Any]) -> int:
+        """
+        Schedule callback to be called after timeout seconds
+
+        Returns a handle which can be passed to remove()
+        """
+        handle = next(self._handle_counter)
+        heapq.heappush(self._heap, (time.monotonic() + timeout, handle))
+        self._callbacks[handle] = callback
+
+        self._scheduled += 1
+        self._peak_pending = max(self._peak_pending, len(self._callbacks))
+
+        self._arm()
+        return handle
+
+    def remove(self, handle: int) -> None:
+        if self._callbacks.pop(handle, None) is None:
+            return
+
+        self._removed += 1
+
+        if not self._callbacks:
+            self._heap.clear()
+            self._disarm()
+
+        elif len(self._heap) > 2 * len(self._callbacks) + 64:
+            self._heap = [entry for entry in self._heap if entry[1] in self._callbacks]
+            heapq.heapify(self._heap)
+
+    def clear(self) -> None:
+        self._callbacks.clear()
+        self._heap.clear()
+        self._disarm()
+
+    def get_stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            pending=len(self._callbacks),
+            peak_pending=self._peak_pending,
+            scheduled=self._scheduled,
+            expired=self._expired,
+            removed=self._removed,
+        )
+
+    def _arm(self) -> None:
+        while self._heap and self._heap[0][1] not in self._callbacks:
+            heapq.heappop(self._heap)
+
+        if not self._heap:
+            self._disarm()
+            return
+
+        deadline = self._heap[0][0]
+        if self._armed_deadline is not None and self._armed_deadline <= deadline:
+            return
+
+        self._disarm()
+        delay = max(0, int((deadline - time.monotonic()) * 1000) + 1)
+        self._source_id = GLib.timeout_add(delay, self._on_deadline)
+        self._armed_deadline = deadline
+
+    def _disarm(self) -> None:
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+        self._armed_deadline = None
+
+    def _on_deadline(self) -> bool:
+        self._source_id = None
+        self._armed_deadline = None
+
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            _deadline, handle = heapq.heappop(self._heap)
+            callback = self._callbacks.pop(handle, None)
+            if callback is None:
+                continue
+
+            self._expired += 1
+            try:
+                callback()
+            except Exception:
+                self._log.exception("Error while handling deadline")
+
+        self._arm()
+        return False
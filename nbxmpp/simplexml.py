@@ -20,6 +20,7 @@ import xml.parsers.expat
 from collections.abc import Callable
 from collections.abc import Iterator
 from copy import deepcopy
+from functools import lru_cache
 from xml.parsers.expat import ExpatError
 
 from nbxmpp.const import NOT_ALLOWED_XML_CHARS
@@ -29,14 +30,34 @@ Attrs = dict[str, str]
 log = logging.getLogger("nbxmpp.simplexml")
 
 
+XML_ESCAPE_ITEMS = tuple(NOT_ALLOWED_XML_CHARS.items())
+
+# Short strings are mostly namespaces and attribute values
+# which are serialized over and over again
+SHORT_TEXT_LENGTH = 64
+
+
+def _XMLescape(text: str) -> str:
+    # Most text does not need escaping, the membership tests are much
+    # cheaper than str.replace(), str.translate() or a regex on long text.
+    # "&" must be replaced first, the other replacements add it.
+    for char, entity in XML_ESCAPE_ITEMS:
+        if char in text:
+            text = text.replace(char, entity)
+    return text
+
+
+_XMLescape_short = lru_cache(maxsize=512)(_XMLescape)
+
+
 def XMLescape(text: str) -> str:
     """
     Return escaped text
     """
 
-    for key, value in NOT_ALLOWED_XML_CHARS.items():
-        text = text.replace(key, value)
-    return text
+    if len(text) <= SHORT_TEXT_LENGTH:
+        return _XMLescape_short(text)
+    return _XMLescape(text)
 
 
 class Node:
@@ -71,6 +92,10 @@ class Node:
 
     FORCE_NODE_RECREATION = False
 
+    # Set by NodeBuilder for stanzas it built as Protocol instance without
+    # calling Protocol.__init__(), cleared by Protocol.init_protocol()
+    protocol_init_pending = False
+
     def __init__(
         self,
         tag: str | None = None,
@@ -362,10 +387,20 @@ class Node:
         Filter all child nodes using specified arguments as filter. Return the
         first found or None if not found
         """
-        tags = self.getTags(name, attrs, namespace)
-        if not tags:
-            return None
-        return tags[0]
+        for node in self.kids:
+            if namespace and namespace != node.namespace:
+                continue
+            if node.name != name:
+                continue
+            if attrs:
+                node_attrs = node.attrs
+                if any(
+                    key not in node_attrs or node_attrs[key] != value
+                    for key, value in attrs.items()
+                ):
+                    continue
+            return node
+        return None
 
     def getTagAttr(
         self, tag: str, attr: str, namespace: str | None = None
@@ -630,6 +665,8 @@ class NodeBuilder:
         initial_node: Node | None = None,
         dispatch_depth: int = 1,
         finished: bool = True,
+        framed: bool = False,
+        get_stanza_class: Callable[[str, str], type[Node]] | None = None,
     ) -> None:
         """
         Take two optional parameters: "data" and "initial_node"
@@ -638,6 +675,17 @@ class NodeBuilder:
         "initial_node" is provided it used as "starting point". You can think
         about it as of "node upgrade". "data" (if provided) feeded to parser
         immidiatedly after instance init.
+
+        If "framed" is True, every chunk of data passed to Parse() is expected
+        to be one complete element (e.g. a RFC 7395 websocket frame). The
+        elements are parsed as children of an implicit root element, so one
+        parser can be used for all of them. Use dispatch_depth=2 to dispatch
+        every frame.
+
+        If "get_stanza_class" is given, it is called with the namespace and
+        name of every element at dispatch depth and returns the class the
+        element is built as. A new instance is created for every element, only
+        the Node part of the instance is initialized.
         """
         self._parser = xml.parsers.expat.ParserCreate()
         self._parser.UseForeignDTD(False)
@@ -665,6 +713,9 @@ class NodeBuilder:
         self.data_buffer = None
         self.stream_error = ""
         self._is_stream = not finished
+        self._get_stanza_class = get_stanza_class
+        if framed:
+            self._parser.Parse("<frames>", False)
         if data:
             self._parser.Parse(data, finished)
 
@@ -694,7 +745,9 @@ class NodeBuilder:
             "STARTTAG.. DEPTH -> %i , tag -> %s, attrs -> %s", self.__depth, tag, attrs
         )
         if self.__depth == self._dispatch_depth:
-            if not self._mini_dom:
+            if self._get_stanza_class is not None:
+                self._mini_dom = self._build_stanza(tag, attrs)
+            elif not self._mini_dom:
                 self._mini_dom = Node(
                     tag=tag, attrs=attrs, nsp=self._document_nsp, node_built=True
                 )
@@ -739,6 +792,23 @@ class NodeBuilder:
             self._ptr.parent.data.append("")
         self.last_is_data = False
 
+    def _build_stanza(self, tag: str, attrs: Attrs) -> Node:
+        assert self._get_stanza_class is not None
+        pfx, name = ([""] + tag.split(":"))[-2:]
+        xmlns = attrs.get(f"xmlns:{pfx}" if pfx else "xmlns")
+        if xmlns is None and self._document_nsp is not None:
+            xmlns = self._document_nsp.get(pfx)
+        if xmlns is None:
+            xmlns = "http://www.gajim.org/xmlns/undeclared"
+
+        stanza_class = self._get_stanza_class(xmlns, name)
+        stanza = stanza_class.__new__(stanza_class)
+        Node.__init__(
+            stanza, tag=tag, attrs=attrs, nsp=self._document_nsp, node_built=True
+        )
+        stanza.protocol_init_pending = True
+        return stanza
+
     def _check_stream_start(self, ns: str, tag: str) -> None:
         if self._is_stream:
             if ns != "http://etherx.jabber.org/streams" or tag != "stream":
@@ -762,6 +832,9 @@ class NodeBuilder:
                 else:
                     self.stream_error = self._mini_dom.getData()
             self.dispatch(self._mini_dom)
+            # The dispatched node must not be modified anymore, e.g. by
+            # whitespace between stanzas
+            self._ptr = None
         elif self.__depth > self._dispatch_depth:
             self._ptr = self._ptr.parent
         else:
@@ -13,7 +13,9 @@ from typing import TYPE_CHECKING
 
 import logging
 import random
+import sys
 import time
+from collections.abc import Callable
 from collections.abc import Sequence
 from dataclasses import dataclass
 from dataclasses import field
@@ -67,6 +69,19 @@ class StanzaHandler(NamedTuple):
     priority: int = 50
 
 
+class PubSubEventHandler(NamedTuple):
+    node: str
+    callback: Any
+
+
+class SchedulerStats(NamedTuple):
+    pending: int
+    peak_pending: int
+    scheduled: int
+    expired: int
+    removed: int
+
+
 class CommonResult(NamedTuple):
     jid: JID | None = None
 
@@ -165,6 +180,73 @@ class StanzaIDData(NamedTuple):
     by: str
 
 
+class PubSubEventItem:
+    """
+    An item or a retraction of a batched PubSub event
+
+    The payload is parsed on first access of `data` with the parser a
+    module has set. If parsing fails the error is logged, `data` is None
+    and `error` holds the exception.
+    """
+
+    __slots__ = ("_data", "_error", "_parsed", "_parser", "id", "item", "retracted")
+
+    def __init__(
+        self, id_: str | None, item: Node | None = None, retracted: bool = False
+    ) -> None:
+        self.id = id_
+        self.item = item
+        self.retracted = retracted
+        self._parser: Callable[[Node], Any] | None = None
+        self._parsed = False
+        self._data: Any = None
+        self._error: Exception | None = None
+
+    def set_parser(self, parser: Callable[[Node], Any]) -> None:
+        self._parser = parser
+        self._parsed = False
+        self._data = None
+        self._error = None
+
+    @property
+    def data(self) -> Any:
+        if self._parsed or self._parser is None or self.item is None:
+            return self._data
+
+        self._parsed = True
+        try:
+            self._data = self._parser(self.item)
+        except Exception as error:
+            log.warning("Unable to parse pubsub item %s: %s", self.id, error)
+            self._error = error
+        return self._data
+
+    @property
+    def error(self) -> Exception | None:
+        """
+        The exception raised by the parser, parses the item if needed
+        """
+        _ = self.data
+        return self._error
+
+    def __eq__(self, other: object) -> bool:
+        # Compares the item node instead of data, so a comparison
+        # never runs the parser
+        if not isinstance(other, PubSubEventItem):
+            return NotImplemented
+        return (self.id, self.retracted, self.item) == (
+            other.id,
+            other.retracted,
+            other.item,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.retracted, self.item))
+
+    def __repr__(self) -> str:
+        return "PubSubEventItem(id=%r, retracted=%s)" % (self.id, self.retracted)
+
+
 class PubSubEventData(NamedTuple):
     node: str
     id: str | None = None
@@ -173,6 +255,28 @@ class PubSubEventData(NamedTuple):
     deleted: bool = False
     retracted: bool = False
     purged: bool = False
+    # Set only for events with more than one item or retraction,
+    # in document order
+    items: tuple[PubSubEventItem, ...] = ()
+
+    @property
+    def is_batch(self) -> bool:
+        return bool(self.items)
+
+    @property
+    def last_item(self) -> PubSubEventItem | None:
+        """
+        The last published item of a batch
+        """
+        for item in reversed(self.items):
+            if not item.retracted:
+                return item
+        return None
+
+    def set_item_parser(self, parser: Callable[[Node], Any]) -> None:
+        for item in self.items:
+            if not item.retracted:
+                item.set_parser(parser)
 
 
 class MoodData(NamedTuple):
@@ -377,7 +481,7 @@ class RosterData(NamedTuple):
 
 class RosterPush(NamedTuple):
     item: RosterItem
-    version: str
+    version: str | None
 
 
 class ServerAddress(NamedTuple):
@@ -405,7 +509,7 @@ class ServerAddress(NamedTuple):
         return self.proxy is not None
 
 
-@dataclass
+@dataclass(slots=True)
 class RosterItem:
     jid: JID
     name: str | None = None
@@ -416,7 +520,10 @@ class RosterItem:
 
     @classmethod
     def from_node(cls, node: Node) -> RosterItem:
-        attrs = node.getAttrs(copy=True)
+        # Called for every item of the roster, which can have many thousand
+        # items. Attributes are only read, and the values which repeat across
+        # items are interned so all items share the same strings.
+        attrs = node.attrs
         jid = attrs.get("jid")
         if jid is None:
             raise Exception("jid attribute missing")
@@ -425,14 +532,18 @@ class RosterItem:
         if jid.is_full:
             raise Exception("full jid in roster not allowed")
 
-        groups = {group.getData() for group in node.getTags("group")}
+        groups = {
+            sys.intern(group.getData()) for group in node.kids if group.name == "group"
+        }
 
+        ask = attrs.get("ask")
+        approved = attrs.get("approved")
         return cls(
             jid=jid,
             name=attrs.get("name"),
-            ask=attrs.get("ask"),
-            subscription=attrs.get("subscription") or "none",
-            approved=attrs.get("approved"),
+            ask=ask and sys.intern(ask),
+            subscription=sys.intern(attrs.get("subscription") or "none"),
+            approved=approved and sys.intern(approved),
             groups=groups,
         )
 
@@ -1358,6 +1469,7 @@ class PresenceProperties:
     muc_destroyed: MucDestroyed | None = None
     entity_caps: EntityCapsData | None = None
     hats: HatData | None = None
+    unchanged: bool = False
 
     @property
     def is_self_presence(self) -> bool:
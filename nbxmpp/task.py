@@ -11,12 +11,16 @@ from typing import ParamSpec
 from typing import TYPE_CHECKING
 from typing import TypeVar
 
+import asyncio
+import concurrent.futures
 import inspect
 import logging
 import weakref
 from collections.abc import Callable
 from collections.abc import Generator
+from collections.abc import Iterable
 from enum import IntEnum
+from functools import partial
 from functools import wraps
 
 from gi.repository import GLib
@@ -33,6 +37,7 @@ from nbxmpp.simplexml import Node
 if TYPE_CHECKING:
     from nbxmpp.client import Client
     from nbxmpp.dispatcher import NBXMPPModuleT
+    from nbxmpp.scheduler import DeadlineScheduler
 
 log = logging.getLogger("nbxmpp.task")
 
@@ -78,6 +83,7 @@ def _setup_task(
     task: Task, client: Client, callback: Callable[..., Any] | None, user_data: Any
 ) -> Task:
     client.add_task(task)
+    task.set_scheduler(client.scheduler)
     task.set_finalize_func(client.remove_task)
     task.set_user_data(user_data)
     if callback is not None:
@@ -86,6 +92,14 @@ def _setup_task(
     return task
 
 
+def _has_running_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
 def iq_request_task(func: Callable[..., T]) -> Callable[..., T]:
     @wraps(func)
     def func_wrapper(
@@ -126,6 +140,9 @@ class Task:
     the implementation of _run_async() must be really async, means it should
     not call _async_finished() in the same mainloop cycle. Otherwise sub tasks
     may break. _async_finished() needs to call _next_step(result).
+
+    Tasks are awaitable, awaiting a task returns or raises the same as
+    finish() would once the task is finished.
     """
 
     _process_types = (NoType,)
@@ -142,8 +159,10 @@ class Task:
         self._user_data: Any | None = None
         self._timeout: int | None = None
         self._timeout_id: int | None = None
+        self._scheduler: DeadlineScheduler | None = None
         self._finalize_func: Callable[..., Any] | None = None
         self._finalize_context: Any = None
+        self._future: asyncio.Future[Any] | None = None
         self._state = TaskState.INIT
 
     @property
@@ -166,23 +185,90 @@ class Task:
 
         self._done_callbacks.append(callback)
 
+    def get_future(self) -> asyncio.Future[Any]:
+        """
+        Returns an asyncio future which is resolved with the outcome
+        of the task, the same way finish() would return or raise.
+
+        Cancelling the future cancels the task. Must be called from
+        within a running event loop, e.g. the GLib loop installed by
+        PyGObject's asyncio event loop policy.
+        """
+        if self._future is not None:
+            return self._future
+
+        if self._state.is_finished or self._state.is_cancelled:
+            raise RuntimeError("Task is finished")
+
+        self._future = asyncio.get_running_loop().create_future()
+        self._future.add_done_callback(self._on_future_done)
+        return self._future
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        return self.get_future().__await__()
+
+    def _on_future_done(self, future: asyncio.Future[Any]) -> None:
+        if future.cancelled():
+            self.cancel()
+
+    def _resolve_future(self) -> None:
+        if self._future is None or self._future.done():
+            return
+
+        if self._error is not None:
+            self._future.set_exception(self._error)
+            # Fatal errors are already logged by the task, don't let
+            # asyncio complain about futures nobody awaited
+            self._future.exception()
+        else:
+            self._future.set_result(self._result)
+
     def set_timeout(self, timeout: int | None) -> None:
         self._timeout = timeout
 
+    def set_scheduler(self, scheduler: DeadlineScheduler) -> None:
+        """
+        Use the scheduler for the timeout instead of a separate GLib source
+        """
+        self._scheduler = scheduler
+
     def start(self) -> None:
         if not self._state.is_init:
             raise RuntimeError("Task already started")
 
-        if self._timeout is not None:
-            self._logger.info(
-                "Add timeout for task: %s s, task id: %s", self._timeout, id(self)
-            )
-            self._timeout_id = GLib.timeout_add_seconds(self._timeout, self._on_timeout)
+        self._add_timeout()
+
+        if _has_running_loop():
+            # The task can finish before it is awaited, make sure
+            # the outcome is still available at that point
+            self.get_future()
 
         self._state = TaskState.RUNNING
         next(self._gen)
         self._next_step(self)
 
+    def _add_timeout(self) -> None:
+        if self._timeout is None:
+            return
+
+        self._logger.info(
+            "Add timeout for task: %s s, task id: %s", self._timeout, id(self)
+        )
+        if self._scheduler is not None:
+            self._timeout_id = self._scheduler.add(self._timeout, self._on_timeout)
+        else:
+            self._timeout_id = GLib.timeout_add_seconds(self._timeout, self._on_timeout)
+
+    def _remove_timeout(self) -> None:
+        if self._timeout_id is None:
+            return
+
+        if self._scheduler is not None:
+            self._scheduler.remove(self._timeout_id)
+        else:
+            GLib.source_remove(self._timeout_id)
+        self._timeout_id = None
+
     def _run_async(self, data: Any) -> None:
         raise NotImplementedError
 
@@ -232,6 +318,7 @@ class Task:
     def _set_finished(self) -> None:
         self._state = TaskState.FINISHED
         self._invoke_callbacks()
+        self._resolve_future()
         self._finalize()
 
     def _log_if_fatal(self, error: BaseError | Exception | Any) -> None:
@@ -247,7 +334,7 @@ class Task:
                 self._logger.log(error.log_level, error)
 
         elif isinstance(error, Exception):
-            self._logger.exception("Fatal Exception")
+            self._logger.error("Fatal Exception", exc_info=error)
 
     def _invoke_callbacks(self) -> None:
         for callback in self._done_callbacks:
@@ -314,12 +401,12 @@ class Task:
         self._error = CancelledError()
         if invoke_callbacks:
             self._invoke_callbacks()
+        self._resolve_future()
         self._finalize()
 
     def _finalize(self) -> None:
-        if self._timeout_id is not None:
-            GLib.source_remove(self._timeout_id)
-            self._timeout_id = None
+        self._remove_timeout()
+        self._scheduler = None
         self._done_callbacks.clear()
         self._sub_task = None
         self._error = None
@@ -347,9 +434,9 @@ class IqRequestTask(Task):
 
     def _run_async(self, data: Node) -> None:
         assert self._client is not None
-        self._iq_id = self._client.send_stanza(
-            data, callback=self._async_finished, timeout=self._timeout
-        )
+        # The task timeout covers the whole request, so there is no need
+        # to register the same timeout again for the IQ id
+        self._iq_id = self._client.send_stanza(data, callback=self._async_finished)
 
     def _async_finished(
         self, _client: Client, result: Any, *args: Any, **kwargs: Any
@@ -369,3 +456,245 @@ class IqRequestTask(Task):
             self._client._dispatcher.remove_iq_callback(self._iq_id)  # type: ignore
         self._client = None
         super()._finalize()
+
+
+def gather(
+    factories: Iterable[Callable[[], Task]],
+    limit: int = 10,
+    timeout: int | None = None,
+) -> GatherTask:
+    """
+    Create and start a GatherTask, see GatherTask for details
+    """
+    task = GatherTask(factories, limit=limit)
+    task.set_timeout(timeout)
+    task.start()
+    return task
+
+
+def _noop_generator() -> Generator[None, Any, None]:
+    yield
+
+
+class GatherTask(Task):
+    """
+    A Task which runs several tasks concurrently
+
+    Each factory is called without arguments and must return a started
+    task, e.g. functools.partial(discovery.disco_info, jid). At most
+    `limit` tasks are in flight, the next factory is only called after
+    another task finished.
+
+    The result is a list which holds for every factory, in the same order,
+    the result of its task or the error it finished with. Errors do not
+    abort the other tasks, callers have to check each entry with is_error().
+
+    Like every task a GatherTask can be yielded from a task generator.
+    """
+
+    def __init__(
+        self,
+        factories: Iterable[Callable[[], Task]],
+        limit: int = 10,
+        logger: logging.Logger = log,
+    ) -> None:
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+
+        super().__init__(_noop_generator(), logger)
+        self._factories = list(factories)
+        self._limit = limit
+        self._next_index = 0
+        self._results: list[Any] = [None] * len(self._factories)
+        self._active: dict[Task, int] = {}
+        self._idle_id: int | None = None
+
+    def start(self) -> None:
+        if not self._state.is_init:
+            raise RuntimeError("Task already started")
+
+        self._add_timeout()
+
+        if _has_running_loop():
+            self.get_future()
+
+        self._state = TaskState.RUNNING
+
+        # Tasks must not finish in the mainloop cycle they are created in,
+        # otherwise the parent task could not add its done callback
+        self._idle_id = GLib.idle_add(self._on_idle)
+
+    def _on_idle(self) -> bool:
+        self._idle_id = None
+        self._launch_tasks()
+        return False
+
+    def _launch_tasks(self) -> None:
+        while (
+            self._state.is_running
+            and len(self._active) < self._limit
+            and self._next_index < len(self._factories)
+        ):
+            index = self._next_index
+            self._next_index += 1
+
+            try:
+                task = self._factories[index]()
+                task.add_done_callback(self._on_task_done, weak=False)
+            except Exception as error:
+                self._logger.warning("Unable to start task %s: %s", index, error)
+                self._results[index] = error
+                continue
+
+            self._active[task] = index
+
+        if not self._state.is_running:
+            return
+
+        if not self._active and self._next_index == len(self._factories):
+            self._result = self._results
+            self._set_finished()
+
+    def _on_task_done(self, task: Task) -> None:
+        index = self._active.pop(task)
+        self._results[index] = task.get_result()
+        self._launch_tasks()
+
+    def _finalize(self) -> None:
+        if self._idle_id is not None:
+            GLib.source_remove(self._idle_id)
+            self._idle_id = None
+
+        active = list(self._active)
+        self._active.clear()
+        for task in active:
+            task.cancel(invoke_callbacks=False)
+
+        self._factories = []
+        self._results = []
+        super()._finalize()
+
+
+def shield(task: Task) -> ShieldTask:
+    """
+    Create and start a ShieldTask for task, see ShieldTask for details
+    """
+    shielded = ShieldTask(task)
+    shielded.start()
+    return shielded
+
+
+class ShieldTask(Task):
+    """
+    A Task which finishes with the outcome of another running task
+
+    Cancelling a ShieldTask, or reaching its timeout, does not cancel the
+    wrapped task. This allows several callers to wait for the same task,
+    each of them yields its own ShieldTask.
+    """
+
+    def __init__(self, task: Task, logger: logging.Logger = log) -> None:
+        super().__init__(_noop_generator(), logger)
+        self._task: Task | None = task
+
+    def start(self) -> None:
+        if not self._state.is_init:
+            raise RuntimeError("Task already started")
+
+        assert self._task is not None
+        self._add_timeout()
+
+        if _has_running_loop():
+            self.get_future()
+
+        self._state = TaskState.RUNNING
+        self._task.add_done_callback(self._on_task_done, weak=False)
+
+    def _on_task_done(self, task: Task) -> None:
+        if not self._state.is_running:
+            return
+
+        result = task.get_result()
+        if is_fatal_error(result):
+            self._error = result
+        else:
+            self._result = result
+        self._set_finished()
+
+    def _finalize(self) -> None:
+        self._task = None
+        super()._finalize()
+
+
+_executor: concurrent.futures.ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="nbxmpp"
+        )
+    return _executor
+
+
+def run_in_thread(func: Callable[..., Any], *args: Any, **kwargs: Any) -> ThreadTask:
+    """
+    Create and start a ThreadTask, see ThreadTask for details
+    """
+    task = ThreadTask(partial(func, *args, **kwargs))
+    task.start()
+    return task
+
+
+class ThreadTask(Task):
+    """
+    A Task which runs a blocking function in a thread pool
+
+    The task finishes in the GLib mainloop with the return value of the
+    function, or the exception it raised. Cancelling the task discards the
+    result, a function which is already running is not interrupted.
+    """
+
+    def __init__(self, func: Callable[[], Any], logger: logging.Logger = log) -> None:
+        super().__init__(_noop_generator(), logger)
+        self._func: Callable[[], Any] | None = func
+        self._thread_future: concurrent.futures.Future[Any] | None = None
+
+    def start(self) -> None:
+        if not self._state.is_init:
+            raise RuntimeError("Task already started")
+
+        assert self._func is not None
+        self._add_timeout()
+
+        if _has_running_loop():
+            self.get_future()
+
+        self._state = TaskState.RUNNING
+        self._thread_future = _get_executor().submit(self._func)
+        self._thread_future.add_done_callback(self._on_thread_done)
+
+    def _on_thread_done(self, future: concurrent.futures.Future[Any]) -> None:
+        # Called in the worker thread
+        GLib.idle_add(self._on_finished, future)
+
+    def _on_finished(self, future: concurrent.futures.Future[Any]) -> bool:
+        if not self._state.is_running or future.cancelled():
+            return False
+
+        error = future.exception()
+        if error is not None:
+            self._log_if_fatal(error)
+            self._error = error
+        else:
+            self._result = future.result()
+        self._set_finished()
+        return False
+
+    def _finalize(self) -> None:
+        if self._thread_future is not None:
+            self._thread_future.cancel()
+            self._thread_future = None
+        self._func = None
+        super()._finalize()
@@ -318,10 +318,9 @@ class TCPConnection(Connection):
             self._log.error(error)
             return
 
-        decoded_data = data.decode()
-        self._log_stanza(decoded_data, received=False)
+        self._log_stanza(data, received=False)
 
-        if decoded_data == " ":
+        if data == b" ":
             # keepalive whitespace
             self._renew_keepalive_timer()
 
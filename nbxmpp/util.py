@@ -24,7 +24,6 @@ from functools import lru_cache
 from logging import LoggerAdapter
 
 from gi.repository import Gio
-from gi.repository import Soup
 from packaging.version import Version
 
 from nbxmpp.const import GIO_TLS_ERRORS
@@ -49,6 +48,8 @@ from nbxmpp.structs import Properties
 from nbxmpp.third_party import hsluv
 
 if TYPE_CHECKING:
+    from gi.repository import Soup
+
     from nbxmpp.protocol import Protocol
 
 log = logging.getLogger("nbxmpp.util")
@@ -377,6 +378,11 @@ def get_invalid_xml_regex() -> re.Pattern[str]:
 
 INVALID_XML_RX = get_invalid_xml_regex()
 
+# The same characters UTF-8 encoded, all of them contain one of the
+# INVALID_XML_BYTES_MARKERS, which allows to skip the regex for most data
+INVALID_XML_BYTES_RX = re.compile(INVALID_XML_RX.pattern.encode())
+INVALID_XML_BYTES_MARKERS = (b"\xef\xb7", b"\xbf\xbe", b"\xbf\xbf")
+
 
 def get_tls_error_phrase(tls_error: Gio.TlsCertificateFlags) -> str | None:
     phrase = GIO_TLS_ERRORS.get(tls_error)
@@ -445,6 +451,37 @@ class Observable:
             func(self, signal_name, *args, **kwargs)
 
 
+class StanzaDump:
+    """
+    Wraps data for a log record and serializes it only when the record
+    is emitted, nothing is decoded or converted while the level is disabled
+    """
+
+    __slots__ = ("_data", "_max_length")
+
+    def __init__(self, data: str | bytes | Node, max_length: int | None = None) -> None:
+        self._data = data
+        self._max_length = max_length
+
+    def __str__(self) -> str:
+        data = self._data
+        max_length = self._max_length
+        if isinstance(data, bytes):
+            truncated = max_length is not None and len(data) > max_length
+            if truncated:
+                data = data[:max_length]
+            text = data.decode(errors="replace")
+        else:
+            text = str(data)
+            truncated = max_length is not None and len(text) > max_length
+            if truncated:
+                text = text[:max_length]
+
+        if truncated:
+            return f"{text} [truncated]"
+        return text
+
+
 class LogAdapter(LoggerAdapter):
 
     def set_context(self, context: str) -> None:
@@ -132,7 +132,8 @@ class WebsocketConnection(Connection):
     def _on_websocket_message(
         self, _websocket: Soup.WebsocketConnection, _type: int, message: GLib.Bytes
     ) -> None:
-        data = message.get_data().decode()
+        # The dispatcher parses the bytes, they are only decoded for logging
+        data = message.get_data()
         self._log_stanza(data)
 
         if self._input_closed:
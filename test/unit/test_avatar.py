@@ -61,3 +61,44 @@ class AvatarTest(StanzaHandlerTest):
         )
 
         self.dispatcher.process_data(event)
+
+    def test_batched_avatar_event(self):
+        received = []
+
+        def _on_message(_con, _stanza, properties):
+            received.append(properties.pubsub_event)
+
+        event = """
+            <message from='test@test.test'>
+                <event xmlns='http://jabber.org/protocol/pubsub#event'>
+                    <items node='urn:xmpp:avatar:metadata'>
+                        <item id='111f4b3c50d7b0df729d299bc6f8e9ef9066971f'>
+                            <metadata xmlns='urn:xmpp:avatar:metadata'>
+                                <info bytes='12345'
+                                      id='111f4b3c50d7b0df729d299bc6f8e9ef9066971f'
+                                      type='image/png'/>
+                            </metadata>
+                        </item>
+                        <item id='current'>%s</item>
+                    </items>
+                </event>
+            </message>
+        """
+
+        self.dispatcher.register_handler(
+            StanzaHandler(
+                name="message", callback=_on_message, ns=Namespace.PUBSUB_EVENT
+            )
+        )
+
+        # A malformed last item is dropped instead of reported as removed avatar
+        self.dispatcher.process_data(event % "<metadata xmlns='urn:xmpp:invalid'/>")
+        self.assertEqual(received, [])
+
+        self.dispatcher.process_data(
+            event % "<metadata xmlns='urn:xmpp:avatar:metadata'/>"
+        )
+        (pubsub_event,) = received
+        self.assertTrue(pubsub_event.is_batch)
+        self.assertIsNone(pubsub_event.data)
+        self.assertIsNone(pubsub_event.last_item.error)
@@ -0,0 +1,160 @@
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+from test.lib.util import StanzaHandlerTest
+
+from nbxmpp.avatar_cache import AvatarCache
+from nbxmpp.errors import StanzaError
+from nbxmpp.modules.user_avatar import AvatarData
+from nbxmpp.protocol import Iq
+from nbxmpp.util import b64encode
+
+AVATAR = b"avatar"
+AVATAR_SHA = hashlib.sha1(AVATAR).hexdigest()
+
+RESPONSE = """
+<iq type='result' id='%s' from='juliet@capulet.lit' to='test@test.test/res'>
+  <pubsub xmlns='http://jabber.org/protocol/pubsub'>
+    <items node='urn:xmpp:avatar:data'>
+      <item id='%s'>
+        <data xmlns='urn:xmpp:avatar:data'>%s</data>
+      </item>
+    </items>
+  </pubsub>
+</iq>
+"""
+
+ERROR = """
+<iq type='error' id='%s' from='juliet@capulet.lit' to='test@test.test/res'>
+  <error type='cancel'>
+    <item-not-found xmlns='urn:ietf:params:xml:ns:xmpp-stanzas'/>
+  </error>
+</iq>
+"""
+
+
+class TestAvatarCache(unittest.TestCase):
+
+    def test_add_and_get(self):
+        cache = AvatarCache()
+        self.assertEqual(cache.add(AVATAR), AVATAR_SHA)
+        self.assertIn(AVATAR_SHA, cache)
+        self.assertEqual(cache.get(AVATAR_SHA), AVATAR)
+        self.assertIsNone(cache.get("0" * 40))
+
+    def test_verify(self):
+        cache = AvatarCache()
+        with self.assertRaises(ValueError):
+            cache.add(AVATAR, sha="0" * 40)
+        self.assertEqual(len(cache), 0)
+
+    def test_lru(self):
+        cache = AvatarCache(max_items=2)
+        first = cache.add(b"1")
+        second = cache.add(b"2")
+        cache.get(first)
+        cache.add(b"3")
+
+        self.assertIn(first, cache)
+        self.assertNotIn(second, cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as path:
+            AvatarCache(path=path).add(AVATAR)
+
+            cache = AvatarCache(path=path)
+            self.assertIn(AVATAR_SHA, cache)
+            self.assertEqual(cache.get(AVATAR_SHA), AVATAR)
+
+            # Corrupted files are never returned
+            (Path(path) / AVATAR_SHA).write_bytes(b"corrupted")
+            cache.clear()
+            self.assertIsNone(cache.get(AVATAR_SHA))
+            self.assertNotIn(AVATAR_SHA, cache)
+
+    def test_invalid_sha(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = AvatarCache(path=path)
+            self.assertIsNone(cache.get("../avatar"))
+            self.assertNotIn("../avatar", cache)
+
+
+class TestAvatarRequest(StanzaHandlerTest):
+
+    def setUp(self):
+        super().setUp()
+        self.client.get_module = self.dispatcher.get_module
+        self.client.avatar_cache = AvatarCache()
+        self.results = []
+        self.errors = []
+
+    def _on_result(self, task):
+        try:
+            self.results.append(task.finish())
+        except Exception as error:
+            self.errors.append(error)
+
+    def _send_error(self):
+        ((args, kwargs),) = self.client.send_stanza.call_args_list
+        self.client.send_stanza.reset_mock()
+        kwargs["callback"](self.client, Iq(node=ERROR % args[0].getID()))
+
+    def _send_error_for_all(self):
+        calls = self.client.send_stanza.call_args_list
+        self.client.send_stanza.reset_mock()
+        for args, kwargs in calls:
+            kwargs["callback"](self.client, Iq(node=ERROR % args[0].getID()))
+
+    def test_coalesce_requests(self):
+        avatar = self.dispatcher.get_module("UserAvatar")
+        avatar.request_avatar_data(AVATAR_SHA, callback=self._on_result)
+        avatar.request_avatar_data(AVATAR_SHA, callback=self._on_result)
+
+        ((args, kwargs),) = self.client.send_stanza.call_args_list
+        iq = args[0]
+        response = Iq(node=RESPONSE % (iq.getID(), AVATAR_SHA, b64encode(AVATAR)))
+        kwargs["callback"](self.client, response)
+
+        expected = AvatarData(data=AVATAR, sha=AVATAR_SHA)
+        self.assertEqual(self.results, [expected, expected])
+        self.assertIsNone(self.client.avatar_cache.get_request(AVATAR_SHA))
+
+        # The next request is answered from the cache
+        self.client.send_stanza.reset_mock()
+        avatar.request_avatar_data(AVATAR_SHA, callback=self._on_result)
+        self.client.send_stanza.assert_not_called()
+        self.assertEqual(self.results[-1], expected)
+
+    def test_error(self):
+        avatar = self.dispatcher.get_module("UserAvatar")
+        for cache in (None, self.client.avatar_cache):
+            self.client.avatar_cache = cache
+            avatar.request_avatar_data(AVATAR_SHA, callback=self._on_result)
+            avatar.request_avatar_data(AVATAR_SHA, callback=self._on_result)
+            if cache is None:
+                # Without cache there is no shared request
+                self._send_error_for_all()
+            else:
+                self._send_error()
+
+        self.assertEqual(self.results, [])
+        self.assertEqual(len(self.errors), 4)
+        for error in self.errors:
+            self.assertIsInstance(error, StanzaError)
+
+    def test_vcard_error(self):
+        vcard = self.dispatcher.get_module("VCardTemp")
+        vcard.request_avatar(AVATAR_SHA, callback=self._on_result)
+        vcard.request_avatar(AVATAR_SHA, callback=self._on_result)
+        self._send_error()
+
+        self.assertEqual(self.results, [])
+        self.assertEqual(len(self.errors), 2)
+        for error in self.errors:
+            self.assertIsInstance(error, StanzaError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from test.lib.util import StanzaHandlerTest
+
+from nbxmpp.blocking_store import BlockingStore
+from nbxmpp.protocol import JID
+from nbxmpp.structs import BlockingPush
+from nbxmpp.structs import StanzaHandler
+
+PUSH = """
+<iq type='set' id='push1' to='test@test.test/res'>
+  <block xmlns='urn:xmpp:blocking'>
+    <item jid='romeo@montague.lit'/>
+    <item jid='spam.lit'/>
+  </block>
+</iq>
+"""
+
+UNBLOCK_ALL = """
+<iq type='set' id='push2' to='test@test.test/res'>
+  <unblock xmlns='urn:xmpp:blocking'/>
+</iq>
+"""
+
+MESSAGE = """
+<message from='%s' to='test@test.test/res' type='chat'>
+  <body>Hi</body>
+</message>
+"""
+
+PRESENCE = """
+<presence from='%s' to='test@test.test/res'/>
+"""
+
+ROMEO = JID.from_string("romeo@montague.lit")
+SPAM = JID.from_string("spam.lit")
+NURSE = JID.from_string("nurse@capulet.lit/balcony")
+
+
+class BlockingStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = BlockingStore([ROMEO, SPAM, NURSE])
+
+    def test_is_blocked(self):
+        blocked = [
+            "romeo@montague.lit",
+            "romeo@montague.lit/orchard",
+            "spam.lit",
+            "spam.lit/bot",
+            "bot@spam.lit/res",
+            "nurse@capulet.lit/balcony",
+        ]
+        for jid in blocked:
+            self.assertTrue(self.store.is_blocked(JID.from_string(jid)), jid)
+
+        not_blocked = [
+            "juliet@capulet.lit",
+            "nurse@capulet.lit",
+            "nurse@capulet.lit/kitchen",
+            "montague.lit",
+            "benvolio@montague.lit/orchard",
+        ]
+        for jid in not_blocked:
+            self.assertFalse(self.store.is_blocked(JID.from_string(jid)), jid)
+
+    def test_domain_resource(self):
+        store = BlockingStore([JID.from_string("capulet.lit/balcony")])
+        self.assertTrue(store.is_blocked(JID.from_string("capulet.lit/balcony")))
+        self.assertTrue(store.is_blocked(JID.from_string("nurse@capulet.lit/balcony")))
+        self.assertFalse(store.is_blocked(JID.from_string("nurse@capulet.lit/garden")))
+
+    def test_push(self):
+        juliet = JID.from_string("juliet@capulet.lit")
+        self.store.apply_push(
+            BlockingPush(block={juliet}, unblock={ROMEO}, unblock_all=False)
+        )
+        self.assertIn(juliet, self.store)
+        self.assertNotIn(ROMEO, self.store)
+        self.assertEqual(len(self.store), 3)
+
+        self.store.apply_push(
+            BlockingPush(block=set(), unblock=set(), unblock_all=True)
+        )
+        self.assertEqual(len(self.store), 0)
+        self.assertFalse(self.store.is_blocked(SPAM))
+
+
+class SenderFilterTest(StanzaHandlerTest):
+    def setUp(self):
+        super().setUp()
+        self.client.get_module = self.dispatcher.get_module
+        self.client.set_sender_filter = self.dispatcher.set_sender_filter
+
+        self.store = BlockingStore()
+        self.module = self.dispatcher.get_module("Blocking")
+        self.module.set_blocking_store(self.store, filter_senders=True)
+
+        self.received = []
+
+        def _on_stanza(_client, stanza, _properties):
+            self.received.append(str(stanza.getFrom()))
+
+        for name in ("message", "presence"):
+            self.dispatcher.register_handler(
+                StanzaHandler(name=name, callback=_on_stanza, priority=1)
+            )
+
+    def test_push_updates_filter(self):
+        self.dispatcher.process_data(PUSH)
+        self.assertIn(ROMEO, self.store)
+        self.assertIn(SPAM, self.store)
+
+        self.dispatcher.process_data(MESSAGE % "romeo@montague.lit/orchard")
+        self.dispatcher.process_data(PRESENCE % "bot@spam.lit/res")
+        self.dispatcher.process_data(MESSAGE % "juliet@capulet.lit/balcony")
+        self.dispatcher.process_data(PRESENCE % "juliet@capulet.lit/balcony")
+
+        self.assertEqual(
+            self.received,
+            ["juliet@capulet.lit/balcony", "juliet@capulet.lit/balcony"],
+        )
+
+        self.dispatcher.process_data(UNBLOCK_ALL)
+        self.assertEqual(len(self.store), 0)
+
+    def test_own_account_not_filtered(self):
+        self.store.apply_result([JID.from_string("test.test")])
+
+        self.dispatcher.process_data(PRESENCE % "test@test.test/other")
+        self.dispatcher.process_data(MESSAGE % "test.test")
+        self.dispatcher.process_data(MESSAGE % "bot@test.test/res")
+
+        self.assertEqual(self.received, ["test@test.test/other", "test.test"])
+
+    def test_remove_filter(self):
+        self.store.apply_result([ROMEO])
+        self.module.set_blocking_store(self.store)
+        self.dispatcher.process_data(MESSAGE % "romeo@montague.lit/orchard")
+        self.assertEqual(self.received, ["romeo@montague.lit/orchard"])
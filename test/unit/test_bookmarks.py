@@ -1,7 +1,12 @@
 from test.lib.util import StanzaHandlerTest
 
+from gi.repository import GLib
+
+from nbxmpp.errors import StanzaError
 from nbxmpp.namespaces import Namespace
+from nbxmpp.protocol import Iq
 from nbxmpp.protocol import JID
+from nbxmpp.simplexml import Node
 from nbxmpp.structs import BookmarkData
 from nbxmpp.structs import PubSubEventData
 from nbxmpp.structs import StanzaHandler
@@ -122,3 +127,180 @@ class BookmarkTest(StanzaHandlerTest):
         )
 
         self.dispatcher.process_data(event)
+
+
+ITEMS = """
+<iq type='result' id='%s' from='test@test.test' to='test@test.test/res'>
+  <pubsub xmlns='http://jabber.org/protocol/pubsub'>
+    <items node='urn:xmpp:bookmarks:1'>
+      <item id='one@conference.test.test'>
+        <conference xmlns='urn:xmpp:bookmarks:1' name='One'/>
+      </item>
+      <item id='two@conference.test.test'>
+        <conference xmlns='urn:xmpp:bookmarks:1' name='Two'>
+          <extensions><state xmlns='urn:example'/></extensions>
+        </conference>
+      </item>
+      <item id='three@conference.test.test'>
+        <conference xmlns='urn:xmpp:bookmarks:1' name='Three'/>
+      </item>
+    </items>
+  </pubsub>
+</iq>
+"""
+
+
+def _get_item_id(iq):
+    # The item of a publish or retract request, items requests have none
+    action = iq.getTag("pubsub").getChildren()[0]
+    item = action.getTag("item")
+    return None if item is None else item.getAttr("id")
+
+
+RESULT = "<iq type='result' id='%s' from='test@test.test' to='test@test.test/res'/>"
+
+ERROR = """
+<iq type='error' id='%s' from='test@test.test' to='test@test.test/res'>
+  <error type='cancel'>
+    <item-not-found xmlns='urn:ietf:params:xml:ns:xmpp-stanzas'/>
+  </error>
+</iq>
+"""
+
+
+class BookmarkSyncTest(StanzaHandlerTest):
+
+    def setUp(self):
+        super().setUp()
+        self.client.get_module = self.dispatcher.get_module
+        self.module = self.dispatcher.get_module("NativeBookmarks")
+        self.results = []
+        self.errors = []
+
+    def _on_result(self, task):
+        try:
+            self.results.append(task.finish())
+        except Exception as error:
+            self.errors.append(error)
+
+    def _answer(self, response=RESULT, error_ids=()):
+        # Wait until the next requests are sent, then answer all of them
+        context = GLib.MainContext.default()
+        while not self.client.send_stanza.call_args_list:
+            context.iteration(True)
+
+        calls = self.client.send_stanza.call_args_list
+        self.client.send_stanza.reset_mock()
+        requests = []
+        for args, kwargs in calls:
+            iq = args[0]
+            requests.append(iq)
+            item_id = _get_item_id(iq)
+            template = ERROR if item_id in error_ids else response
+            kwargs["callback"](self.client, Iq(node=template % iq.getID()))
+        return requests
+
+    def _sync(self, bookmarks):
+        self.module.sync_bookmarks(bookmarks, callback=self._on_result)
+
+    def _get_changes(self, requests):
+        published = set()
+        retracted = set()
+        for iq in requests:
+            if iq.getTag("pubsub").getTag("publish") is not None:
+                published.add(_get_item_id(iq))
+            else:
+                retracted.add(_get_item_id(iq))
+        return published, retracted
+
+    def _request_bookmarks(self):
+        self.module.request_bookmarks(callback=self._on_result)
+        self._answer(ITEMS)
+        (bookmarks,) = self.results
+        self.results.clear()
+        return bookmarks
+
+    def test_sync_only_changes(self):
+        one, two, _three = self._request_bookmarks()
+        four = BookmarkData(jid=JID.from_string("four@conference.test.test"))
+
+        # Extensions are compared by value
+        two = two._replace(extensions=Node(node=str(two.extensions)))
+
+        self._sync([one._replace(autojoin=True), two, four])
+        published, retracted = self._get_changes(self._answer())
+        self.assertEqual(
+            published, {"one@conference.test.test", "four@conference.test.test"}
+        )
+        self.assertEqual(retracted, {"three@conference.test.test"})
+        self.assertEqual(self.results, [True])
+
+        # Nothing changed since the last sync
+        self._sync([one._replace(autojoin=True), two, four])
+        self.client.send_stanza.assert_not_called()
+        self.assertEqual(self.results, [True, True])
+
+    def test_sync_requests_state(self):
+        self._sync([])
+        self._answer(ITEMS)
+        published, retracted = self._get_changes(self._answer())
+        self.assertEqual(published, set())
+        self.assertEqual(len(retracted), 3)
+        self.assertEqual(self.results, [True])
+
+    def test_sync_error(self):
+        one, _two, three = self._request_bookmarks()
+        self._sync([one._replace(autojoin=True), three._replace(autojoin=True)])
+        self._answer(error_ids={"one@conference.test.test"})
+        self.assertEqual(self.results, [])
+        self.assertIsInstance(self.errors[0], StanzaError)
+
+        # Only the failed bookmark is published again
+        self._sync([one._replace(autojoin=True), three._replace(autojoin=True)])
+        published, _retracted = self._get_changes(self._answer())
+        self.assertEqual(published, {"one@conference.test.test"})
+
+    def test_events_update_state(self):
+        _one, two, three = self._request_bookmarks()
+
+        self.dispatcher.process_data(
+            """
+            <message from='test@test.test'>
+                <event xmlns='http://jabber.org/protocol/pubsub#event'>
+                    <items node='urn:xmpp:bookmarks:1'>
+                        <retract id='one@conference.test.test'/>
+                    </items>
+                </event>
+            </message>
+            """
+        )
+        self.dispatcher.process_data(
+            """
+            <message from='test@test.test'>
+                <event xmlns='http://jabber.org/protocol/pubsub#event'>
+                    <items node='urn:xmpp:bookmarks:1'>
+                        <item id='three@conference.test.test'>
+                            <conference xmlns='urn:xmpp:bookmarks:1' name='New'/>
+                        </item>
+                    </items>
+                </event>
+            </message>
+            """
+        )
+
+        # Events from others are ignored
+        self.dispatcher.process_data(
+            """
+            <message from='other@test.test'>
+                <event xmlns='http://jabber.org/protocol/pubsub#event'>
+                    <items node='urn:xmpp:bookmarks:1'>
+                        <retract id='two@conference.test.test'/>
+                    </items>
+                </event>
+            </message>
+            """
+        )
+
+        self._sync([two, three._replace(name="New")])
+        self.client.send_stanza.assert_not_called()
+        self.assertEqual(self.results, [True])
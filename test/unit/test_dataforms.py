@@ -0,0 +1,237 @@
+import unittest
+
+from nbxmpp.modules.dataforms import BooleanField
+from nbxmpp.modules.dataforms import create_field
+from nbxmpp.modules.dataforms import DataField
+from nbxmpp.modules.dataforms import DataFormColumns
+from nbxmpp.modules.dataforms import DataRecord
+from nbxmpp.modules.dataforms import extend_form
+from nbxmpp.modules.dataforms import ListSingleField
+from nbxmpp.modules.dataforms import MultipleDataForm
+from nbxmpp.modules.dataforms import SimpleDataForm
+from nbxmpp.simplexml import Node
+
+FORM = """
+<x xmlns='jabber:x:data' type='form'>
+  <title>Room configuration</title>
+  <field var='FORM_TYPE' type='hidden'>
+    <value>http://jabber.org/protocol/muc#roomconfig</value>
+  </field>
+  <field var='muc#roomconfig_roomname' type='text-single' label='Name'>
+    <value>Balcony</value>
+  </field>
+  <field var='muc#roomconfig_persistentroom' type='boolean'>
+    <value>1</value>
+  </field>
+  <field var='muc#roomconfig_whois' type='list-single'>
+    <value>moderators</value>
+    <option label='Moderators'><value>moderators</value></option>
+    <option label='Anyone'><value>anyone</value></option>
+  </field>
+</x>
+"""
+
+SEARCH_RESULT = """
+<x xmlns='jabber:x:data' type='result'>
+  <reported>
+    <field var='address' label='Address'/>
+    <field var='nusers' label='Users'/>
+  </reported>
+  <item>
+    <field var='address'><value>balcony@chat.example</value></field>
+    <field var='nusers'><value>12</value></field>
+  </item>
+  <item>
+    <field var='address'><value>garden@chat.example</value></field>
+    <field var='nusers'><value>3</value></field>
+  </item>
+  <item>
+    <field var='address'><value>orchard@chat.example</value></field>
+    <field var='nusers'><value>25</value></field>
+    <field var='unreported'><value>ignored</value></field>
+  </item>
+  <item>
+    <field var='address'><value>tomb@chat.example</value></field>
+  </item>
+</x>
+"""
+
+
+class SimpleDataFormTest(unittest.TestCase):
+    def setUp(self):
+        self.form = extend_form(Node(node=FORM))
+
+    def test_lazy_fields(self):
+        self.assertIsInstance(self.form, SimpleDataForm)
+        kids = self.form.getTags("field")
+        self.assertFalse(any(isinstance(field, DataField) for field in kids))
+
+        field = self.form["muc#roomconfig_persistentroom"]
+        self.assertIsInstance(field, BooleanField)
+        self.assertIs(field.value, True)
+        self.assertEqual(
+            sum(isinstance(field, DataField) for field in kids),
+            1,
+        )
+
+        whois = self.form.vars["muc#roomconfig_whois"]
+        self.assertIsInstance(whois, ListSingleField)
+        self.assertEqual(whois.value, "moderators")
+        self.assertEqual(
+            [field.var for field in self.form.iter_fields()],
+            [
+                "FORM_TYPE",
+                "muc#roomconfig_roomname",
+                "muc#roomconfig_persistentroom",
+                "muc#roomconfig_whois",
+            ],
+        )
+
+    def test_vars(self):
+        self.assertIn("FORM_TYPE", self.form.vars)
+        self.assertNotIn("muc#roomconfig_unknown", self.form.vars)
+        self.assertIsNone(self.form.vars.get("muc#roomconfig_unknown"))
+        self.assertEqual(len(self.form.vars), 4)
+        with self.assertRaises(KeyError):
+            self.form["muc#roomconfig_unknown"]
+        self.assertFalse(self.form.is_fake_form())
+
+    def test_index_mutation(self):
+        self.assertIn("muc#roomconfig_roomname", self.form.vars)
+
+        field = create_field("text-single", var="muc#roomconfig_roomdesc")
+        self.form.addChild(node=field)
+        self.assertIs(self.form["muc#roomconfig_roomdesc"], field)
+
+        self.form.delChild(field)
+        self.assertNotIn("muc#roomconfig_roomdesc", self.form.vars)
+
+        self.form["muc#roomconfig_roomname"].var = "muc#roomconfig_name"
+        self.assertNotIn("muc#roomconfig_roomname", self.form.vars)
+        self.assertEqual(self.form["muc#roomconfig_name"].value, "Balcony")
+
+        self.form.fields = [create_field("boolean", var="fakeform")]
+        self.assertEqual(list(self.form.vars), ["fakeform"])
+        self.assertTrue(self.form.is_fake_form())
+
+    def test_index_set_attr(self):
+        self.form["muc#roomconfig_roomname"].setAttr("var", "muc#roomconfig_name")
+        self.assertNotIn("muc#roomconfig_roomname", self.form.vars)
+        self.assertEqual(self.form["muc#roomconfig_name"].value, "Balcony")
+
+        # Plain nodes which were not accessed as field yet
+        node = self.form.getTag("field", attrs={"var": "muc#roomconfig_whois"})
+        self.assertNotIsInstance(node, DataField)
+        self.assertIn("muc#roomconfig_whois", self.form.vars)
+        node.setAttr("var", "muc#roomconfig_who")
+        self.assertNotIn("muc#roomconfig_whois", self.form.vars)
+        self.assertEqual(self.form["muc#roomconfig_who"].value, "moderators")
+
+    def test_vars_mutation(self):
+        field = create_field("text-single", var="muc#roomconfig_roomname")
+        field.value = "Garden"
+        self.form.vars["muc#roomconfig_roomname"] = field
+        self.assertEqual(self.form["muc#roomconfig_roomname"].value, "Garden")
+        self.assertEqual(len(self.form.getTags("field")), 4)
+        self.assertEqual(
+            list(self.form.vars)[1],
+            "muc#roomconfig_roomname",
+        )
+
+        self.form.vars["muc#roomconfig_roomdesc"] = create_field(
+            "text-single", var="desc"
+        )
+        self.assertEqual(
+            self.form["muc#roomconfig_roomdesc"].var, "muc#roomconfig_roomdesc"
+        )
+
+        del self.form.vars["muc#roomconfig_roomdesc"]
+        self.assertNotIn("muc#roomconfig_roomdesc", self.form.vars)
+        with self.assertRaises(KeyError):
+            del self.form.vars["muc#roomconfig_roomdesc"]
+
+        self.form.vars = {"fakeform": create_field("boolean", var="fakeform")}
+        self.assertEqual(list(self.form.vars), ["fakeform"])
+        self.assertTrue(self.form.is_fake_form())
+
+    def test_create(self):
+        form = SimpleDataForm(
+            type_="submit",
+            fields=[
+                create_field("hidden", var="FORM_TYPE", value="urn:xmpp:mam:2"),
+                create_field("jid-single", var="with", value="juliet@capulet.lit"),
+            ],
+        )
+        self.assertEqual(form["with"].value, "juliet@capulet.lit")
+        self.assertEqual(len(form.vars), 2)
+
+
+class MultipleDataFormTest(unittest.TestCase):
+    def test_records(self):
+        form = extend_form(Node(node=SEARCH_RESULT))
+        self.assertIsInstance(form, MultipleDataForm)
+        self.assertEqual(
+            [field.var for field in form.reported.iter_fields()],
+            ["address", "nusers"],
+        )
+
+        items = form.items
+        self.assertTrue(all(isinstance(item, DataRecord) for item in items))
+        self.assertEqual(items[1]["address"].value, "garden@chat.example")
+        self.assertEqual(form.items, items)
+
+        record = DataRecord(
+            extend=Node("item"), fields=[create_field("text-single", var="x")]
+        )
+        form.addChild(node=record)
+        self.assertEqual(len(form.items), 5)
+
+        form.items = items[:1]
+        self.assertEqual(len(form.items), 1)
+        self.assertEqual(len(form.getTags("item")), 1)
+
+
+class DataFormColumnsTest(unittest.TestCase):
+    def setUp(self):
+        self.form = extend_form(Node(node=SEARCH_RESULT))
+        self.columns = self.form.get_columns()
+
+    def test_columns(self):
+        self.assertEqual(self.columns.vars, ["address", "nusers"])
+        self.assertEqual(self.columns.labels, {"address": "Address", "nusers": "Users"})
+        self.assertEqual(len(self.columns), 4)
+        self.assertEqual(self.columns.column("nusers"), ["12", "3", "25", ""])
+        self.assertEqual(
+            self.columns.row(2), {"address": "orchard@chat.example", "nusers": "25"}
+        )
+
+        # Items are not converted to records
+        self.assertFalse(
+            any(isinstance(item, DataRecord) for item in self.form.getTags("item"))
+        )
+
+    def test_sort_filter(self):
+        view = self.columns.filter("nusers", bool).sort("nusers", key=int, reverse=True)
+        self.assertEqual(
+            view.column("address"),
+            ["orchard@chat.example", "balcony@chat.example", "garden@chat.example"],
+        )
+        self.assertEqual(
+            [row["nusers"] for row in view.page(1, 5)],
+            ["12", "3"],
+        )
+        self.assertEqual(
+            self.columns.sort("address").column("address")[0], "balcony@chat.example"
+        )
+
+        # Views share the columns, the original order is unchanged
+        self.assertEqual(self.columns.column("nusers"), ["12", "3", "25", ""])
+
+    def test_no_reported(self):
+        columns = DataFormColumns.from_node(Node(node=FORM))
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(list(columns), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -117,6 +117,32 @@ class TestDateTime(unittest.TestCase):
             result = parse_datetime(time_string, check_utc=True, epoch=True)
             self.assertEqual(result, expected_value)
 
+    def test_invalid(self):
+        strings = [
+            "2017-11-05T01:41:20.Z",
+            "2017-11-05T01:41:60Z",
+            "2017-02-30T01:41:20Z",
+            "2017-11-05T01:41:20+24:00",
+            "2017-11-05T01:41:20+05:60",
+        ]
+
+        for time_string in strings:
+            self.assertIsNone(parse_datetime(time_string))
+            self.assertIsNone(parse_datetime(time_string, epoch=True))
+
+    def test_cache(self):
+        first = parse_datetime("2017-11-05T01:41:20+05:00")
+        second = parse_datetime("2017-11-05T01:41:20+05:00")
+        self.assertIs(first, second)
+        self.assertEqual(
+            parse_datetime("2017-11-05T01:41:20+05:00", epoch=True), 1509828080.0
+        )
+
+    def test_epoch_without_utc(self):
+        for convert in (None, "local"):
+            with self.assertRaises(ValueError):
+                parse_datetime("2017-11-05T01:41:20Z", convert=convert, epoch=True)
+
 
 if __name__ == "__main__":
     unittest.main()
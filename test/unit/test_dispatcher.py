@@ -0,0 +1,164 @@
+import unittest
+from test.lib.const import STREAM_START
+from unittest.mock import Mock
+
+from nbxmpp.dispatcher import CORE_MODULES
+from nbxmpp.dispatcher import MODULES
+from nbxmpp.dispatcher import StanzaDispatcher
+from nbxmpp.namespaces import Namespace
+from nbxmpp.protocol import JID
+from nbxmpp.structs import StanzaHandler
+
+MDS_EVENT = """
+<message from='test@test.test'>
+    <event xmlns='http://jabber.org/protocol/pubsub#event'>
+        <items node='urn:xmpp:mds:displayed:0'>
+            <item id='juliet@capulet.lit'>
+                <displayed xmlns='urn:xmpp:mds:displayed:0'>
+                    <stanza-id xmlns='urn:xmpp:sid:0' by='test@test.test' id='1'/>
+                </displayed>
+            </item>
+        </items>
+    </event>
+</message>
+"""
+
+
+def _make_dispatcher(modules=None):
+    client = Mock()
+    client.is_websocket = False
+    client.get_bound_jid.return_value = JID.from_string("test@test.test")
+    dispatcher = StanzaDispatcher(client, modules)
+    client.get_module = dispatcher.get_module
+    dispatcher.reset_parser()
+    dispatcher.process_data(STREAM_START)
+    return dispatcher
+
+
+class TestLazyModules(unittest.TestCase):
+
+    def _process_mds_event(self, dispatcher):
+        received = []
+
+        def _on_message(_client, _stanza, properties):
+            received.append(properties.pubsub_event)
+
+        dispatcher.register_handler(
+            StanzaHandler(
+                name="message",
+                callback=_on_message,
+                ns=Namespace.PUBSUB_EVENT,
+                priority=17,
+            )
+        )
+        dispatcher.process_data(MDS_EVENT)
+        return received
+
+    def test_all_modules(self):
+        dispatcher = _make_dispatcher()
+        self.assertEqual(set(dispatcher._modules), set(MODULES))
+
+    def test_declared_modules(self):
+        dispatcher = _make_dispatcher(modules=["Roster", "MDS"])
+        # Dependencies of pubsub event handlers are loaded with the module
+        self.assertEqual(
+            set(dispatcher._modules), CORE_MODULES | {"Roster", "MDS", "PubSub"}
+        )
+
+        (pubsub_event,) = self._process_mds_event(dispatcher)
+        self.assertEqual(pubsub_event.data.stanza_id, "1")
+
+    def test_load_on_first_use(self):
+        dispatcher = _make_dispatcher(modules=[])
+        self.assertEqual(set(dispatcher._modules), CORE_MODULES)
+
+        (pubsub_event,) = self._process_mds_event(dispatcher)
+        self.assertIsNone(pubsub_event)
+
+        mds = dispatcher.get_module("MDS")
+        self.assertIs(dispatcher.get_module("MDS"), mds)
+
+        (pubsub_event,) = self._process_mds_event(dispatcher)
+        self.assertEqual(pubsub_event.data.stanza_id, "1")
+
+    def test_unknown_module(self):
+        dispatcher = _make_dispatcher(modules=[])
+        with self.assertRaises(KeyError):
+            dispatcher.get_module("Unknown")
+
+
+class TestRoutingTable(unittest.TestCase):
+
+    def _get_chain_funcs(self, dispatcher, name, typ, props):
+        chain = dispatcher._build_handler_chain(Namespace.CLIENT, name, typ, props)
+        return [func for _priority, func, _module in chain]
+
+    def test_shared_table(self):
+        dispatcher1 = _make_dispatcher()
+        dispatcher2 = _make_dispatcher()
+        self.assertIs(dispatcher1._routing, dispatcher2._routing)
+        self.assertIs(dispatcher1._types, dispatcher2._types)
+        self.assertEqual(dispatcher1._handlers, {})
+
+        # Handlers are bound to the modules of each dispatcher
+        roster1 = dispatcher1.get_module("Roster")
+        roster2 = dispatcher2.get_module("Roster")
+        funcs1 = self._get_chain_funcs(dispatcher1, "iq", "set", [Namespace.ROSTER])
+        funcs2 = self._get_chain_funcs(dispatcher2, "iq", "set", [Namespace.ROSTER])
+        self.assertIn(roster1._process_roster_push, funcs1)
+        self.assertNotIn(roster2._process_roster_push, funcs1)
+        self.assertIn(roster2._process_roster_push, funcs2)
+
+    def test_shared_table_lazy(self):
+        dispatcher1 = _make_dispatcher(modules=[])
+        dispatcher2 = _make_dispatcher(modules=[])
+        self.assertIs(dispatcher1._routing, dispatcher2._routing)
+
+        dispatcher1.get_module("Roster")
+        self.assertIsNot(dispatcher1._routing, dispatcher2._routing)
+        dispatcher2.get_module("Roster")
+        self.assertIs(dispatcher1._routing, dispatcher2._routing)
+
+    def test_register_handler(self):
+        dispatcher1 = _make_dispatcher(modules=[])
+        dispatcher2 = _make_dispatcher(modules=[])
+
+        def _on_custom(_client, _stanza, _properties):
+            pass
+
+        handler = StanzaHandler(
+            name="custom", callback=_on_custom, xmlns="urn:example", priority=1
+        )
+        dispatcher1.register_handler(handler)
+
+        self.assertIn("urn:example", dispatcher1._types)
+        self.assertNotIn("urn:example", dispatcher2._types)
+        self.assertNotIn("urn:example", dispatcher2._routing.types)
+
+        chain = dispatcher1._build_handler_chain("urn:example", "custom", "", [])
+        self.assertEqual(chain, [(1, _on_custom, None)])
+
+        dispatcher1.unregister_handler(handler)
+        chain = dispatcher1._build_handler_chain("urn:example", "custom", "", [])
+        self.assertEqual(chain, [])
+
+    def test_unregister_module_handler(self):
+        dispatcher1 = _make_dispatcher()
+        dispatcher2 = _make_dispatcher()
+
+        roster = dispatcher1.get_module("Roster")
+        (handler,) = [
+            handler
+            for handler in roster.handlers
+            if handler.callback == roster._process_roster_push
+        ]
+        dispatcher1.unregister_handler(handler)
+
+        funcs1 = self._get_chain_funcs(dispatcher1, "iq", "set", [Namespace.ROSTER])
+        funcs2 = self._get_chain_funcs(dispatcher2, "iq", "set", [Namespace.ROSTER])
+        self.assertNotIn(roster._process_roster_push, funcs1)
+        self.assertIn(dispatcher2.get_module("Roster")._process_roster_push, funcs2)
+
+
+if __name__ == "__main__":
+    unittest.main()
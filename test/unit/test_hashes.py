@@ -0,0 +1,82 @@
+import hashlib
+import io
+import tempfile
+import unittest
+
+from gi.repository import GLib
+
+from nbxmpp.hashes import hash_data
+from nbxmpp.hashes import hash_file
+from nbxmpp.hashes import hash_fileobj
+from nbxmpp.protocol import Hashes
+from nbxmpp.protocol import Hashes2
+from nbxmpp.task import run_in_thread
+from nbxmpp.util import b64encode
+
+DATA = b"nbxmpp" * 10000
+ALGOS = ("sha-256", "sha-512", "blake2b-256")
+
+
+def _run(task):
+    results = []
+    task.add_done_callback(lambda t: results.append(t.get_result()), weak=False)
+    context = GLib.MainContext.default()
+    while task.state.is_running:
+        context.iteration(True)
+    return results[0]
+
+
+class TestHashes(unittest.TestCase):
+
+    def _expected(self):
+        return {
+            "sha-256": hashlib.sha256(DATA).digest(),
+            "sha-512": hashlib.sha512(DATA).digest(),
+            "blake2b-256": hashlib.blake2b(DATA, digest_size=32).digest(),
+        }
+
+    def test_hash_data(self):
+        self.assertEqual(hash_data(DATA, ALGOS), self._expected())
+
+    def test_hash_fileobj(self):
+        digests = hash_fileobj(io.BytesIO(DATA), ALGOS, chunk_size=1000)
+        self.assertEqual(digests, self._expected())
+
+        chunks = [DATA[:10], DATA[10:]]
+        self.assertEqual(hash_fileobj(chunks, ALGOS), self._expected())
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            hash_data(DATA, ("sha-0",))
+
+    def test_hash_file_in_thread(self):
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(DATA)
+            file.flush()
+
+            task = run_in_thread(hash_file, file.name, ALGOS, chunk_size=4096)
+            self.assertEqual(_run(task), self._expected())
+
+    def test_thread_error(self):
+        with self.assertLogs("nbxmpp.task", level="ERROR") as logs:
+            task = run_in_thread(hash_file, "/nonexistent/file", ALGOS)
+            self.assertIsInstance(_run(task), FileNotFoundError)
+
+        # The error is logged outside of an except block, with its traceback
+        (output,) = logs.output
+        self.assertIn("Traceback", output)
+        self.assertIn("FileNotFoundError", output)
+
+    def test_calculate_hash(self):
+        self.assertEqual(
+            Hashes().calculateHash("sha-1", DATA), hashlib.sha1(DATA).hexdigest()
+        )
+        self.assertEqual(
+            Hashes2().calculateHash("sha-256", io.BytesIO(DATA)),
+            b64encode(hashlib.sha256(DATA).digest()),
+        )
+        self.assertIsNone(Hashes2().calculateHash("md5", DATA))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import nbxmpp
+from nbxmpp import dispatcher
+from nbxmpp.modules.roster import Roster
+from nbxmpp.protocol import JID
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+
+CODE = """
+import json
+import sys
+import %s
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _get_imported_modules(target):
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", CODE % target],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout))
+
+
+class TestDeferredImports(unittest.TestCase):
+
+    def test_package(self):
+        modules = _get_imported_modules("nbxmpp.simplexml")
+        self.assertNotIn("nbxmpp.protocol", modules)
+
+    def test_client(self):
+        modules = _get_imported_modules("nbxmpp.client")
+        self.assertIn("nbxmpp.dispatcher", modules)
+        self.assertNotIn("nbxmpp.websocket", modules)
+        self.assertNotIn("nbxmpp.modules.mam", modules)
+        self.assertNotIn("nbxmpp.modules.pubsub", modules)
+
+    def test_protocol_names(self):
+        self.assertIs(nbxmpp.JID, JID)
+        with self.assertRaises(AttributeError):
+            nbxmpp.Unknown  # noqa: B018
+
+    def test_submodule_attributes(self):
+        code = (
+            "import nbxmpp\n"
+            "assert nbxmpp.protocol.JID is nbxmpp.JID\n"
+            "assert nbxmpp.simplexml.Node is not None\n"
+            "assert nbxmpp.namespaces.Namespace is not None\n"
+        )
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code], cwd=REPO_DIR, check=True
+        )
+
+    def test_module_classes(self):
+        self.assertIs(dispatcher.Roster, Roster)
+
+
+if __name__ == "__main__":
+    unittest.main()
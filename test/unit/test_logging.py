@@ -0,0 +1,86 @@
+import logging
+import unittest
+from unittest.mock import patch
+
+from nbxmpp import connection
+from nbxmpp.connection import Connection
+from nbxmpp.protocol import Message
+from nbxmpp.util import StanzaDump
+
+
+class StanzaDumpTest(unittest.TestCase):
+    def test_str(self):
+        message = Message(to="juliet@capulet.lit", body="Hi")
+        self.assertEqual(str(StanzaDump(message)), str(message))
+        self.assertEqual(str(StanzaDump("☀".encode())), "☀")
+        self.assertEqual(str(StanzaDump(b"\xff")), "�")
+
+    def test_truncate(self):
+        self.assertEqual(str(StanzaDump(b"<a/>", max_length=4)), "<a/>")
+        self.assertEqual(str(StanzaDump(b"<a/><b/>", max_length=4)), "<a/> [truncated]")
+        self.assertEqual(str(StanzaDump("<a/><b/>", max_length=4)), "<a/> [truncated]")
+
+    def test_lazy(self):
+        node = Message(body="Hi")
+        with patch.object(Message, "__str__") as to_string:
+            logging.getLogger("nbxmpp.test").debug("%s", StanzaDump(node))
+        to_string.assert_not_called()
+
+
+class WireTraceTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = Connection("test", None, [], False, set(), None)
+
+    def test_disabled(self):
+        wire_log = logging.getLogger("nbxmpp.wire")
+        wire_log.setLevel(logging.INFO)
+        self.addCleanup(wire_log.setLevel, logging.NOTSET)
+
+        self.connection._log_stanza(b"<a/>")
+        self.assertEqual(self.connection._wire_trace_count, 0)
+
+    def test_sampled(self):
+        wire_log = logging.getLogger("nbxmpp.wire")
+        wire_log.setLevel(logging.DEBUG)
+        self.addCleanup(wire_log.setLevel, logging.NOTSET)
+
+        with (
+            patch.object(connection, "WIRE_TRACE_SAMPLE_RATE", 3),
+            self.assertLogs("nbxmpp.wire", level="DEBUG") as logs,
+        ):
+            for _ in range(7):
+                self.connection._log_stanza(b"<a/>", received=False)
+
+        self.assertEqual(
+            logs.output,
+            [
+                "DEBUG:nbxmpp.wire:(test) SENT #1: <a/>",
+                "DEBUG:nbxmpp.wire:(test) SENT #4: <a/>",
+                "DEBUG:nbxmpp.wire:(test) SENT #7: <a/>",
+            ],
+        )
+
+    def test_sample_every_stanza(self):
+        wire_log = logging.getLogger("nbxmpp.wire")
+        wire_log.setLevel(logging.DEBUG)
+        self.addCleanup(wire_log.setLevel, logging.NOTSET)
+
+        with (
+            patch.object(connection, "WIRE_TRACE_SAMPLE_RATE", 1),
+            self.assertLogs("nbxmpp.wire", level="DEBUG") as logs,
+        ):
+            for _ in range(3):
+                self.connection._log_stanza(b"<a/>")
+
+        self.assertEqual(
+            logs.output,
+            [
+                "DEBUG:nbxmpp.wire:(test) RECEIVED #1: <a/>",
+                "DEBUG:nbxmpp.wire:(test) RECEIVED #2: <a/>",
+                "DEBUG:nbxmpp.wire:(test) RECEIVED #3: <a/>",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
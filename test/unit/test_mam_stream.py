@@ -0,0 +1,227 @@
+import asyncio
+import datetime as dt
+import os
+import time
+import unittest
+from test.lib.util import StanzaHandlerTest
+from unittest import mock
+
+from nbxmpp.errors import StanzaError
+from nbxmpp.protocol import Iq
+from nbxmpp.protocol import Message
+from nbxmpp.structs import StanzaHandler
+
+MAM_MESSAGE = """
+<message to='test@test.test' from='test@test.test'>
+  <result xmlns='urn:xmpp:mam:2' queryid='%s' id='%s'>
+    <forwarded xmlns='urn:xmpp:forward:0'>
+      <delay xmlns='urn:xmpp:delay' stamp='%s'/>
+      <message xmlns='jabber:client' to='test@test.test'
+               from='romeo@montague.lit/orchard' type='chat'>
+        <body>%s</body>
+      </message>
+    </forwarded>
+  </result>
+</message>
+"""
+
+FIN = """
+<iq type='result' id='%s' from='test@test.test' to='test@test.test/res'>
+  <fin xmlns='urn:xmpp:mam:2' %s>
+    <set xmlns='http://jabber.org/protocol/rsm'>
+      <first index='0'>%s</first>
+      <last>%s</last>
+    </set>
+  </fin>
+</iq>
+"""
+
+
+class MAMStreamTest(StanzaHandlerTest):
+
+    def _pending_queries(self):
+        queries = []
+        for call in self.client.send_stanza.call_args_list:
+            iq = call.args[0]
+            queries.append((iq, call.kwargs["callback"]))
+        self.client.send_stanza.reset_mock()
+        return queries
+
+    def _send_page(self, iq, callback, ids, complete=False, stamp=None):
+        query = iq.getQuery()
+        query_id = query.getAttr("queryid")
+        stamp = stamp or "2020-01-01T10:00:00Z"
+        for id_ in ids:
+            self.dispatcher.process_data(MAM_MESSAGE % (query_id, id_, stamp, id_))
+
+        attr = "complete='true'" if complete else ""
+        response = Iq(node=FIN % (iq.getID(), attr, ids[0], ids[-1]))
+        callback(self.client, response)
+
+    def test_stream_pages(self):
+        mam = self.dispatcher.get_module("MAM")
+
+        async def run():
+            stream = mam.stream_archive("test@test.test", page_size=2, prefetch=1)
+            ((iq, callback),) = self._pending_queries()
+            self.assertEqual(iq.getQuery().getTag("set").getTagData("max"), "2")
+            self._send_page(iq, callback, ["1", "2"])
+
+            # The next page is prefetched before the first page is consumed
+            ((iq, callback),) = self._pending_queries()
+            self.assertEqual(iq.getQuery().getTag("set").getTagData("after"), "2")
+            self._send_page(iq, callback, ["3", "4"], complete=True)
+
+            bodies = []
+            async for stanza, properties in stream:
+                self.assertIsInstance(stanza, Message)
+                self.assertTrue(properties.is_mam_message)
+                bodies.append(stanza.getBody())
+
+            self.assertEqual(bodies, ["1", "2", "3", "4"])
+            self.assertEqual(stream.checkpoint, "4")
+            self.assertEqual(mam._streams, {})
+
+        asyncio.run(run())
+
+    def test_prefetch_limit(self):
+        mam = self.dispatcher.get_module("MAM")
+
+        async def run():
+            stream = mam.stream_archive("test@test.test", page_size=2, prefetch=0)
+            ((iq, callback),) = self._pending_queries()
+            self._send_page(iq, callback, ["1", "2"])
+            self.assertEqual(self._pending_queries(), [])
+
+            await stream.__anext__()
+            self.assertEqual(self._pending_queries(), [])
+            await stream.__anext__()
+            self.assertEqual(len(self._pending_queries()), 1)
+            stream.cancel()
+
+        asyncio.run(run())
+
+    def test_resume_from_checkpoint(self):
+        mam = self.dispatcher.get_module("MAM")
+
+        async def run():
+            stream = mam.stream_archive("test@test.test", after="checkpoint")
+            ((iq, _callback),) = self._pending_queries()
+            self.assertEqual(
+                iq.getQuery().getTag("set").getTagData("after"), "checkpoint"
+            )
+            self.assertEqual(stream.checkpoint, "checkpoint")
+            stream.cancel()
+
+        asyncio.run(run())
+
+    def test_error(self):
+        mam = self.dispatcher.get_module("MAM")
+
+        async def run():
+            stream = mam.stream_archive("test@test.test")
+            ((iq, callback),) = self._pending_queries()
+            error = Iq(
+                node="<iq type='error' id='%s' from='test@test.test'>"
+                "<error type='cancel'>"
+                "<item-not-found xmlns='urn:ietf:params:xml:ns:xmpp-stanzas'/>"
+                "</error></iq>" % iq.getID()
+            )
+            callback(self.client, error)
+            async for _message in stream:
+                pass
+
+        with self.assertRaises(StanzaError):
+            asyncio.run(run())
+
+    def test_parallel_windows(self):
+        start = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+        end = dt.datetime(2020, 1, 3, tzinfo=dt.timezone.utc)
+        self._check_parallel_windows(start, end)
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "requires time.tzset()")
+    def test_parallel_windows_naive(self):
+        # Naive datetimes are UTC, like in the query form,
+        # independent of the local timezone
+        with mock.patch.dict(os.environ, {"TZ": "EST+05EDT,M3.2.0,M11.1.0"}):
+            time.tzset()
+            self.addCleanup(time.tzset)
+            self._check_parallel_windows(
+                dt.datetime(2020, 1, 1), dt.datetime(2020, 1, 3)
+            )
+
+    def _check_parallel_windows(self, start, end):
+        mam = self.dispatcher.get_module("MAM")
+
+        async def run():
+            stream = mam.stream_archive_windows("test@test.test", start, end, windows=2)
+            first, second = self._pending_queries()
+            # The message on the boundary is returned by both windows
+            self._send_page(
+                *first, ["a", "b"], complete=True, stamp="2020-01-02T00:00:00Z"
+            )
+            self._send_page(
+                *second, ["b", "c"], complete=True, stamp="2020-01-02T00:00:00Z"
+            )
+
+            ids = [properties.mam.id async for _stanza, properties in stream]
+            self.assertEqual(ids, ["a", "b", "c"])
+            self.assertEqual(len(stream.checkpoints), 2)
+
+        asyncio.run(run())
+
+    def test_fast_path(self):
+        self.client.register_mam_consumer = self.dispatcher.register_mam_consumer
+        self.client.unregister_mam_consumer = self.dispatcher.unregister_mam_consumer
+        mam = self.dispatcher.get_module("MAM")
+
+        handled = []
+        self.dispatcher.register_handler(
+            StanzaHandler(
+                name="message",
+                callback=lambda *args: handled.append(args),
+                priority=1,
+            )
+        )
+
+        async def run():
+            stream = mam.stream_archive("test@test.test", fast_path=True)
+            ((iq, callback),) = self._pending_queries()
+            self.assertIn(
+                iq.getQuery().getAttr("queryid"), self.dispatcher._mam_consumers
+            )
+            self._send_page(iq, callback, ["1", "2"], complete=True)
+
+            results = [
+                (stanza.getBody(), properties.body, properties.stanza_ids)
+                async for stanza, properties in stream
+            ]
+            self.assertEqual(results, [("1", "1", []), ("2", "2", [])])
+            self.assertEqual(self.dispatcher._mam_consumers, {})
+
+        asyncio.run(run())
+        self.assertEqual(handled, [])
+
+    def test_consumer_modules(self):
+        received = []
+
+        def _on_message(_client, stanza, properties):
+            received.append(properties)
+
+        self.dispatcher.register_mam_consumer(
+            "query", _on_message, modules={"BaseMessage"}
+        )
+        self.dispatcher.process_data(
+            MAM_MESSAGE % ("query", "1", "2020-01-01T10:00:00Z", "text")
+        )
+
+        (properties,) = received
+        self.assertEqual(properties.body, "text")
+        self.assertIsNone(properties.chatstate)
+        self.assertTrue(properties.is_mam_message)
+
+        self.dispatcher.unregister_mam_consumer("query")
+        self.dispatcher.process_data(
+            MAM_MESSAGE % ("query", "2", "2020-01-01T10:00:00Z", "text")
+        )
+        self.assertEqual(len(received), 1)
@@ -1,6 +1,7 @@
 import unittest
 
 from nbxmpp.simplexml import Node
+from nbxmpp.simplexml import XMLescape
 
 
 class TestNode(unittest.TestCase):
@@ -64,6 +65,17 @@ class TestNode(unittest.TestCase):
         node = Node(node=string)
         self.assertEqual(node.topretty(), string)
 
+    def test_escape(self):
+        self.assertEqual(
+            XMLescape('<a href="x">&amp;\x0c</a>' * 10),
+            "&lt;a href=&quot;x&quot;&gt;&amp;amp;&lt;/a&gt;" * 10,
+        )
+        text = "no escaping needed"
+        self.assertIs(XMLescape(text), text)
+
+        node = Node("body", attrs={"a": "1 < 2"}, payload=["Tom & Jerry"])
+        self.assertEqual(str(node), '<body a="1 &lt; 2">Tom &amp; Jerry</body>')
+
 
 if __name__ == "__main__":
     unittest.main()
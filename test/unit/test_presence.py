@@ -0,0 +1,114 @@
+from test.lib.util import StanzaHandlerTest
+
+from nbxmpp.const import PresenceShow
+from nbxmpp.presence_store import PresenceStore
+from nbxmpp.protocol import JID
+from nbxmpp.structs import StanzaHandler
+
+PRESENCE = """
+<presence from='romeo@montague.lit/%s' to='test@test.test/res'>
+  <show>%s</show>
+  <priority>%s</priority>
+  <status>%s</status>
+  <c xmlns='http://jabber.org/protocol/caps'
+     hash='sha-1'
+     node='http://code.google.com/p/exodus'
+     ver='QgayPKawpkPSDYmwT/WM94uAlu0='/>
+</presence>
+"""
+
+UNAVAILABLE = """
+<presence from='romeo@montague.lit/%s' to='test@test.test/res' type='unavailable'/>
+"""
+
+MUC_SELF_PRESENCE = """
+<presence from='room@conference.montague.lit/test' to='test@test.test/res'>
+  <x xmlns='http://jabber.org/protocol/muc#user'>
+    <item affiliation='member' role='participant'/>
+    <status code='110'/>
+  </x>
+</presence>
+"""
+
+ROMEO = JID.from_string("romeo@montague.lit")
+
+
+class PresenceStoreTest(StanzaHandlerTest):
+    def setUp(self):
+        super().setUp()
+        self.client.get_module = self.dispatcher.get_module
+        self.store = PresenceStore()
+        self.module = self.dispatcher.get_module("BasePresence")
+        self.module.set_presence_store(self.store)
+
+        self.received = []
+
+        def _on_presence(_client, _stanza, properties):
+            self.received.append(properties)
+
+        self.dispatcher.register_handler(
+            StanzaHandler(name="presence", callback=_on_presence)
+        )
+
+    def _send(self, resource, show="away", priority=0, status="Hi"):
+        self.dispatcher.process_data(PRESENCE % (resource, show, priority, status))
+        return self.received[-1] if self.received else None
+
+    def test_unchanged(self):
+        self.assertFalse(self._send("orchard").unchanged)
+        self.assertTrue(self._send("orchard").unchanged)
+        self.assertFalse(self._send("orchard", status="Bye").unchanged)
+        self.assertFalse(self._send("balcony", status="Bye").unchanged)
+        self.assertEqual(len(self.received), 4)
+
+    def test_suppress_unchanged(self):
+        self.module.set_presence_store(self.store, suppress_unchanged=True)
+        self._send("orchard")
+        self._send("orchard")
+        self._send("orchard", show="xa")
+        self.assertEqual(len(self.received), 2)
+
+    def test_best_resource(self):
+        self._send("orchard", show="away", priority=5)
+        self._send("balcony", show="chat", priority=5)
+        self._send("garden", show="dnd", priority=1)
+
+        best = self.store.get_best(ROMEO)
+        self.assertEqual(best.jid, JID.from_string("romeo@montague.lit/balcony"))
+        self.assertEqual(best.show, PresenceShow.CHAT)
+        self.assertEqual(len(self.store.get_resources(ROMEO)), 3)
+
+        self.dispatcher.process_data(UNAVAILABLE % "balcony")
+        best = self.store.get_best(ROMEO)
+        self.assertEqual(best.jid, JID.from_string("romeo@montague.lit/orchard"))
+
+        self.dispatcher.process_data(UNAVAILABLE % "orchard")
+        self.dispatcher.process_data(UNAVAILABLE % "garden")
+        self.assertIsNone(self.store.get_best(ROMEO))
+        self.assertNotIn(JID.from_string("romeo@montague.lit/garden"), self.store)
+
+    def test_best_resource_equal_priority(self):
+        self._send("orchard", show="dnd", priority=5)
+        self._send("balcony", show="xa", priority=5)
+        best = self.store.get_best(ROMEO)
+        self.assertEqual(best.jid, JID.from_string("romeo@montague.lit/balcony"))
+
+        # Without show the resource is online
+        self.dispatcher.process_data(
+            "<presence from='romeo@montague.lit/garden' to='test@test.test/res'>"
+            "<priority>5</priority></presence>"
+        )
+        best = self.store.get_best(ROMEO)
+        self.assertEqual(best.jid, JID.from_string("romeo@montague.lit/garden"))
+        self.assertEqual(best.show, PresenceShow.ONLINE)
+
+    def test_clear(self):
+        self._send("orchard")
+        self.store.clear(ROMEO)
+        self.assertIsNone(self.store.get_best(ROMEO))
+        self.assertFalse(self._send("orchard").unchanged)
+
+    def test_muc_self_presence(self):
+        self.dispatcher.process_data(MUC_SELF_PRESENCE)
+        self.dispatcher.process_data(MUC_SELF_PRESENCE)
+        self.assertFalse(self.received[-1].unchanged)
@@ -2,6 +2,7 @@ from test.lib.util import StanzaHandlerTest
 
 from nbxmpp.namespaces import Namespace
 from nbxmpp.structs import PubSubEventData
+from nbxmpp.structs import PubSubEventHandler
 from nbxmpp.structs import StanzaHandler
 
 
@@ -108,3 +109,127 @@ class PubsubTest(StanzaHandlerTest):
         )
 
         self.dispatcher.process_data(event)
+
+    def test_batched_event(self):
+        received = []
+
+        def _on_message(_con, _stanza, properties):
+            received.append(properties.pubsub_event)
+
+        event = """
+            <message from='test@test.test' id='b5ac48d0-0f9c-11dc-8754-001143d5d5db'>
+                <event xmlns='http://jabber.org/protocol/pubsub#event'>
+                    <items node='princely_musings'>
+                        <item id='1'><entry xmlns='http://www.w3.org/2005/Atom'/></item>
+                        <retract id='2'/>
+                        <item id='3'><entry xmlns='http://www.w3.org/2005/Atom'/></item>
+                    </items>
+                </event>
+            </message>
+        """
+
+        self.dispatcher.register_handler(
+            StanzaHandler(
+                name="message",
+                callback=_on_message,
+                ns=Namespace.PUBSUB_EVENT,
+                priority=17,
+            )
+        )
+
+        self.dispatcher.process_data(event)
+
+        (pubsub_event,) = received
+        self.assertTrue(pubsub_event.is_batch)
+        self.assertEqual(pubsub_event.node, "princely_musings")
+        self.assertIsNone(pubsub_event.item)
+        self.assertEqual([item.id for item in pubsub_event.items], ["1", "2", "3"])
+        self.assertEqual(
+            [item.retracted for item in pubsub_event.items], [False, True, False]
+        )
+        self.assertEqual(pubsub_event.last_item.id, "3")
+
+        parsed = []
+        pubsub_event.set_item_parser(lambda item: parsed.append(item) or item)
+
+        # Comparing and hashing events does not parse the items
+        self.assertEqual(pubsub_event, pubsub_event._replace())
+        self.assertEqual(hash(pubsub_event), hash(pubsub_event._replace()))
+        self.assertNotEqual(pubsub_event.items[0], pubsub_event.items[2])
+        self.assertEqual(parsed, [])
+        self.assertEqual(pubsub_event.items[0].data.getAttr("id"), "1")
+        self.assertEqual(pubsub_event.items[0].data.getAttr("id"), "1")
+        self.assertIsNone(pubsub_event.items[1].data)
+        self.assertEqual(len(parsed), 1)
+
+    def test_batched_mds_event(self):
+        received = []
+
+        def _on_message(_con, _stanza, properties):
+            received.append(properties.pubsub_event)
+
+        event = """
+            <message from='test@test.test' id='b5ac48d0-0f9c-11dc-8754-001143d5d5db'>
+                <event xmlns='http://jabber.org/protocol/pubsub#event'>
+                    <items node='urn:xmpp:mds:displayed:0'>
+                        <item id='juliet@capulet.lit'>
+                            <displayed xmlns='urn:xmpp:mds:displayed:0'>
+                                <stanza-id xmlns='urn:xmpp:sid:0'
+                                           by='test@test.test' id='1'/>
+                            </displayed>
+                        </item>
+                        <item id='romeo@montague.lit'>
+                            <displayed xmlns='urn:xmpp:mds:displayed:0'/>
+                        </item>
+                    </items>
+                </event>
+            </message>
+        """
+
+        self.dispatcher.register_handler(
+            StanzaHandler(
+                name="message",
+                callback=_on_message,
+                ns=Namespace.PUBSUB_EVENT,
+                priority=17,
+            )
+        )
+
+        self.dispatcher.process_data(event)
+
+        (pubsub_event,) = received
+        first, second = pubsub_event.items
+        self.assertEqual(str(first.data.jid), "juliet@capulet.lit")
+        self.assertEqual(first.data.stanza_id, "1")
+        # Malformed items do not drop the whole batch
+        self.assertIsNone(second.data)
+
+    def test_event_handler(self):
+        calls = []
+
+        def _on_event(_con, _stanza, properties):
+            calls.append(properties.pubsub_event.id)
+
+        event = """
+            <message from='test@test.test'>
+                <event xmlns='http://jabber.org/protocol/pubsub#event'>
+                    <items node='%s'>
+                        <item id='%s'>
+                            <entry xmlns='urn:example'/>
+                        </item>
+                    </items>
+                </event>
+            </message>
+        """
+
+        handler = PubSubEventHandler(node="urn:example", callback=_on_event)
+        pubsub = self.dispatcher.get_module("PubSub")
+        pubsub.register_event_handler(handler)
+
+        self.dispatcher.process_data(event % ("urn:example", "1"))
+        self.dispatcher.process_data(event % ("urn:other", "2"))
+        self.assertEqual(calls, ["1"])
+
+        pubsub.unregister_event_handler(handler)
+        self.dispatcher.process_data(event % ("urn:example", "3"))
+        self.assertEqual(calls, ["1"])
@@ -0,0 +1,109 @@
+import json
+import unittest
+from test.lib.util import StanzaHandlerTest
+
+from nbxmpp.protocol import JID
+from nbxmpp.roster_store import RosterStore
+from nbxmpp.structs import RosterData
+from nbxmpp.structs import RosterItem
+from nbxmpp.structs import RosterPush
+from nbxmpp.structs import StanzaHandler
+
+PUSH = """
+<iq type='set' id='a78b4q6ha463' to='test@test.test/res'>
+  <query xmlns='jabber:iq:roster' ver='ver14'>
+    <item jid='nurse@example.com' name='Nurse' subscription='both'>
+      <group>Servants</group>
+      <group>Friends</group>
+    </item>
+  </query>
+</iq>
+"""
+
+ROMEO = JID.from_string("romeo@montague.lit")
+NURSE = JID.from_string("nurse@example.com")
+
+
+class RosterPushTest(StanzaHandlerTest):
+    def test_roster_push(self):
+        pushes = []
+
+        def _on_push(_client, _stanza, properties):
+            pushes.append(properties.roster)
+
+        self.dispatcher.register_handler(
+            StanzaHandler(name="iq", callback=_on_push, typ="set", priority=16)
+        )
+        self.dispatcher.process_data(PUSH)
+
+        (push,) = pushes
+        self.assertEqual(push.version, "ver14")
+        self.assertEqual(
+            push.item,
+            RosterItem(
+                jid=NURSE,
+                name="Nurse",
+                subscription="both",
+                groups={"Servants", "Friends"},
+            ),
+        )
+
+
+class RosterStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = RosterStore()
+        self.store.apply_result(
+            RosterData(
+                [
+                    RosterItem(jid=ROMEO, subscription="both", groups={"Friends"}),
+                    RosterItem(jid=NURSE, name="Nurse", subscription="to"),
+                ],
+                "ver10",
+            )
+        )
+
+    def test_result(self):
+        self.assertEqual(self.store.version, "ver10")
+        self.assertEqual(len(self.store), 2)
+
+        # Roster is up to date, items are kept
+        self.store.apply_result(RosterData(None, "ver10"))
+        self.assertEqual(len(self.store), 2)
+
+        # Full roster replaces all items
+        self.store.apply_result(RosterData([RosterItem(jid=ROMEO)], "ver20"))
+        self.assertEqual(list(self.store), [RosterItem(jid=ROMEO)])
+        self.assertEqual(self.store.version, "ver20")
+
+    def test_push(self):
+        item = RosterItem(jid=NURSE, name="Angelica", subscription="both")
+        self.store.apply_push(RosterPush(item, "ver11"))
+        self.assertEqual(self.store.get(NURSE), item)
+        self.assertEqual(self.store.version, "ver11")
+
+        removed = RosterItem(jid=ROMEO, subscription="remove")
+        self.store.apply_push(RosterPush(removed, "ver12"))
+        self.assertNotIn(ROMEO, self.store)
+        self.assertEqual(self.store.version, "ver12")
+
+        # Pushes without version keep the last known version
+        self.store.apply_push(RosterPush(RosterItem(jid=ROMEO), None))
+        self.assertIn(ROMEO, self.store)
+        self.assertEqual(self.store.version, "ver12")
+
+    def test_snapshot(self):
+        snapshot = json.loads(json.dumps(self.store.snapshot()))
+        store = RosterStore.from_snapshot(snapshot)
+
+        self.assertEqual(store.version, "ver10")
+        self.assertEqual(list(store), list(self.store))
+
+        with self.assertRaises(ValueError):
+            RosterStore.from_snapshot({"format": 0, "items": []})
+
+        with self.assertRaises(ValueError):
+            RosterStore.from_snapshot({"format": 1, "items": [{}]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import time
+import unittest
+
+from gi.repository import GLib
+
+from nbxmpp.scheduler import DeadlineScheduler
+
+
+def _iterate(seconds: float) -> None:
+    context = GLib.MainContext.default()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        context.iteration(False)
+        time.sleep(0.001)
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = DeadlineScheduler()
+
+    def tearDown(self):
+        self.scheduler.clear()
+
+    def test_expire_in_order(self):
+        fired: list[str] = []
+        self.scheduler.add(0.03, lambda: fired.append("late"))
+        self.scheduler.add(0.01, lambda: fired.append("early"))
+        _iterate(0.1)
+
+        self.assertEqual(fired, ["early", "late"])
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats.pending, 0)
+        self.assertEqual(stats.peak_pending, 2)
+        self.assertEqual(stats.scheduled, 2)
+        self.assertEqual(stats.expired, 2)
+        self.assertEqual(stats.removed, 0)
+
+    def test_remove(self):
+        fired: list[str] = []
+        handle = self.scheduler.add(0.01, lambda: fired.append("removed"))
+        self.scheduler.add(0.02, lambda: fired.append("kept"))
+        self.scheduler.remove(handle)
+        self.scheduler.remove(handle)
+        _iterate(0.1)
+
+        self.assertEqual(fired, ["kept"])
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats.expired, 1)
+        self.assertEqual(stats.removed, 1)
+
+    def test_single_source(self):
+        for _ in range(1000):
+            self.scheduler.add(60, lambda: None)
+
+        self.assertIsNotNone(self.scheduler._source_id)
+        source_id = self.scheduler._source_id
+        self.scheduler.add(0.01, lambda: None)
+        self.assertNotEqual(source_id, self.scheduler._source_id)
+        self.assertEqual(self.scheduler.get_stats().pending, 1001)
+
+    def test_compact_removed(self):
+        handles = [self.scheduler.add(60, lambda: None) for _ in range(1000)]
+        for handle in handles[:900]:
+            self.scheduler.remove(handle)
+
+        self.assertLess(len(self.scheduler._heap), 1000)
+        self.assertEqual(self.scheduler.get_stats().pending, 100)
+
+        for handle in handles[900:]:
+            self.scheduler.remove(handle)
+        self.assertIsNone(self.scheduler._source_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
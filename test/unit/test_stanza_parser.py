@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import Mock
+
+from nbxmpp.dispatcher import StanzaDispatcher
+from nbxmpp.protocol import JID
+from nbxmpp.protocol import Message
+from nbxmpp.protocol import Protocol
+from nbxmpp.structs import StanzaHandler
+
+STREAM = (
+    "<stream:stream xmlns='jabber:client' "
+    "xmlns:stream='http://etherx.jabber.org/streams' "
+    "from='test.test' id='1' version='1.0'>"
+)
+
+MESSAGE = (
+    "<message from='juliet@capulet.lit/balcony' to='test@test.test' "
+    "type='chat'><body>%s</body><delay xmlns='urn:xmpp:delay' "
+    "stamp='2002-09-10T23:08:25Z'/></message>"
+)
+
+CARBON = (
+    "<message from='%s' to='test@test.test/res' type='chat'>"
+    "<received xmlns='urn:xmpp:carbons:2'>"
+    "<forwarded xmlns='urn:xmpp:forward:0'>"
+    "<message xmlns='jabber:client' from='juliet@capulet.lit/balcony' "
+    "to='test@test.test/other' type='chat'><body>carbon</body></message>"
+    "</forwarded></received></message>"
+)
+
+MAM_MESSAGE = (
+    "<message to='test@test.test' from='test@test.test'>"
+    "<result xmlns='urn:xmpp:mam:2' queryid='q1' id='a1'>"
+    "<forwarded xmlns='urn:xmpp:forward:0'>"
+    "<delay xmlns='urn:xmpp:delay' stamp='2020-01-01T10:00:00Z'/>"
+    "<message xmlns='jabber:client' from='juliet@capulet.lit/balcony' "
+    "type='chat'><body>archived</body></message>"
+    "</forwarded></result></message>"
+)
+
+
+class StanzaParserTest(unittest.TestCase):
+    def setUp(self):
+        self.client = Mock()
+        self.client.is_websocket = False
+        self.client.get_bound_jid.return_value = JID.from_string("test@test.test")
+        self.dispatcher = StanzaDispatcher(self.client)
+        self.dispatcher.reset_parser()
+        self.dispatcher.process_data(STREAM)
+
+        self.stanzas = []
+        self.properties = []
+        self.dispatcher.register_handler(
+            StanzaHandler(name="message", callback=self._on_message)
+        )
+
+    def _on_message(self, _client, stanza, properties):
+        self.stanzas.append(stanza)
+        self.properties.append(properties)
+
+    def test_build_protocol_class(self):
+        self.dispatcher.process_data(MESSAGE % "first")
+        self.dispatcher.process_data("\n  ")
+        self.dispatcher.process_data(MESSAGE % "second")
+
+        first, second = self.stanzas
+        self.assertIsNot(first, second)
+        self.assertIs(type(first), Message)
+        self.assertEqual(first.getFrom(), JID.from_string("juliet@capulet.lit/balcony"))
+        self.assertEqual(first.getBody(), "first")
+        self.assertEqual(first.timestamp, "2002-09-10T23:08:25Z")
+        self.assertEqual(second.getBody(), "second")
+        self.assertFalse(first.protocol_init_pending)
+
+        # Whitespace between stanzas is not added to the dispatched stanza
+        self.assertEqual(first.getData(), "")
+
+    def test_dispatch_callback(self):
+        stanzas = []
+        self.dispatcher.set_dispatch_callback(stanzas.append)
+        self.dispatcher.process_data(MESSAGE % "first")
+        self.dispatcher.process_data("<r xmlns='urn:xmpp:sm:3'/>")
+
+        message, ack = stanzas
+        self.assertIs(type(message), Message)
+        self.assertEqual(
+            message.getFrom(), JID.from_string("juliet@capulet.lit/balcony")
+        )
+        self.assertNotIsInstance(ack, Protocol)
+
+    def test_dispatch_constructed_stanza(self):
+        message = Message(node=MESSAGE % "first")
+        message.setNamespace("jabber:client")
+        self.assertFalse(message.protocol_init_pending)
+        self.dispatcher.dispatch(message)
+        self.assertIsNot(self.stanzas[0], message)
+
+    def test_unwrap_carbon(self):
+        self.dispatcher.process_data(CARBON % "test@test.test")
+
+        (message,) = self.stanzas
+        self.assertIs(type(message), Message)
+        self.assertEqual(message.getBody(), "carbon")
+        self.assertEqual(
+            message.getFrom(), JID.from_string("juliet@capulet.lit/balcony")
+        )
+        self.assertEqual(self.properties[0].carbon.type, "received")
+
+        # The forwarded message is used in place
+        self.assertEqual(message.getParent().getName(), "forwarded")
+
+    def test_unwrap_carbon_invalid_from(self):
+        self.dispatcher.process_data(CARBON % "test@test.test/res")
+        self.dispatcher.process_data(CARBON % "romeo@montague.lit")
+        self.assertEqual(self.stanzas, [])
+
+    def test_unwrap_mam(self):
+        self.dispatcher.process_data(MAM_MESSAGE)
+
+        (message,) = self.stanzas
+        self.assertIs(type(message), Message)
+        self.assertEqual(message.getBody(), "archived")
+        self.assertEqual(message.getTo(), JID.from_string("test@test.test"))
+
+        mam = self.properties[0].mam
+        self.assertEqual(mam.id, "a1")
+        self.assertEqual(mam.query_id, "q1")
+        self.assertEqual(mam.archive, JID.from_string("test@test.test"))
+
+
+if __name__ == "__main__":
+    unittest.main()
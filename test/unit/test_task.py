@@ -0,0 +1,249 @@
+import asyncio
+import unittest
+from functools import partial
+
+from gi.repository import GLib
+
+from nbxmpp.errors import CancelledError
+from nbxmpp.errors import is_error
+from nbxmpp.task import gather
+from nbxmpp.task import GatherTask
+from nbxmpp.task import Task
+
+
+class _Request:
+    pass
+
+
+class _LoopTask(Task):
+
+    _process_types = (_Request,)
+
+    def _run_async(self, data: _Request) -> None:
+        asyncio.get_running_loop().call_soon(self._async_finished, data)
+
+    def _async_finished(self, data: _Request) -> None:
+        self._next_step(data)
+
+
+class _PendingTask(Task):
+
+    _process_types = (_Request,)
+
+    def _run_async(self, data: _Request) -> None:
+        pass
+
+
+class _GLibTask(Task):
+
+    _process_types = (_Request,)
+
+    def _run_async(self, data: _Request) -> None:
+        GLib.idle_add(self._async_finished, data)
+
+    def _async_finished(self, data: _Request) -> bool:
+        self._next_step(data)
+        return False
+
+
+def _start(task: Task) -> Task:
+    task.start()
+    return task
+
+
+def _successful():
+    _task = yield
+
+    result = yield _Request()
+    yield isinstance(result, _Request)
+
+
+def _failing():
+    _task = yield
+
+    yield _Request()
+    raise ValueError("failed")
+
+
+def _sub_task():
+    _task = yield
+
+    first = yield _start(_LoopTask(_successful()))
+    second = yield _start(_LoopTask(_successful()))
+    yield (first, second)
+
+
+class TestAwaitableTask(unittest.TestCase):
+
+    def test_await_result(self):
+        async def run():
+            task = _LoopTask(_successful())
+            task.start()
+            return await task
+
+        self.assertTrue(asyncio.run(run()))
+
+    def test_await_error(self):
+        async def run():
+            task = _LoopTask(_failing())
+            task.start()
+            await task
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+    def test_gather(self):
+        async def run():
+            tasks = [_LoopTask(_successful()) for _ in range(3)]
+            for task in tasks:
+                task.start()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(run())
+        self.assertEqual(results, [True, True, True])
+
+    def test_await_with_sub_tasks(self):
+        async def run():
+            task = _LoopTask(_sub_task())
+            task.start()
+            return await task
+
+        first, second = asyncio.run(run())
+        self.assertTrue(first)
+        self.assertTrue(second)
+
+    def test_cancel_task(self):
+        async def run():
+            task = _LoopTask(_successful())
+            task.start()
+            task.cancel()
+            await task
+
+        with self.assertRaises(CancelledError):
+            asyncio.run(run())
+
+    def test_cancel_future(self):
+        async def run():
+            task = _start(_PendingTask(_successful()))
+            task.get_future().cancel()
+            await asyncio.sleep(0)
+            return task
+
+        task = asyncio.run(run())
+        self.assertTrue(task.state.is_cancelled)
+
+    def test_wait_for_timeout(self):
+        async def run():
+            task = _start(_PendingTask(_successful()))
+            try:
+                await asyncio.wait_for(task, timeout=0.01)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(0)
+            return task
+
+        task = asyncio.run(run())
+        self.assertTrue(task.state.is_cancelled)
+
+
+def _value(value: int):
+    _task = yield
+
+    yield _Request()
+    if value < 0:
+        raise ValueError(value)
+    yield value
+
+
+def _iterate_until_finished(task: Task) -> None:
+    context = GLib.MainContext.default()
+    while task.state.is_running:
+        context.iteration(True)
+
+
+class TestGatherTask(unittest.TestCase):
+
+    def _make_factory(self, value: int, counter: list[int]):
+        def factory() -> Task:
+            counter[0] += 1
+            self._max_active = max(self._max_active, counter[0] - self._finished)
+            task = _GLibTask(_value(value))
+            task.add_done_callback(self._on_finished, weak=False)
+            task.start()
+            return task
+
+        return factory
+
+    def _on_finished(self, _task: Task) -> None:
+        self._finished += 1
+
+    def setUp(self):
+        self._max_active = 0
+        self._finished = 0
+
+    def test_results_in_order(self):
+        counter = [0]
+        factories = [self._make_factory(value, counter) for value in range(10)]
+        task = gather(factories, limit=3)
+        results: list[int] = []
+        task.add_done_callback(lambda t: results.extend(t.finish()), weak=False)
+        _iterate_until_finished(task)
+
+        self.assertEqual(results, list(range(10)))
+        self.assertLessEqual(self._max_active, 3)
+
+    def test_errors_per_request(self):
+        counter = [0]
+        factories = [self._make_factory(value, counter) for value in (1, -1, 2)]
+        task = gather(factories)
+        results: list[object] = []
+        task.add_done_callback(lambda t: results.extend(t.finish()), weak=False)
+        _iterate_until_finished(task)
+
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], 2)
+        self.assertFalse(is_error(results[2]))
+
+    def test_yield_from_task(self):
+        def _parent():
+            _task = yield
+
+            results = yield gather(
+                [partial(_start, _GLibTask(_value(value))) for value in range(4)],
+                limit=2,
+            )
+            yield sum(results)
+
+        task = _start(_GLibTask(_parent()))
+        result: list[int] = []
+        task.add_done_callback(lambda t: result.append(t.finish()), weak=False)
+        _iterate_until_finished(task)
+        self.assertEqual(result, [6])
+
+    def test_empty(self):
+        task = gather([])
+        result: list[object] = []
+        task.add_done_callback(lambda t: result.append(t.finish()), weak=False)
+        _iterate_until_finished(task)
+        self.assertEqual(result, [[]])
+
+    def test_cancel(self):
+        tasks: list[Task] = []
+
+        def factory() -> Task:
+            task = _start(_PendingTask(_value(1)))
+            tasks.append(task)
+            return task
+
+        task = GatherTask([factory] * 5, limit=2)
+        task.start()
+        GLib.MainContext.default().iteration(True)
+        task.cancel()
+
+        self.assertEqual(len(tasks), 2)
+        self.assertTrue(all(t.state.is_cancelled for t in tasks))
+
+
+if __name__ == "__main__":
+    unittest.main()
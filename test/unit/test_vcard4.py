@@ -1,5 +1,7 @@
 import unittest
+from unittest import mock
 
+from nbxmpp.modules.vcard4 import get_property_from_name
 from nbxmpp.modules.vcard4 import LanguageParameter
 from nbxmpp.modules.vcard4 import VCard
 from nbxmpp.simplexml import Node
@@ -164,3 +166,51 @@ class TestVCard4(unittest.TestCase):
         self.assertEqual(
             pronouns_props[0].parameters.get_parameter("language").value, "fr"
         )
+
+    def test_vcard4_lazy_parsing(self):
+        vcard_node = Node(
+            node="""
+            <vcard xmlns="urn:ietf:params:xml:ns:vcard-4.0">
+                <fn><text>Cartman</text></fn>
+                <nickname><text>eric</text></nickname>
+                <group name="friends">
+                    <nickname><text>fatass</text></nickname>
+                </group>
+                <tel><uri>tel:+1-303-308-3282</uri></tel>
+                <email></email>
+            </vcard>
+        """
+        )
+
+        vcard = VCard.from_node(vcard_node)
+
+        with mock.patch(
+            "nbxmpp.modules.vcard4.get_property_from_name",
+            wraps=get_property_from_name,
+        ) as parse:
+            nicknames = vcard.get_properties_by_name("nickname")
+            self.assertEqual([p.values for p in nicknames], [["eric"], ["fatass"]])
+            self.assertEqual(parse.call_count, 2)
+
+            # Properties are parsed only once
+            self.assertIs(vcard.get_properties_by_name("nickname")[0], nicknames[0])
+            self.assertEqual(parse.call_count, 2)
+
+            self.assertEqual(vcard.get_properties_by_name("email"), [])
+            self.assertEqual(vcard.get_properties_by_name("photo"), [])
+
+            props = vcard.get_properties()
+            self.assertEqual(parse.call_count, 5)
+
+        self.assertEqual([p.name for p in props], ["fn", "nickname", "nickname", "tel"])
+        self.assertIn(nicknames[0], props)
+        vcard.remove_property(nicknames[0])
+        self.assertEqual(len(vcard.get_properties_by_name("nickname")), 1)
+
+        vcard.add_property("nickname", values=["kenny"])
+        self.assertEqual(len(vcard.get_properties_by_name("nickname")), 2)
+
+        # Invalid properties are preserved as unsupported nodes
+        node = vcard.to_node()
+        self.assertIsNotNone(node.getTag("email"))
+        self.assertIsNotNone(node.getTag("friends"))
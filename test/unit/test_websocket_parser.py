@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import Mock
+
+from nbxmpp.dispatcher import StanzaDispatcher
+from nbxmpp.protocol import JID
+from nbxmpp.structs import StanzaHandler
+
+OPEN = (
+    b"<open xmlns='urn:ietf:params:xml:ns:xmpp-framing' "
+    b"from='test.test' id='1' version='1.0' xml:lang='en'/>"
+)
+
+MESSAGE = (
+    "<message xmlns='jabber:client' from='juliet@capulet.lit/balcony' "
+    "to='test@test.test' type='chat'><body>%s</body></message>"
+)
+
+CLOSE = b"<close xmlns='urn:ietf:params:xml:ns:xmpp-framing'/>"
+
+
+class WebsocketParserTest(unittest.TestCase):
+    def setUp(self):
+        self.client = Mock()
+        self.client.is_websocket = True
+        self.client.get_bound_jid.return_value = JID.from_string("test@test.test")
+        self.dispatcher = StanzaDispatcher(self.client)
+        self.dispatcher.reset_parser()
+
+        self.bodies = []
+        self.dispatcher.register_handler(
+            StanzaHandler(name="message", callback=self._on_message)
+        )
+
+        self.signals = []
+        self.dispatcher.subscribe("stream-end", self._on_signal)
+        self.dispatcher.subscribe("parsing-error", self._on_signal)
+
+    def _on_message(self, _client, _stanza, properties):
+        self.bodies.append(properties.body)
+
+    def _on_signal(self, _dispatcher, signal_name, *args):
+        self.signals.append(signal_name)
+
+    def test_frames(self):
+        parser = self.dispatcher._parser
+        self.dispatcher.process_data(OPEN)
+        self.dispatcher.process_data((MESSAGE % "Hi ☀").encode())
+        self.dispatcher.process_data(MESSAGE % "second")
+        self.dispatcher.process_data((MESSAGE % "a￾b").encode())
+
+        self.assertIs(self.dispatcher._parser, parser)
+        self.assertEqual(self.bodies, ["Hi ☀", "second", "a�b"])
+        self.assertEqual(self.signals, [])
+
+        self.dispatcher.process_data(CLOSE)
+        self.assertEqual(self.signals, ["stream-end"])
+
+    def test_incomplete_frame(self):
+        self.dispatcher.process_data(b"<message xmlns='jabber:client'>")
+        self.assertEqual(self.signals, ["parsing-error"])
+
+    def test_malformed_frame(self):
+        self.dispatcher.process_data(b"<message xmlns='jabber:client'></iq>")
+        self.assertEqual(self.signals, ["parsing-error"])
+
+
+if __name__ == "__main__":
+    unittest.main()